@@ -2,10 +2,20 @@ import requests
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
 
-from datetime import datetime
-import pytz
+import capture
+import datetimes
+import files
+import http_cache
+import http_client
+import js_literal
+import metrics
+import profiling
+from events import Event, make_id
+import rendering
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 import uuid
-import re
 import os
 import json
 
@@ -17,164 +27,187 @@ SENDER_NAME = "Angel City Game Bot"
 RECEIVER_EMAIL = "psahagun@usc.edu"
 RECEIVER_NAME = "Pablo Sahagun"
 
-SCHEDULE_URL = "https://angelcity.com/2026-schedule"
+SCHEDULE_URL_TEMPLATE = "https://angelcity.com/{season}-schedule"
 
+# Completed seasons never change, so their games are cached permanently
+SEASON_CACHE_DIR = os.path.join(http_cache.CACHE_DIR, "angelcity")
+MAX_WORKERS = 4
 
-def extract_angel_city_games(url):
-    print("Fetching Angel City schedule...")
+# Season range mode, e.g. ANGELCITY_SEASONS=2024-2026 (default: current season)
+SEASONS = os.environ.get("ANGELCITY_SEASONS", "")
 
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        return None, str(e)
 
-    html = response.text
+def current_season(today=None):
+    """NWSL seasons run within one calendar year."""
+    return (today or datetimes.now()).year
 
-    # --- Extract gamesData ---
-    match = re.search(r"const gamesData = \[(.*?)\];", html, re.DOTALL)
 
-    if not match:
-        return None, "gamesData not found"
+def schedule_url(season):
+    return SCHEDULE_URL_TEMPLATE.format(season=season)
 
-    games_raw = "[" + match.group(1) + "]"
 
-    # ✅ Quote ONLY keys that appear after { or ,
-    games_json = re.sub(r'([{,]\s*)(\w+):', r'\1"\2":', games_raw)
+def parse_seasons(value):
+    """Parses "2024-2026" or "2024,2026" into a sorted list of seasons."""
+    seasons = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        seasons.update(range(int(first), int(last or first) + 1))
+    return sorted(seasons)
 
-    # Replace single quotes with double quotes
-    games_json = games_json.replace("'", '"')
 
-    # Remove trailing commas
-    games_json = re.sub(r',\s*}', '}', games_json)
-    games_json = re.sub(r',\s*]', ']', games_json)
+def extract_angel_city_games(url, season=None):
+    """
+    Fetches one season's schedule page and returns its home games as Event
+    records, each tagged with its season (the game's year if not given).
+    """
+    print(f"Fetching Angel City schedule from {url}...")
 
     try:
-        games_data = json.loads(games_json)
-    except Exception as e:
-        print("DEBUG JSON SAMPLE:\n", games_json[:1000])
-        return None, f"JSON parse error: {e}"
-    
+        response = http_client.get(url, timeout=15)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        return None, str(e)
 
-    games = []
+    html = response.text
 
-    utc = pytz.utc
-    pacific = pytz.timezone("US/Pacific")
+    # --- Extract gamesData ---
+    try:
+        games_data = metrics.timed("parse", js_literal.extract_assignment, html, "gamesData")
+    except KeyError:
+        metrics.incr("parse_errors")
+        return None, "gamesData not found"
+    except js_literal.JSLiteralError as e:
+        metrics.incr("parse_errors")
+        return None, f"gamesData parse error: {e}"
 
-    for game in games_data:
+    games = []
 
-        raw_date = game.get("date")
-        opponent = game.get("opponent")
-        game_type = game.get("gameType")
+    with metrics.span("normalize"):
+        for game in games_data:
 
-        dt = datetime.strptime(raw_date, "%Y-%m-%d %H:%M:%S")
-        dt = utc.localize(dt)
-        dt = dt.astimezone(pacific)
+            raw_date = game.get("date")
+            opponent = game.get("opponent")
+            game_type = game.get("gameType")
 
-        formatted_date = dt.strftime("%b %d, %Y")
-        formatted_time = dt.strftime("%I:%M %p PT")
+            # gamesData dates are UTC
+            dt = datetimes.parse_iso(raw_date, datetimes.UTC).astimezone(datetimes.PACIFIC)
 
-        if game_type == "home":
-            games.append({
-            "Name": f"vs {opponent}" if game_type == "home" else f"@ {opponent}",
-            "Date": formatted_date,
-            "Time": formatted_time,
-            "Location": "BMO Stadium",
-            "URL": url
-        })
+            if game_type == "home":
+                games.append(Event(
+                    source="angelcity",
+                    title=f"vs {opponent}",
+                    start=dt,
+                    venue="BMO Stadium",
+                    url=url,
+                    id=make_id("angelcity", raw_date, opponent),
+                    season=str(season or dt.year),
+                ))
 
-    print(f"Found {len(games)} Angel City games.")
+    print(f"Found {len(games)} Angel City games" + (f" in {season}." if season else "."))
 
     return games, None
 
 
-def format_events_as_html(event_list):
-    pacific = pytz.timezone("US/Pacific")
-    generated_at = datetime.now(pacific).strftime("%a %b %d · %I:%M %p %Z")
+def _season_cache_path(season):
+    return os.path.join(SEASON_CACHE_DIR, f"{season}.json")
 
-    html = "<html><body>"
 
-    html += f"<p><b>Generated:</b> {generated_at}<br>"
-    html += f"<b>Total games:</b> {len(event_list)}</p><hr>"
+def load_cached_season(season):
+    try:
+        with open(_season_cache_path(season), encoding="utf-8") as f:
+            games = json.load(f)
+        return [replace(Event.from_dict(game), season=str(season)) for game in games]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
 
-    html += "<h1>⚽ Angel City FC Games</h1>"
 
-    # Group by month
-    grouped = {}
+def save_cached_season(season, games):
+    files.atomic_write(_season_cache_path(season), json.dumps([game.to_dict() for game in games]))
+
 
-    for event in event_list:
-        dt = datetime.strptime(event["Date"], "%b %d, %Y")
-        month_key = dt.strftime("%B %Y")
-
-        if month_key not in grouped:
-            grouped[month_key] = []
-
-        grouped[month_key].append(event)
-
-    # Consistent table template
-    table_header = """
-    <table border="1"
-           cellpadding="10"
-           cellspacing="0"
-           style="width:100%;
-                  border-collapse:collapse;
-                  font-family:Arial;
-                  margin-bottom:25px;
-                  table-layout:fixed;">
-        <colgroup>
-            <col style="width:25%;">
-            <col style="width:15%;">
-            <col style="width:15%;">
-            <col style="width:25%;">
-            <col style="width:20%;">
-        </colgroup>
-        <thead>
-            <tr style="background-color:#f2f2f2;">
-                <th>Match</th>
-                <th>Date</th>
-                <th>Time</th>
-                <th>Location</th>
-                <th>Schedule</th>
-            </tr>
-        </thead>
-        <tbody>
+def extract_seasons(seasons, max_workers=MAX_WORKERS):
     """
+    Returns the merged home games of several seasons, oldest first.
+    Completed seasons come from the permanent cache when available; the
+    current (and any future) season is always fetched. Fetches run
+    concurrently. Seasons that fail are skipped; an error is only returned
+    when no season could be loaded. Replays never write the cache.
+    """
+    this_season = current_season()
+    results = {}
+    to_fetch = []
+
+    for season in seasons:
+        cached = load_cached_season(season) if season < this_season and not capture.active() else None
+        if cached is not None:
+            print(f"Using cached Angel City {season} season ({len(cached)} games).")
+            results[season] = cached
+        else:
+            to_fetch.append(season)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_fetch) or 1))) as executor:
+        fetched = executor.map(
+            metrics.in_context(lambda season: extract_angel_city_games(schedule_url(season), season)), to_fetch
+        )
+        for season, (games, error) in zip(to_fetch, fetched):
+            if error:
+                print(f"Angel City {season} season failed: {error}")
+                continue
+            results[season] = games
+            if season < this_season and capture.active() != "replay":
+                save_cached_season(season, games)
+
+    if not results:
+        return None, "No Angel City season could be loaded."
+
+    games = [game for season in sorted(results) for game in results[season]]
+    return games, None
 
-    # Sort months chronologically
-    sorted_months = sorted(
-        grouped.keys(),
-        key=lambda x: datetime.strptime(x, "%B %Y")
-    )
 
-    for month in sorted_months:
-        html += f"<h2>{month}</h2>"
-        html += table_header
+# Consistent table template
+GAME_TABLE = rendering.TableTemplate([
+    rendering.Column("Match", "title", kind="bold", width="25%"),
+    rendering.Column("Date", lambda game: game.date_label("%b %d, %Y"), width="15%"),
+    rendering.Column("Time", lambda game: game.time_label("%I:%M %p PT"), width="15%"),
+    rendering.Column("Location", "venue", width="25%"),
+    rendering.Column("Schedule", "url", kind="link", link_text="View Schedule", width="20%"),
+], table_style="width:100%; border-collapse:collapse; font-family:Arial; margin-bottom:25px; table-layout:fixed;",
+    align_left=False, colgroup=True)
 
-        # Sort games within month by date
-        sorted_events = sorted(
-            grouped[month],
-            key=lambda e: datetime.strptime(e["Date"], "%b %d, %Y")
-        )
 
-        for event in sorted_events:
-            html += f"""
-            <tr>
-                <td><b>{event['Name']}</b></td>
-                <td>{event['Date']}</td>
-                <td>{event['Time']}</td>
-                <td>{event['Location']}</td>
-                <td><a href="{event['URL']}">View Schedule</a></td>
-            </tr>
-            """
+def format_events_as_html(event_list):
+    generated_at = datetimes.now().strftime("%a %b %d · %I:%M %p %Z")
 
-        html += "</tbody></table>"
+    report = rendering.Report()
+    report.meta([("Generated", generated_at), ("Total games", len(event_list))], rule=True)
+    report.heading("⚽ Angel City FC Games")
 
-    html += "</body></html>"
+    # Group by season and month, in chronological order; seasons get their
+    # own headings when the report covers more than one
+    grouped = {}
 
-    return html
+    for event in sorted(event_list, key=lambda e: e.start):
+        grouped.setdefault(event.season, {}).setdefault(datetimes.month_key(event.start), []).append(event)
+
+    several = len(grouped) > 1
+    for season in sorted(grouped):
+        if several:
+            report.heading(f"{season} Season", level=2)
+        months = grouped[season]
+        for month in sorted(months):
+            report.heading(datetimes.month_label(months[month][0].start), level=3 if several else 2)
+            report.table(GAME_TABLE, months[month])
+
+    return report.html()
 
 
 def send_email_with_brevo(html_content, subject):
+    if not BREVO_API_KEY:
+        print("BREVO_API_KEY not set. Email not sent.")
+        return False
 
     run_id = str(uuid.uuid4())
 
@@ -196,18 +229,35 @@ def send_email_with_brevo(html_content, subject):
     try:
         api_instance.send_transac_email(send_smtp_email)
         print("Email sent successfully")
-
+        return True
     except ApiException as e:
         print("Email failed:", e)
+        return False
 
 
-if __name__ == "__main__":
+def scrape():
+    """Fetches the Angel City schedule (or the SEASONS range). Returns (events, error)."""
+    if SEASONS:
+        return extract_seasons(parse_seasons(SEASONS))
+    season = current_season()
+    return extract_angel_city_games(schedule_url(season), season)
 
-    events, error = extract_angel_city_games(SCHEDULE_URL)
 
+def compose(events, error):
+    """The Angel City report as (subject, html), or None on error."""
     if error:
         print(error)
-    else:
-        html = format_events_as_html(events)
-        # print(html)
-        send_email_with_brevo(html, "Angel City FC Schedule")
+        return None
+    return "Angel City FC Schedule", format_events_as_html(events)
+
+
+def report(events, error):
+    """Formats and sends the Angel City report."""
+    email = compose(events, error)
+    if email:
+        subject, html = email
+        send_email_with_brevo(html, subject)
+
+
+if __name__ == "__main__":
+    profiling.main()
@@ -0,0 +1,80 @@
+"""
+Cross-venue conflict detection over a synthetic year of events: comparing
+every pair vs. the sorted sweep in conflicts.py.
+
+    python benchmarks/bench_conflicts.py --per-day 12
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import conflicts  # noqa: E402
+import datetimes  # noqa: E402
+from events import Event, make_id  # noqa: E402
+
+VENUES = {
+    "shrine": "Shrine Auditorium",
+    "coliseum": "Los Angeles Memorial Coliseum",
+    "bmo": "BMO Stadium",
+    "expo": "Exposition Park Rose Garden",
+    "mbb": "Los Angeles, Calif. (Galen Center)",
+}
+
+
+def synthetic_year(per_day, seed=1):
+    rng = random.Random(seed)
+    day0 = datetimes.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    events = []
+    for day in range(365):
+        for n in range(rng.randint(0, per_day * 2)):
+            source = rng.choice(list(VENUES))
+            start = day0 + timedelta(days=day, hours=rng.randint(9, 21), minutes=rng.choice((0, 30)))
+            title = f"USC vs Opponent {n}" if source == "mbb" else f"Event {day}-{n}"
+            events.append(Event(
+                source=source, title=title, start=start, venue=VENUES[source],
+                id=make_id(source, day, n), time_tbd=rng.random() < 0.02,
+            ))
+    return events
+
+
+def pairwise(events, buffer_minutes):
+    """The obvious version: every pair of windows."""
+    buffer = timedelta(minutes=buffer_minutes)
+    windows = [conflicts.window(e, buffer) for e in events if conflicts.is_scheduled(e) and conflicts.is_local(e)]
+    found = 0
+    for i, a in enumerate(windows):
+        for b in windows[i + 1:]:
+            if a.start < b.end and b.start < a.end and a.site != b.site:
+                found += 1
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-day", type=int, default=6, help="average events per day")
+    parser.add_argument("--buffer", type=int, default=conflicts.BUFFER_MINUTES)
+    parser.add_argument("--skip-pairwise", action="store_true")
+    args = parser.parse_args()
+
+    events = synthetic_year(args.per_day)
+    print(f"events: {len(events)} over 365 days, buffer {args.buffer} min")
+
+    start = time.perf_counter()
+    found = conflicts.find_conflicts(events, args.buffer)
+    sweep_ms = (time.perf_counter() - start) * 1000
+    print(f"{'sweep':<10}{sweep_ms:>10.1f} ms{len(found):>10} conflicts")
+
+    if not args.skip_pairwise:
+        start = time.perf_counter()
+        count = pairwise(events, args.buffer)
+        pairwise_ms = (time.perf_counter() - start) * 1000
+        print(f"{'pairwise':<10}{pairwise_ms:>10.1f} ms{count:>10} conflicts")
+
+
+if __name__ == "__main__":
+    main()
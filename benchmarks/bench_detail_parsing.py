@@ -0,0 +1,118 @@
+"""
+Per-page parse time and peak memory of the BMO / Coliseum detail-page
+extraction: full BeautifulSoup parse (old path) vs. the strained partial
+parse used by parse_event_page (new path).
+
+    python benchmarks/bench_detail_parsing.py --kind bmo saved/bmo/*.html
+    python benchmarks/bench_detail_parsing.py --kind coliseum saved/coliseum/*.html
+
+Without page files a synthetic page shaped like the real one is used.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bmo_events  # noqa: E402
+import html_parsing  # noqa: E402
+import la_coliseum_events  # noqa: E402
+
+
+def _filler(blocks):
+    nav = "".join(f'<li><a href="/page/{i}">Menu item {i}</a></li>' for i in range(80))
+    cards = "".join(
+        f'<div class="card"><img src="/img/{i}.jpg" alt="x"><h3>Related event {i}</h3>'
+        f'<p>{"Lorem ipsum dolor sit amet. " * 12}</p></div>'
+        for i in range(blocks)
+    )
+    script = "<script>var data = {" + ",".join(f'"k{i}": {i}' for i in range(400)) + "};</script>"
+    return f"<nav><ul>{nav}</ul></nav>{script}<section>{cards}</section>"
+
+
+def synthetic_page(kind):
+    if kind == "bmo":
+        body = (
+            '<div class="header hero"><h2>Synthetic Concert</h2></div>'
+            '<div class="event__date"><p>Saturday, November 7, 2026</p></div>'
+            '<div class="event__time"><p>7:30 PM</p></div>'
+        )
+        head = "<title>Synthetic Concert | BMO Stadium</title>"
+    else:
+        body = (
+            '<aside><div class="sidebar-event-detail"><span class="sidebar-event-key">Date</span>'
+            '<span class="sidebar-event-value">Saturday, November 7, 2026</span></div>'
+            '<div class="sidebar-event-detail"><span class="sidebar-event-key">Start Time</span>'
+            '<span class="sidebar-event-value">7:30 PM</span></div></aside>'
+        )
+        head = "<title>Synthetic Concert - LA Memorial Coliseum</title>"
+    styles = "<style>" + "".join(f".c{i}{{color:#{i:06x}}}" for i in range(300)) + "</style>"
+    page = f"<html><head>{head}{styles}</head><body>{_filler(60)}{body}{_filler(60)}</body></html>"
+    return page.encode("utf-8")
+
+
+def old_bmo(content):
+    soup = html_parsing.parse_full(content)
+    return [soup.select_one(selector) for selector in bmo_events.DETAIL_SELECTORS.values()]
+
+
+def old_coliseum(content):
+    soup = html_parsing.parse_full(content)
+    return soup.select_one("title"), soup.select(".sidebar-event-detail")
+
+
+PATHS = {
+    "bmo": (old_bmo, bmo_events.parse_event_page),
+    "coliseum": (old_coliseum, lambda content: la_coliseum_events.parse_event_page(content, "N/A")),
+}
+
+
+def measure(func, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            func(page)
+    per_page_ms = (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+    tracemalloc.start()
+    for page in pages:
+        func(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return per_page_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kind", choices=sorted(PATHS), default="bmo")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("pages", nargs="*", help="recorded detail pages")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, "rb") as f:
+                pages.append(f.read())
+    else:
+        pages = [synthetic_page(args.kind)]
+
+    old, new = PATHS[args.kind]
+    size_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"{args.kind}: {len(pages)} page(s), avg {size_kb:.0f} KiB, parser={html_parsing.PARSER}")
+    print(f"{'path':<10}{'ms/page':>10}{'peak KiB':>12}")
+
+    results = {}
+    for label, func in (("full", old), ("partial", new)):
+        results[label] = measure(func, pages, args.repeat)
+        print(f"{label:<10}{results[label][0]:>10.2f}{results[label][1]:>12.0f}")
+
+    print(f"speedup: {results['full'][0] / results['partial'][0]:.1f}x, "
+          f"memory: {results['full'][1] / results['partial'][1]:.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Extracting Angel City's `gamesData` array: the old regex/replace chain vs.
+the single-pass js_literal reader.
+
+    python benchmarks/bench_js_literal.py saved/angelcity-2026.html
+
+Without a page file a synthetic schedule page is used.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import js_literal  # noqa: E402
+
+
+def old_extract(html):
+    """The pre-tokenizer extraction from angelcity_events."""
+    match = re.search(r"const gamesData = \[(.*?)\];", html, re.DOTALL)
+    if not match:
+        return None
+    games_json = re.sub(r'([{,]\s*)(\w+):', r'\1"\2":', "[" + match.group(1) + "]")
+    games_json = games_json.replace("'", '"')
+    games_json = re.sub(r',\s*}', '}', games_json)
+    games_json = re.sub(r',\s*]', ']', games_json)
+    return json.loads(games_json)
+
+
+def new_extract(html):
+    return js_literal.extract_assignment(html, "gamesData")
+
+
+def synthetic_page(games=40, apostrophe=False):
+    opponent = "Bay FC" if not apostrophe else "Women's Select XI"
+    rows = "".join(
+        f"\n      {{ date: '2026-{(i % 9) + 3:02d}-{(i % 27) + 1:02d} 02:00:00', "
+        f"opponent: \"{opponent}\", gameType: '{'home' if i % 2 else 'away'}', week: {i}, }},"
+        for i in range(games)
+    )
+    filler = "<div class='promo'>" + "Tickets on sale now. " * 40 + "</div>"
+    script = f"<script>\n    const gamesData = [{rows}\n    ];\n    render(gamesData);\n</script>"
+    return f"<html><head><title>Schedule</title></head><body>{filler * 300}{script}{filler * 300}</body></html>"
+
+
+def measure(func, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    per_call_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("page", nargs="?", help="recorded schedule page")
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page, encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = synthetic_page()
+
+    print(f"page: {len(html) / 1024:.0f} KiB")
+    print(f"{'path':<10}{'ms/call':>10}{'peak KiB':>12}")
+    for label, func in (("regex", old_extract), ("tokenizer", new_extract)):
+        per_call_ms, peak_kib = measure(func, html, args.repeat)
+        print(f"{label:<10}{per_call_ms:>10.3f}{peak_kib:>12.0f}")
+
+    same = old_extract(html) == new_extract(html)
+    print(f"same result: {same}")
+
+    tricky = synthetic_page(games=3, apostrophe=True)
+    try:
+        old_extract(tricky)
+        old_status = "ok"
+    except ValueError as e:
+        old_status = f"fails ({e.__class__.__name__})"
+    print(f"apostrophe in opponent: regex {old_status}, tokenizer {len(new_extract(tricky))} games")
+
+
+if __name__ == "__main__":
+    main()
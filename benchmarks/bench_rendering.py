@@ -0,0 +1,140 @@
+"""
+Rendering a large report table: the old `html +=` string building vs. the
+precompiled rendering.TableTemplate.
+
+    python benchmarks/bench_rendering.py --rows 5000
+
+The old formatters did not escape anything, so "html += esc" is the old loop
+with rendering.escape() around each cell: the like-for-like comparison.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rendering  # noqa: E402
+
+# Rows are plain dicts of display strings so both paths do the same work
+EVENT_TABLE = rendering.TableTemplate([
+    rendering.Column("Event Name", lambda event: event['Name'], kind="bold"),
+    rendering.Column("Date", lambda event: event['Date']),
+    rendering.Column(
+        "Time", lambda event: event['Time'],
+        style=lambda event: rendering.STYLE_WARN if event['Time'] in ("N/A", "TBD") else "",
+    ),
+    rendering.Column("Location", lambda event: event['Location']),
+    rendering.Column("Event Link", lambda event: event['URL'], kind="link", link_text="View Event"),
+])
+
+
+def synthetic_events(rows):
+    return [
+        {
+            "Name": f"Event {i} & Friends",
+            "Date": "Sat, Oct 17, 2026",
+            "Time": "TBD" if i % 7 == 0 else "7:30 PM",
+            "Location": "BMO Stadium",
+            "URL": f"https://example.com/events/{i}?ref=email",
+        }
+        for i in range(rows)
+    ]
+
+
+def old_render(event_list):
+    """The pre-template formatter from bmo_events."""
+    html = "<html><body>"
+    html += f"<h1>Upcoming Events</h1><p>Found {len(event_list)} upcoming events</p>"
+    html += """
+    <table border="1" cellpadding="10" cellspacing="0" style="width:100%; border-collapse:collapse;">
+        <thead>
+            <tr style="background-color:#f2f2f2;">
+                <th>Event Name</th><th>Date</th><th>Time</th><th>Location</th><th>Event Link</th>
+            </tr>
+        </thead>
+        <tbody>
+    """
+    for event in event_list:
+        time_style = "color:#ff8c00; font-weight:bold;" if event['Time'] in ("N/A", "TBD") else ""
+        html += f"""
+        <tr>
+            <td><b>{event['Name']}</b></td>
+            <td>{event['Date']}</td>
+            <td style="{time_style}">{event['Time']}</td>
+            <td>{event['Location']}</td>
+            <td><a href="{event['URL']}" target="_blank">View Event</a></td>
+        </tr>
+        """
+    html += "</tbody></table></body></html>"
+    return html
+
+
+def old_render_escaped(event_list):
+    """old_render with each scraped value escaped."""
+    escape = rendering.escape
+    html = "<html><body>"
+    html += f"<h1>Upcoming Events</h1><p>Found {len(event_list)} upcoming events</p>"
+    html += """
+    <table border="1" cellpadding="10" cellspacing="0" style="width:100%; border-collapse:collapse;">
+        <thead>
+            <tr style="background-color:#f2f2f2;">
+                <th>Event Name</th><th>Date</th><th>Time</th><th>Location</th><th>Event Link</th>
+            </tr>
+        </thead>
+        <tbody>
+    """
+    for event in event_list:
+        time_style = "color:#ff8c00; font-weight:bold;" if event['Time'] in ("N/A", "TBD") else ""
+        html += f"""
+        <tr>
+            <td><b>{escape(event['Name'])}</b></td>
+            <td>{escape(event['Date'])}</td>
+            <td style="{time_style}">{escape(event['Time'])}</td>
+            <td>{escape(event['Location'])}</td>
+            <td><a href="{escape(event['URL'])}" target="_blank">View Event</a></td>
+        </tr>
+        """
+    html += "</tbody></table></body></html>"
+    return html
+
+
+def new_render(event_list):
+    report = rendering.Report()
+    report.heading("Upcoming Events")
+    report.paragraph(f"Found {len(event_list)} upcoming events")
+    report.table(EVENT_TABLE, event_list)
+    return report.html()
+
+
+def measure(func, events, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        html = func(events)
+    per_call_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    tracemalloc.start()
+    func(events)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call_ms, peak / 1024, len(html)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    events = synthetic_events(args.rows)
+    print(f"rows: {args.rows}")
+    print(f"{'path':<14}{'ms/call':>10}{'peak KiB':>12}{'KiB out':>10}")
+    paths = (("html +=", old_render), ("html += esc", old_render_escaped), ("template", new_render))
+    for label, func in paths:
+        per_call_ms, peak_kib, size = measure(func, events, args.repeat)
+        print(f"{label:<14}{per_call_ms:>10.2f}{peak_kib:>12.0f}{size / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
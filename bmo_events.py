@@ -4,6 +4,17 @@ import os
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
 
+import capture
+import datetimes
+import html_parsing
+import http_cache
+import http_client
+import metrics
+import profiling
+import rendering
+from events import Event, make_id
+from record_index import RecordIndex
+
 # --- 1. USER CONFIGURATION for Brevo Email ---
 
 BREVO_API_KEY = os.environ.get("BREVO_API_KEY")
@@ -15,27 +26,72 @@ RECEIVER_NAME = "Pablo Sahagun"
 
 MAIN_URL = "https://bmostadium.com/upcoming-events/"
 
+# Event page fields and the selectors they are read from
+DETAIL_SELECTORS = {
+    "title": ".header h2",
+    "date": ".event__date p",
+    "time": ".event__time p",
+}
+DETAIL_STRAINER = html_parsing.class_strainer("header", "event__date", "event__time")
+
+# Extracted event pages are reused for the TTL, then revalidated (304 keeps
+# the record). The least recently used entries are dropped past the cap. The
+# TTL spans the gap between scheduled runs (Mon / Wed / Fri), like the
+# Coliseum index.
+DETAIL_CACHE_PATH = os.path.join(http_cache.CACHE_DIR, "bmo_events.json")
+DETAIL_CACHE_TTL_SECONDS = int(os.environ.get("BMO_CACHE_TTL_HOURS", "72")) * 3600
+DETAIL_CACHE_MAX_ENTRIES = 500
+
 # --- 2. CORE SCRAPING LOGIC ---
 
-def extract_bmo_events(main_url):
+def _read_detail_fields(soup):
+    fields = {}
+    for field, selector in DETAIL_SELECTORS.items():
+        tag = soup.select_one(selector)
+        fields[field] = tag.get_text(strip=True) if tag else None
+    return fields
+
+
+def parse_event_page(content):
+    """
+    Extracts title, date and time from an event page.
+    Only the header/date/time subtrees are parsed; if any selector misses,
+    the page is parsed in full. Missing fields come back as "N/A".
+    """
+    fields = _read_detail_fields(html_parsing.parse_partial(content, DETAIL_STRAINER))
+    if None in fields.values():
+        fields = _read_detail_fields(html_parsing.parse_full(content))
+    return {field: "N/A" if value is None else value for field, value in fields.items()}
+
+
+def load_detail_cache():
+    """The disk-backed cache of extracted event pages."""
+    return RecordIndex(DETAIL_CACHE_PATH, DETAIL_CACHE_TTL_SECONDS, DETAIL_CACHE_MAX_ENTRIES)
+
+
+def extract_bmo_events(main_url, index=None):
     """
     Fetches the BMO Stadium upcoming events page, extracts event links,
     then scrapes each event page for title, date, time, and location.
+
+    With an index (see load_detail_cache), fresh pages are served from the
+    cache and expired ones are revalidated with a conditional GET.
     """
     print(f"--- Fetching BMO Stadium events from: {main_url} ---")
 
     try:
-        response = requests.get(main_url, timeout=15)
+        response = http_client.get(main_url, timeout=15)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         return None, f"Error fetching main page: {e}"
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    with metrics.span("parse"):
+        soup = BeautifulSoup(response.content, "html.parser")
+        event_cards = soup.select(".grid.col-4.event-grid .grid__item.card")
     events = []
 
-    event_cards = soup.select(".grid.col-4.event-grid .grid__item.card")
-
     if not event_cards:
+        metrics.incr("parse_errors")
         return [], "No event cards found. Selector may be outdated."
 
     print(f"Found {len(event_cards)} event links. Processing...\n")
@@ -46,38 +102,58 @@ def extract_bmo_events(main_url):
             continue
 
         event_url = link.get("href")
+
+        cached = index.get_fresh(event_url) if index else None
+        if cached:
+            print(f"-> Cached event page: {event_url}")
+            events.append(cached)
+            continue
+
         print(f"-> Scraping event page: {event_url}")
 
         try:
-            event_response = requests.get(event_url, timeout=15)
+            headers = index.validators(event_url) if index else None
+            event_response = http_client.get(event_url, timeout=15, headers=headers)
+            if event_response.status_code == 304 and index and index.get(event_url):
+                print("   Not modified, reusing cached record.")
+                events.append(index.touch(event_url))
+                continue
             event_response.raise_for_status()
         except requests.exceptions.RequestException as e:
             print(f"   Failed to fetch {event_url}: {e}")
+            stale = index.get(event_url) if index else None
+            if stale is not None:
+                # Keep serving the expired record if the refresh failed
+                events.append(stale)
             continue
 
-        event_soup = BeautifulSoup(event_response.content, "html.parser")
-
         # --- Extract fields from event page ---
-        title_tag = event_soup.select_one(".header h2")
-        date_tag = event_soup.select_one(".event__date p")
-        time_tag = event_soup.select_one(".event__time p")
-
-        title = title_tag.get_text(strip=True) if title_tag else "N/A"
-        date = date_tag.get_text(strip=True) if date_tag else "N/A"
-        time = time_tag.get_text(strip=True) if time_tag else "N/A"
+        fields = metrics.timed("parse", parse_event_page, event_response.content)
+        title = fields["title"]
+        date = fields["date"]
+        time = fields["time"]
 
         # Location inference
         location = "BMO Stadium"
         if "Coliseum" in title:
             location = "LA Coliseum"
 
-        events.append({
+        event = {
             "Name": title,
             "Date": date,
             "Time": time,
             "Location": location,
             "URL": event_url
-        })
+        }
+        events.append(event)
+
+        if index:
+            index.put(
+                event_url,
+                event,
+                etag=event_response.headers.get("ETag"),
+                last_modified=event_response.headers.get("Last-Modified"),
+            )
 
         print(f"   Name: {title}")
         print(f"   Date: {date}")
@@ -85,65 +161,75 @@ def extract_bmo_events(main_url):
         print(f"   Location: {location}")
         print("-" * 50)
 
-    return events, None
+    if index:
+        index.save()
+        print(f"Detail cache: {index.stats()}")
+        metrics.count("index_hits", index.hits)
+
+    # The index keeps the scraped text; the Events get the parsed start
+    with metrics.span("normalize"):
+        return [to_event(record) for record in events], None
+
+
+def to_event(record):
+    """Builds the Event for a scraped detail record."""
+    start, end = datetimes.combine(record["Date"], record["Time"])
+    return Event(
+        source="bmo",
+        title=record["Name"],
+        start=start,
+        end=end,
+        venue=record["Location"],
+        url=record["URL"],
+        id=make_id("bmo", record["URL"]),
+        time_tbd=datetimes.parse_clock(record["Time"]) is None,
+        date_text=record["Date"],
+        time_text=record["Time"],
+    )
 
 # --- 3. FORMAT EVENTS AS HTML ---
 
-from datetime import datetime
-import pytz
 import uuid
 
+EVENT_TABLE = rendering.TableTemplate([
+    rendering.Column("Event Name", "title", kind="bold"),
+    rendering.Column("Date", lambda event: event.date_label("%a, %b %d, %Y", missing="N/A")),
+    rendering.Column(
+        "Time", lambda event: event.time_label(),
+        style=lambda event: rendering.STYLE_WARN if event.time_tbd or event.start is None else "",
+    ),
+    rendering.Column("Location", "venue"),
+    rendering.Column("Event Link", "url", kind="link", link_text="View Event"),
+], align_left=False)
+
+
 def format_events_as_html(event_list):
     # --- Entropy block ---
-    pacific = pytz.timezone("US/Pacific")
-    generated_at = datetime.now(pacific).strftime("%a %b %d · %I:%M %p %Z")
+    generated_at = datetimes.now().strftime("%a %b %d · %I:%M %p %Z")
     event_count = len(event_list) if event_list else 0
 
     if not event_list:
         return "<h1>BMO Stadium Event Report</h1><p>No upcoming events found.</p>"
 
-    html = "<html><body>"
-    html += f"<p><b>Generated at:</b> {generated_at}<br><b>Source:</b> BMO Stadium<br><b>Events detected:</b> {event_count}</p><hr>"
-    html += "<h1>🏟️ BMO Stadium Upcoming Events</h1>"
-    html += f"<p>Found {len(event_list)} upcoming events</p>"
-
-    html += """
-    <table border="1" cellpadding="10" cellspacing="0" style="width:100%; border-collapse:collapse; font-family:Arial, sans-serif;">
-        <thead>
-            <tr style="background-color:#f2f2f2;">
-                <th>Event Name</th>
-                <th>Date</th>
-                <th>Time</th>
-                <th>Location</th>
-                <th>Event Link</th>
-            </tr>
-        </thead>
-        <tbody>
-    """
-
-    for event in event_list:
-        time_style = "color:#ff8c00; font-weight:bold;" if event['Time'] in ("N/A", "TBD") else ""
-        html += f"""
-        <tr>
-            <td><b>{event['Name']}</b></td>
-            <td>{event['Date']}</td>
-            <td style="{time_style}">{event['Time']}</td>
-            <td>{event['Location']}</td>
-            <td><a href="{event['URL']}" target="_blank">View Event</a></td>
-        </tr>
-        """
-
-    html += "</tbody></table></body></html>"
-    return html
+    report = rendering.Report()
+    report.meta([
+        ("Generated at", generated_at),
+        ("Source", "BMO Stadium"),
+        ("Events detected", event_count),
+    ], rule=True)
+    report.heading("🏟️ BMO Stadium Upcoming Events")
+    report.paragraph(f"Found {event_count} upcoming events")
+    report.table(EVENT_TABLE, event_list)
+    return report.html()
 
 # --- 4. SEND EMAIL VIA BREVO ---
 
 def send_email_with_brevo(html_content, subject):
     run_id = str(uuid.uuid4())
-    report_date = datetime.now().strftime("%Y-%m-%d")
+    report_date = datetimes.now().strftime("%Y-%m-%d")
     if not BREVO_API_KEY:
         print("BREVO_API_KEY not set. Email not sent.")
-        return
+        return False
 
     configuration = sib_api_v3_sdk.Configuration()
     configuration.api_key['api-key'] = BREVO_API_KEY
@@ -169,17 +255,31 @@ def send_email_with_brevo(html_content, subject):
         response = api_instance.send_transac_email(send_smtp_email)
         print("Email sent successfully.")
         print(f"Message ID: {response.message_id}")
+        return True
     except ApiException as e:
         print(f"Failed to send email: {e}")
+        return False
 
 # --- 5. RUN SCRIPT ---
 
-if __name__ == "__main__":
-    events, error = extract_bmo_events(MAIN_URL)
+def scrape():
+    """Fetches BMO Stadium events. Returns (events, error)."""
+    return extract_bmo_events(MAIN_URL, index=None if capture.active() else load_detail_cache())
+
 
+def compose(events, error):
+    """The BMO Stadium report (or error email) as (subject, html)."""
     if error:
         error_html = f"<h1>🚨 BMO Scraping Error</h1><p>{error}</p>"
-        send_email_with_brevo(error_html, "ACTION REQUIRED: BMO Scraper Error")
-    else:
-        html_report = format_events_as_html(events)
-        send_email_with_brevo(html_report, "BMO Stadium Event Report")
+        return "ACTION REQUIRED: BMO Scraper Error", error_html
+    return "BMO Stadium Event Report", format_events_as_html(events)
+
+
+def report(events, error):
+    """Sends the BMO Stadium report, or an error email if scraping failed."""
+    subject, html_report = compose(events, error)
+    send_email_with_brevo(html_report, subject)
+
+
+if __name__ == "__main__":
+    profiling.main()
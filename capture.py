@@ -0,0 +1,264 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import config
+import datetimes
+import files
+
+# --- Capture / replay archive ---
+#
+# With capture on, every response that goes through the shared session is
+# written to an archive; with replay on, every request is answered from a
+# captured run instead of the network. Both work by wrapping the session's
+# mounted transport adapters, so no scraper needs to know about them.
+#
+#   <CAPTURE_DIR>/objects/ab/abcdef....gz    gzip'd bodies, named by SHA-256
+#   <CAPTURE_DIR>/runs/<run>/manifest.jsonl  one line per response: method,
+#                                            URL, status, headers, body hash
+#   <CAPTURE_DIR>/runs/<run>/run.json        when the run started, sources
+#
+# Bodies are content-addressed, so a page that did not change between runs
+# is stored once. While capturing or replaying, conditional GETs and the
+# detail-page indexes are bypassed so that every page is actually fetched
+# (and therefore recorded, or looked up in the capture). A replay also sets
+# the datetimes clock to the capture's start, so sources that build URLs or
+# seasons from the current date ask for what the capture holds. Nothing is
+# emailed during a replay: reports are written to REPLAY_OUTPUT_DIR instead.
+
+CAPTURE_DIR = os.environ.get(
+    "SCRAPER_CAPTURE_DIR", os.path.join(os.environ.get("SCRAPER_CACHE_DIR", ".cache"), "captures")
+)
+
+# SCRAPER_CAPTURE=1 records every run; SCRAPER_REPLAY=<run id or "latest">
+# serves every request from that run
+CAPTURE = config.flag("SCRAPER_CAPTURE")
+REPLAY = os.environ.get("SCRAPER_REPLAY") or None
+
+# Replayed reports go to <REPLAY_OUTPUT_DIR>/<run>/<source>.html
+REPLAY_OUTPUT_DIR = os.path.join(os.environ.get("SCRAPER_CACHE_DIR", ".cache"), "replay")
+
+
+class NotCaptured(requests.exceptions.ConnectionError):
+    """A replayed request that is not in the capture; scrapers see a network error."""
+
+
+class Archive:
+    def __init__(self, root=CAPTURE_DIR):
+        self.root = root
+
+    def _object_path(self, sha):
+        return os.path.join(self.root, "objects", sha[:2], f"{sha}.gz")
+
+    def run_dir(self, run_id):
+        return os.path.join(self.root, "runs", run_id)
+
+    def put_body(self, body):
+        """Stores body once under its SHA-256. Returns the hash."""
+        sha = hashlib.sha256(body).hexdigest()
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            files.atomic_write(path, gzip.compress(body, compresslevel=6))
+        return sha
+
+    def get_body(self, sha):
+        with gzip.open(self._object_path(sha), "rb") as f:
+            return f.read()
+
+    def runs(self):
+        """Captured run ids, oldest first."""
+        try:
+            return sorted(os.listdir(os.path.join(self.root, "runs")))
+        except OSError:
+            return []
+
+    def resolve(self, run):
+        """A run id, or "latest" for the most recent run."""
+        runs = self.runs()
+        if run == "latest" and runs:
+            return runs[-1]
+        if run not in runs:
+            raise ValueError(f"no captured run {run!r} in {self.root}")
+        return run
+
+    def run_info(self, run_id):
+        try:
+            with open(os.path.join(self.run_dir(run_id), "run.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def manifest(self, run_id):
+        """The run's response records, in the order they were received."""
+        records = []
+        try:
+            with open(os.path.join(self.run_dir(run_id), "manifest.jsonl"), encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        records.append(json.loads(line))
+        except OSError:
+            pass
+        return records
+
+    def new_run(self, sources=None):
+        """Creates an empty run directory and returns its id."""
+        run_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        base, n = run_id, 1
+        while os.path.exists(self.run_dir(run_id)):
+            n += 1
+            run_id = f"{base}-{n}"
+        os.makedirs(self.run_dir(run_id))
+        with open(os.path.join(self.run_dir(run_id), "run.json"), "w", encoding="utf-8") as f:
+            json.dump({"run": run_id, "started_at": time.time(), "sources": list(sources or [])}, f)
+        return run_id
+
+
+class CaptureAdapter(BaseAdapter):
+    """Sends through the wrapped adapter and records each response."""
+
+    def __init__(self, inner, archive, run_id):
+        super().__init__()
+        self.inner = inner
+        self.archive = archive
+        self.manifest_path = os.path.join(archive.run_dir(run_id), "manifest.jsonl")
+        self.lock = _manifest_locks.setdefault(self.manifest_path, threading.Lock())
+
+    def send(self, request, **kwargs):
+        # Session.send() only sets response.elapsed once the adapter returns
+        start = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        elapsed = time.perf_counter() - start
+        body = response.content   # also fine for stream=True: later reads reuse it
+        record = {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "body": self.archive.put_body(body),
+            "size": len(body),
+            "elapsed": elapsed,
+            "fetched_at": time.time(),
+        }
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from a captured run; repeated URLs are served in capture order."""
+
+    def __init__(self, archive, run_id):
+        super().__init__()
+        self.archive = archive
+        self.run_id = run_id
+        self.records = {}
+        for record in archive.manifest(run_id):
+            self.records.setdefault((record["method"], record["url"]), []).append(record)
+        self.served = {}
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        key = (request.method, request.url)
+        with self.lock:
+            records = self.records.get(key)
+            if not records:
+                raise NotCaptured(f"{request.method} {request.url} is not in capture {self.run_id}", request=request)
+            n = self.served.get(key, 0)
+            self.served[key] = n + 1
+            self.count += 1
+        record = records[min(n, len(records) - 1)]
+
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.reason = record.get("reason", "")
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.archive.get_body(record["body"])
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+_manifest_locks = {}
+_mode = None          # None, "capture" or "replay"
+_run_id = None
+_replay = None        # the active ReplayAdapter
+_originals = {}       # id(session) -> the session's own adapters
+
+
+def _wrap(session, make_adapter):
+    adapters = _originals.setdefault(id(session), dict(session.adapters))
+    for prefix, adapter in adapters.items():
+        session.adapters[prefix] = make_adapter(adapter)
+
+
+def start_capture(session, sources=None, archive=None):
+    """Records every response of session into a new run. Returns the run id."""
+    global _mode, _run_id
+    archive = archive or Archive()
+    run_id = archive.new_run(sources)
+    _wrap(session, lambda adapter: CaptureAdapter(adapter, archive, run_id))
+    _mode, _run_id = "capture", run_id
+    print(f"Capturing responses to {archive.run_dir(run_id)}")
+    return run_id
+
+
+def start_replay(session, run, archive=None):
+    """Serves every request of session from a captured run. Returns the run id."""
+    global _mode, _run_id, _replay
+    archive = archive or Archive()
+    run_id = archive.resolve(run)
+    replay = ReplayAdapter(archive, run_id)
+    _wrap(session, lambda adapter: replay)
+    _mode, _run_id, _replay = "replay", run_id, replay
+    started_at = archive.run_info(run_id).get("started_at")
+    if started_at is None:
+        manifest = archive.manifest(run_id)
+        started_at = manifest[0].get("fetched_at") if manifest else None
+    datetimes.set_clock(started_at)
+    print(f"Replaying captured run {run_id} ({sum(map(len, replay.records.values()))} responses)")
+    return run_id
+
+
+def install_from_env(session):
+    """Applies SCRAPER_REPLAY / SCRAPER_CAPTURE to a newly created session."""
+    if REPLAY:
+        start_replay(session, REPLAY)
+    elif CAPTURE:
+        start_capture(session)
+
+
+def active():
+    """The current mode: "capture", "replay" or None."""
+    return _mode
+
+
+def save_report(name, html, output_dir=REPLAY_OUTPUT_DIR):
+    """Writes a replayed source's report to the run's output directory. Returns the path."""
+    path = os.path.join(output_dir, _run_id, f"{name}.html")
+    files.atomic_write(path, html)
+    return path
+
+
+def replayed():
+    """Responses served so far by the current replay."""
+    return _replay.count if _replay else 0
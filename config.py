@@ -0,0 +1,8 @@
+import os
+
+# --- Environment settings ---
+
+
+def flag(name):
+    """True when the environment variable is set to 1, true or yes."""
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
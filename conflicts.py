@@ -0,0 +1,151 @@
+import heapq
+import os
+from dataclasses import dataclass
+from datetime import timedelta
+
+import rendering
+import sidearm
+
+# --- Cross-venue conflict detection ---
+#
+# Shrine, the Coliseum, BMO Stadium, Exposition Park and Galen Center share
+# one neighborhood, so events at different venues clash when their windows
+# (start to end, widened by an ingress/egress buffer) overlap. Windows are
+# sorted by start and swept once with a min-heap of the windows still open,
+# so a full year of events is checked in O(n log n + conflicts) instead of
+# comparing every pair.
+
+BUFFER_MINUTES = int(os.environ.get("CONFLICT_BUFFER_MINUTES", "90"))
+
+# Assumed length when a source gives no end time
+DEFAULT_DURATION = timedelta(hours=3)
+DURATIONS = {
+    "lafc": timedelta(hours=2),
+    "angelcity": timedelta(hours=2),
+    **{sport: timedelta(hours=2, minutes=30) for sport in sidearm.SPORTS},
+}
+
+# Sources whose events are all in the neighborhood
+LOCAL_SOURCES = {"shrine", "coliseum", "bmo", "expo", "lafc", "angelcity"}
+
+# Venue text -> site; events at the same site are never reported against
+# each other (usually the same event listed by two sources)
+SITES = (
+    ("coliseum", "Los Angeles Memorial Coliseum"),
+    ("bmo stadium", "BMO Stadium"),
+    ("shrine", "Shrine Auditorium"),
+    ("galen", "Galen Center"),
+)
+
+
+def site(venue):
+    lowered = venue.lower()
+    for keyword, name in SITES:
+        if keyword in lowered:
+            return name
+    return venue
+
+
+def is_local(event):
+    """Venue sources are local; USC games only when played at home in Los Angeles."""
+    if event.source in LOCAL_SOURCES:
+        return True
+    return event.source in sidearm.SPORTS and event.title.startswith("USC vs") and "Los Angeles" in event.venue
+
+
+def is_scheduled(event):
+    return event.start is not None and "cancel" not in event.status.lower()
+
+
+@dataclass(frozen=True)
+class Window:
+    start: object
+    end: object
+    event: object
+    site: str
+
+
+def window(event, buffer):
+    """The event's occupied window; a TBD time blocks the whole day (or every day of a range)."""
+    if event.time_tbd:
+        day = event.start.replace(hour=0, minute=0, second=0, microsecond=0)
+        return Window(day, event.end or day + timedelta(days=1), event, site(event.venue))
+    end = event.end if event.end and event.end > event.start else event.start + DURATIONS.get(event.source, DEFAULT_DURATION)
+    return Window(event.start - buffer, end + buffer, event, site(event.venue))
+
+
+@dataclass(frozen=True)
+class Conflict:
+    first: object
+    second: object
+    overlap_start: object
+    overlap_end: object
+
+    @property
+    def overlap_minutes(self):
+        return int((self.overlap_end - self.overlap_start).total_seconds() // 60)
+
+
+def find_conflicts(events, buffer_minutes=BUFFER_MINUTES, local_only=True):
+    """
+    Returns every pair of scheduled events at different sites whose buffered
+    windows overlap, ordered by the earlier event's start.
+    """
+    buffer = timedelta(minutes=buffer_minutes)
+    windows = sorted(
+        (window(event, buffer) for event in events if is_scheduled(event) and (is_local(event) or not local_only)),
+        key=lambda w: w.start,
+    )
+
+    conflicts = []
+    active = []   # heap of (end, sequence, window) for windows still open
+    for sequence, current in enumerate(windows):
+        while active and active[0][0] <= current.start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            if other.site != current.site:
+                conflicts.append(Conflict(
+                    first=other.event,
+                    second=current.event,
+                    overlap_start=current.start,
+                    overlap_end=min(current.end, other.end),
+                ))
+        heapq.heappush(active, (current.end, sequence, current))
+
+    conflicts.sort(key=lambda c: (c.first.start, c.second.start))
+    return conflicts
+
+
+# --- Report ---
+
+def _when(event):
+    return f"{event.date_label('%a, %b %d')} {event.time_label(missing='')}".rstrip()
+
+
+CONFLICT_TABLE = rendering.TableTemplate([
+    rendering.Column("Date", lambda c: c.first.date_label("%a, %b %d, %Y")),
+    rendering.Column("Event", lambda c: f"{c.first.title} ({_when(c.first)})", kind="bold"),
+    rendering.Column("Venue", lambda c: c.first.venue),
+    rendering.Column("Clashes with", lambda c: f"{c.second.title} ({_when(c.second)})", kind="bold"),
+    rendering.Column("Venue", lambda c: c.second.venue),
+    rendering.Column(
+        "Overlap", lambda c: "time TBD" if c.first.time_tbd or c.second.time_tbd else f"{c.overlap_minutes} min",
+        style=lambda c: rendering.STYLE_WARN,
+    ),
+])
+
+
+def format_conflicts_as_html(conflicts, buffer_minutes=BUFFER_MINUTES):
+    report = rendering.Report()
+    report.heading("🚦 Neighborhood Event Conflicts")
+    report.paragraph(f"{len(conflicts)} overlapping event pairs (with a {buffer_minutes} min ingress/egress buffer)")
+    report.table(CONFLICT_TABLE, conflicts)
+    return report.html()
+
+
+def print_conflicts(conflicts):
+    for c in conflicts:
+        overlap = "time TBD" if c.first.time_tbd or c.second.time_tbd else f"{c.overlap_minutes} min"
+        print(f"{c.first.date_label('%Y-%m-%d')}  {c.first.title} @ {c.first.venue} ({_when(c.first)})")
+        print(f"            x {c.second.title} @ {c.second.venue} ({_when(c.second)})  [{overlap}]")
+    print(f"{len(conflicts)} conflicts")
@@ -0,0 +1,254 @@
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil import parser as dateutil_parser
+
+# --- Shared datetime normalization ---
+#
+# Every source turns its date text into a timezone-aware datetime once, here,
+# and carries it through to rendering. ISO 8601 values take the
+# datetime.fromisoformat fast path; anything else goes through dateutil, whose
+# results are memoized because the same date strings repeat across a
+# schedule. Zones are resolved once and month names come from a fixed table,
+# so nothing depends on the platform or locale.
+#
+# now() is the one clock every source reads (current season, month, year).
+# Replays and reprocessing set it to the capture's start with set_clock(), so
+# old captures are parsed as of the day they were fetched.
+
+UTC = timezone.utc
+
+MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+# "jan" / "january" -> 1 ... "dec" / "december" -> 12, plus "sept"
+MONTH_ABBR = {name[:3].lower(): number for number, name in enumerate(MONTH_NAMES, start=1)}
+MONTH_ABBR.update({name.lower(): number for number, name in enumerate(MONTH_NAMES, start=1)})
+MONTH_ABBR["sept"] = 9
+
+# "7:30 PM", "7 pm", "10:00 a.m.", "Noon", "Midnight"
+_CLOCK = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap])\.?\s*m\b|\b(noon|midnight)\b", re.IGNORECASE)
+# Labels of clocks that are not the start: "Gates 5:00 PM / Kickoff 7:30 PM"
+_NOT_START = re.compile(r"\b(?:gates?|doors?|parking|lots?|tailgat\w*)\b", re.IGNORECASE)
+
+# The separator of a day range: "October 17 - 19", "Oct 31 – Nov 2",
+# "Jan 9 & 10", "Sat, Nov 21 to Sun, Nov 22"
+_RANGE = re.compile(
+    r"(?<=\d)\s*(?:[-–—&]|\bto\b|\bthrough\b|\bthru\b)\s*(?=(?:[a-z]+[.,]?\s+){0,2}\d)", re.IGNORECASE
+)
+_YEAR = re.compile(r"\b\d{4}\b")
+_WORD = re.compile(r"[a-z]+", re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def zone(name):
+    """Resolves an IANA zone name once; unknown or missing zones are treated as UTC."""
+    if not name:
+        return UTC
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return UTC
+
+
+PACIFIC = zone("America/Los_Angeles")
+
+
+_clock = None   # a fixed Unix time while replaying a capture
+
+
+def set_clock(timestamp=None):
+    """Makes now() return the given Unix time; None goes back to the real clock."""
+    global _clock
+    _clock = timestamp
+
+
+def now(tz=PACIFIC):
+    if _clock is not None:
+        return datetime.fromtimestamp(_clock, tz)
+    return datetime.now(tz)
+
+
+def aware(dt, tz=PACIFIC):
+    """Attaches tz to a naive datetime; aware datetimes are returned as is."""
+    return dt.replace(tzinfo=tz) if dt.tzinfo is None else dt
+
+
+def month_number(text):
+    """Returns 1-12 for a month name or abbreviation ("Nov", "Sept.", "March"), or None."""
+    return MONTH_ABBR.get(text.strip().rstrip(".").lower()) if text else None
+
+
+def parse_iso(value, tz=PACIFIC):
+    """
+    Parses an ISO 8601 string ('2026-02-26 17:00:00', '2026-02-26T17:00:00Z').
+    Naive values are taken to be in tz. Raises ValueError.
+    """
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return aware(datetime.fromisoformat(value), tz)
+
+
+@lru_cache(maxsize=4096)
+def parse(value, tz=PACIFIC):
+    """
+    Parses any date/time string into an aware datetime, or None if it cannot
+    be parsed. Tries the ISO fast path before falling back to dateutil.
+    """
+    if not value:
+        return None
+    try:
+        return parse_iso(value, tz)
+    except ValueError:
+        pass
+    try:
+        return aware(dateutil_parser.parse(value), tz)
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_text(value, year):
+    try:
+        return dateutil_parser.parse(value, default=datetime(year, 1, 1))
+    except (ValueError, OverflowError):
+        return None
+
+
+def _parse_day(text, today, year=None):
+    """
+    A naive midnight for one date, or None. A date without a year is taken
+    in year if given, else it is the next one on or after today.
+    """
+    parsed = _parse_text(text, year or today.year)
+    if parsed is None:
+        return None
+    if not _YEAR.search(text):
+        if parsed.year != (year or today.year):
+            # Some other number was taken for the year
+            return None
+        if year is None and parsed.date() < today:
+            try:
+                parsed = parsed.replace(year=today.year + 1)
+            except ValueError:   # Feb 29
+                return None
+    return parsed.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def parse_date_range(text, tz=PACIFIC, today=None):
+    """
+    Parses a free-form scraped date ('Saturday, October 17, 2026', 'Sat, Jan
+    9') or day range ('November 21 - 22, 2026', 'Dec 30 - Jan 2') into the
+    aware midnights of its first and last day; a single date gives the same
+    day twice. A date without a year is the next one on or after today, and
+    a range without one is the next that has not ended. Returns (None, None)
+    when the text cannot be parsed.
+    """
+    if not text:
+        return None, None
+    try:
+        day = parse_iso(text, tz)
+        return day, day
+    except ValueError:
+        pass
+    today = today or now(tz).date()
+
+    match = _RANGE.search(text)
+    if not match:
+        day = _parse_day(text, today)
+        return (aware(day, tz), aware(day, tz)) if day else (None, None)
+
+    first_text, last_text = text[:match.start()], text[match.end():]
+    if not any(month_number(word) for word in _WORD.findall(last_text)):
+        # "November 21 - 22, 2026": the last day shares the first's month
+        month = next((word for word in _WORD.findall(first_text) if month_number(word)), None)
+        if month is None:
+            return None, None
+        last_text = f"{month} {last_text}"
+    last = _parse_day(last_text, today)
+    if last is None:
+        return None, None
+    if _YEAR.search(first_text):
+        first = _parse_day(first_text, today)
+    else:
+        # The first day takes the last day's year, or the one before ("Dec 30 - Jan 2")
+        first = _parse_day(first_text, today, year=last.year)
+        if first is not None and first.month > last.month:
+            first = _parse_day(first_text, today, year=last.year - 1)
+    if first is None or first > last:
+        return None, None
+    return aware(first, tz), aware(last, tz)
+
+
+def parse_date(text, tz=PACIFIC, today=None):
+    """
+    Parses a free-form scraped date into an aware midnight, or None. For a
+    day range this is its first day (see parse_date_range).
+    """
+    return parse_date_range(text, tz, today)[0]
+
+
+@lru_cache(maxsize=256)
+def parse_clock(text):
+    """
+    Returns (hour, minute) of the start time in a clock text ('7:30 PM',
+    'Noon', 'Gates 5:00 PM / Kickoff 7:30 PM'), or None ('TBD', 'All Day').
+    Gate, door and parking times are passed over for the start.
+    """
+    clocks = []
+    label_start = 0
+    for match in _CLOCK.finditer(text or ""):
+        clocks.append((_NOT_START.search(text, label_start, match.start()) is not None, match))
+        label_start = match.end()
+    if not clocks:
+        return None
+    match = next((match for skipped, match in clocks if not skipped), clocks[0][1])
+    if match.group(4):
+        return (12, 0) if match.group(4).lower() == "noon" else (0, 0)
+    hour = int(match.group(1)) % 12
+    if match.group(3).lower() == "p":
+        hour += 12
+    return hour, int(match.group(2) or 0)
+
+
+def combine(date_text, time_text=None, tz=PACIFIC):
+    """
+    Builds (start, end) aware datetimes from separate date and clock texts,
+    e.g. ('Saturday, October 17, 2026', '7:30 PM'). A missing or
+    unparseable time gives midnight. end is None for a single date; a day
+    range starts on its first day and ends when its last day does. An
+    unparseable date gives (None, None).
+    """
+    first, last = parse_date_range(date_text, tz)
+    if first is None:
+        return None, None
+    clock = parse_clock(time_text)
+    hour, minute = clock if clock else (0, 0)
+    start = first.replace(hour=hour, minute=minute)
+    end = last + timedelta(days=1) if last > first else None
+    return start, end
+
+
+def month_key(dt):
+    """Sortable (year, month) grouping key."""
+    return dt.year, dt.month
+
+
+def month_label(dt):
+    """'October 2026'."""
+    return f"{MONTH_NAMES[dt.month - 1]} {dt.year}"
+
+
+def ordinal(day):
+    if 4 <= day <= 20 or 24 <= day <= 30:
+        return f"{day}th"
+    return f"{day}{('st', 'nd', 'rd')[day % 10 - 1]}"
+
+
+def clock_label(dt):
+    """'5:00 PM' (no leading zero, without platform-specific strftime flags)."""
+    return f"{dt.hour % 12 or 12}:{dt.minute:02d} {'PM' if dt.hour >= 12 else 'AM'}"
@@ -0,0 +1,59 @@
+
+import config
+import datetimes
+import mailer
+import metrics
+import rendering
+
+# --- Combined digest email ---
+#
+# In digest mode the orchestrator collects every source's (subject, html)
+# from compose() instead of letting each one send its own email, then sends
+# them as sections of a single email with a table of contents: one Brevo
+# call per run instead of one per source.
+
+DIGEST = config.flag("DIGEST")
+TITLE = "📬 Event Digest"
+
+
+class Digest:
+    """The sections of one digest email, in the order they were added."""
+
+    def __init__(self, title=TITLE):
+        self.title = title
+        self.sections = []   # (anchor, subject, html)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def add(self, name, subject, html):
+        self.sections.append((f"{name}-{len(self.sections) + 1}", subject, html))
+
+    def subject(self):
+        count = len(self.sections)
+        return f"{self.title} {datetimes.now().strftime('%Y-%m-%d')}: {count} report{'s' if count != 1 else ''}"
+
+    def html(self):
+        report = rendering.Report()
+        report.raw('<a id="top"></a>')
+        report.heading(self.title)
+        report.meta([("Generated", datetimes.now().strftime("%Y-%m-%d %H:%M %Z")), ("Reports", len(self.sections))])
+        contents = "".join(
+            f'<li><a href="#{rendering.escape(anchor)}">{rendering.escape(subject)}</a></li>'
+            for anchor, subject, _ in self.sections
+        )
+        report.raw(f"<ul>{contents}</ul><hr>")
+        for anchor, subject, html in self.sections:
+            report.raw(f'<div id="{rendering.escape(anchor)}">')
+            report.raw(rendering.body(html))
+            report.raw('<p><a href="#top">Back to contents</a></p></div><hr>')
+        return report.html()
+
+    def send(self):
+        """Sends every section in one email. Returns True on success (or when empty)."""
+        if not self.sections:
+            print("Digest empty, no email sent.")
+            return True
+        print(f"Sending digest with {len(self.sections)} reports...")
+        html = metrics.timed("render", self.html)
+        return metrics.timed("send", mailer.send_email_with_brevo, html, self.subject())
@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import time
+
+import datetimes
+import http_cache
+from events import Event, keyed
+
+# --- SQLite event warehouse ---
+#
+# Every run upserts its normalized events here, so scraped data outlives the
+# email it was sent in. Writes are one executemany per source inside a single
+# transaction. Times are stored as UTC ISO strings, which sort
+# chronologically, and two indexes back the common lookups:
+#   (venue, start)       "what is on at <venue> between X and Y"
+#   (source, event_id)   upserts and per-source reads
+# Each source's latest scrape is recorded so its current event list can be
+# read back (and re-reported) without refetching anything.
+
+DB_PATH = os.environ.get("SCRAPER_DB", os.path.join(http_cache.CACHE_DIR, "events.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    source      TEXT NOT NULL,
+    event_id    TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    start       TEXT,
+    end         TEXT,
+    venue       TEXT NOT NULL DEFAULT '',
+    status      TEXT NOT NULL DEFAULT '',
+    result      TEXT NOT NULL DEFAULT '',
+    url         TEXT NOT NULL DEFAULT '',
+    time_tbd    INTEGER NOT NULL DEFAULT 0,
+    date_text   TEXT NOT NULL DEFAULT '',
+    time_text   TEXT NOT NULL DEFAULT '',
+    season      TEXT NOT NULL DEFAULT '',
+    position    INTEGER NOT NULL DEFAULT 0,
+    first_seen  REAL NOT NULL,
+    last_seen   REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS events_source_event_id ON events (source, event_id);
+CREATE INDEX IF NOT EXISTS events_venue_start ON events (venue, start);
+CREATE TABLE IF NOT EXISTS scrapes (
+    source      TEXT PRIMARY KEY,
+    scraped_at  REAL NOT NULL,
+    event_count INTEGER NOT NULL
+);
+"""
+
+# Later scrapes win: an older one (e.g. reprocessed from a capture) never
+# overwrites a newer row, it only widens first_seen / last_seen
+_UPDATED = (
+    "title", "start", "end", "venue", "status", "result", "url", "time_tbd", "date_text", "time_text", "season",
+    "position",
+)
+_SET_IF_NEWER = ",\n    ".join(
+    f"{name} = CASE WHEN excluded.last_seen >= events.last_seen THEN excluded.{name} ELSE events.{name} END"
+    for name in _UPDATED
+)
+
+UPSERT = f"""
+INSERT INTO events (source, event_id, title, start, end, venue, status, result, url,
+                    time_tbd, date_text, time_text, season, position, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, event_id) DO UPDATE SET
+    {_SET_IF_NEWER},
+    first_seen = MIN(events.first_seen, excluded.first_seen),
+    last_seen = MAX(events.last_seen, excluded.last_seen)
+"""
+
+RECORD_SCRAPE = """
+INSERT INTO scrapes (source, scraped_at, event_count) VALUES (?, ?, ?)
+ON CONFLICT (source) DO UPDATE SET scraped_at = excluded.scraped_at, event_count = excluded.event_count
+WHERE excluded.scraped_at >= scrapes.scraped_at
+"""
+
+COLUMNS = "source, event_id, title, start, end, venue, status, result, url, time_tbd, date_text, time_text, season"
+
+
+def _utc(dt):
+    return dt.astimezone(datetimes.UTC).isoformat() if dt else None
+
+
+def _local(value):
+    return datetimes.parse_iso(value).astimezone(datetimes.PACIFIC) if value else None
+
+
+def _row_to_event(row):
+    source, event_id, title, start, end, venue, status, result, url, time_tbd, date_text, time_text, season = row
+    return Event(
+        source=source, title=title, start=_local(start), end=_local(end), venue=venue,
+        status=status, result=result, url=url, id=event_id, time_tbd=bool(time_tbd),
+        date_text=date_text, time_text=time_text, season=season,
+    )
+
+
+class EventStore:
+    def __init__(self, path=DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def upsert(self, source, events, now=None):
+        """Writes one scrape of source in a single transaction. Returns the row count."""
+        return self.upsert_many([(source, events, time.time() if now is None else now)])
+
+    def upsert_many(self, scrapes):
+        """
+        Writes several (source, events, scraped_at) scrapes in one
+        transaction. Returns the total row count.
+        """
+        total = 0
+        with self.conn:
+            for source, events, now in scrapes:
+                rows = [
+                    (source, event_id, event.title, _utc(event.start), _utc(event.end), event.venue,
+                     event.status, event.result, event.url, int(event.time_tbd), event.date_text,
+                     event.time_text, event.season, position, now, now)
+                    for position, (event_id, event) in enumerate(keyed(events).items())
+                ]
+                self.conn.executemany(UPSERT, rows)
+                self.conn.execute(RECORD_SCRAPE, (source, now, len(rows)))
+                total += len(rows)
+        return total
+
+    def sources(self):
+        """{source: (scraped_at, event_count)} for every source ever stored."""
+        rows = self.conn.execute("SELECT source, scraped_at, event_count FROM scrapes")
+        return {source: (scraped_at, count) for source, scraped_at, count in rows}
+
+    def current(self, source):
+        """The events of source's latest scrape, in the order they were scraped."""
+        rows = self.conn.execute(
+            f"SELECT {COLUMNS} FROM events"
+            " WHERE source = ? AND last_seen = (SELECT scraped_at FROM scrapes WHERE source = ?)"
+            " ORDER BY position",
+            (source, source),
+        )
+        return [_row_to_event(row) for row in rows]
+
+    def between(self, start, end, venues=None, venue_prefix=None, sources=None, listed_only=False):
+        """
+        Events starting in [start, end), ordered by start. Optionally limited
+        to exact venues, venues starting with venue_prefix (e.g. "Exposition
+        Park", which matches the park's individual spaces), or sources.
+
+        With listed_only, events that were still upcoming at their source's
+        latest scrape but missing from it (i.e. taken off the schedule) are
+        left out; past events are kept.
+        """
+        clauses = ["start >= ?", "start < ?"]
+        params = [_utc(start), _utc(end)]
+        if venues:
+            clauses.append(f"venue IN ({', '.join('?' * len(venues))})")
+            params.extend(venues)
+        if venue_prefix:
+            # A range on the index instead of LIKE, which cannot use it
+            clauses.append("venue >= ? AND venue < ?")
+            params.extend([venue_prefix, venue_prefix + "\U0010ffff"])
+        if sources:
+            clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        if listed_only:
+            clauses.append(
+                "NOT EXISTS (SELECT 1 FROM scrapes s WHERE s.source = events.source AND events.last_seen < s.scraped_at"
+                " AND events.start > strftime('%Y-%m-%dT%H:%M:%S+00:00', s.scraped_at, 'unixepoch'))"
+            )
+        rows = self.conn.execute(
+            f"SELECT {COLUMNS} FROM events WHERE {' AND '.join(clauses)} ORDER BY start",
+            params,
+        )
+        return [_row_to_event(row) for row in rows]
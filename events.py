@@ -0,0 +1,88 @@
+import hashlib
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+import datetimes
+
+# --- Common event record ---
+#
+# Every extract_* function emits Event records: one compact, immutable shape
+# for all sources, with the start already parsed into an aware datetime.
+# Formatters read attributes instead of re-parsing strings, and to_dict /
+# from_dict give downstream caches and exports a JSON-safe form. Sources that
+# scrape free-form dates and times also keep the text, which is shown when it
+# could not be parsed.
+
+
+def make_id(source, *parts):
+    """Stable id from the source name and whatever identifies the event there."""
+    key = "\x1f".join([source, *(str(part) for part in parts)])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    source: str
+    title: str
+    start: datetime = None     # aware; None when the date is unknown
+    end: datetime = None
+    venue: str = ""
+    status: str = ""
+    result: str = ""
+    url: str = ""
+    id: str = ""
+    time_tbd: bool = False     # only the date of start is known
+    date_text: str = ""        # the scraped date, as published
+    time_text: str = ""        # the scraped time, as published
+    season: str = ""           # e.g. "2026", for sources with seasons
+
+    def date_label(self, fmt="%b %d, %Y", missing="TBD"):
+        """
+        The start date, else the scraped date text, else missing. A scraped
+        day range is shown as published.
+        """
+        if self.start and not (self.date_text and self.spans_days):
+            return self.start.strftime(fmt)
+        return self.date_text or missing
+
+    @property
+    def spans_days(self):
+        """True when the event ends after the day it starts (e.g. a day range)."""
+        return bool(self.start and self.end) and self.end.date() > self.start.date() + timedelta(days=1)
+
+    def time_label(self, fmt=None, missing="TBD"):
+        """
+        The start time ('7:30 PM' unless fmt is given), else the scraped
+        time text ('All Day'), else missing.
+        """
+        if not self.start or self.time_tbd:
+            return self.time_text or missing
+        return self.start.strftime(fmt) if fmt else datetimes.clock_label(self.start)
+
+    def to_dict(self):
+        record = asdict(self)
+        for field in ("start", "end"):
+            if record[field] is not None:
+                record[field] = record[field].isoformat()
+        return record
+
+    @classmethod
+    def from_dict(cls, record):
+        record = dict(record)
+        for field in ("start", "end"):
+            if record.get(field):
+                record[field] = datetimes.parse_iso(record[field]).astimezone(datetimes.PACIFIC)
+        return cls(**record)
+
+
+def keyed(events):
+    """{id: event}; repeated ids (e.g. a doubleheader) get a #n suffix."""
+    by_id = {}
+    for event in events:
+        key = event.id
+        n = 1
+        while key in by_id:
+            n += 1
+            key = f"{event.id}#{n}"
+        by_id[key] = event
+    return by_id
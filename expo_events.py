@@ -3,10 +3,17 @@ import os
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
 import calendar
-from datetime import datetime
-import pytz
 import uuid
-import platform
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import datetimes
+import http_client
+import metrics
+import profiling
+import rendering
+from events import Event, make_id
 # --- 1. USER CONFIGURATION ---
 
 BREVO_API_KEY = os.environ.get("BREVO_API_KEY")
@@ -18,116 +25,144 @@ RECEIVER_NAME = "Pablo Sahagun"
 
 API_BASE = "https://expositionpark.ca.gov/wp-json/tribe/events/v1/events"
 
+# Tribe API pagination: events per page and pages fetched concurrently
+PER_PAGE = 100
+MAX_WORKERS = 4
+
 
 # --- 2. FETCH EVENTS FROM REST API ---
-def format_datetime_nicely(dt_str):
+def format_datetime_nicely(dt, date_only=False):
     """
-    Convert '2026-02-26 17:00:00' → '26th Feb, 5:00 pm'
-    Works on Windows and Unix.
+    Convert datetime(2026, 2, 26, 17, 0) → '26th Feb, 5:00 PM'
+    ('26th Feb' with date_only, for all-day events). Works on Windows and Unix.
     """
-    if not dt_str:
+    if dt is None:
         return ""
+    if date_only:
+        return f"{datetimes.ordinal(dt.day)} {dt:%b}"
+    return f"{datetimes.ordinal(dt.day)} {dt:%b}, {datetimes.clock_label(dt)}"
 
-    try:
-        dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-    except ValueError:
-        return dt_str  # fallback if parsing fails
 
-    day = dt.day
-    # ordinal suffix
-    if 4 <= day <= 20 or 24 <= day <= 30:
-        suffix = "th"
-    else:
-        suffix = ["st", "nd", "rd"][day % 10 - 1]
+def _fetch_api_page(start_date, end_date, page):
+    """Fetches one page of the Tribe events listing."""
+    params = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "status": "publish",
+        "per_page": PER_PAGE,
+        "page": page
+    }
+
+    response = http_client.get(API_BASE, headers="expo-browser", params=params, timeout=20)
+    response.raise_for_status()
+    return metrics.timed("parse", response.json)
+
+
+def _page_events(data):
+    if isinstance(data, dict):
+        return data.get("events") or []
+    return data
+
 
-    # cross-platform no-leading-zero day/hour
-    day_fmt = "%#d" if platform.system() == "Windows" else "%-d"
-    hour_fmt = "%#I" if platform.system() == "Windows" else "%-I"
+def iter_api_pages(start_date, end_date, max_workers=MAX_WORKERS):
+    """
+    Yields the raw event list of every page, in page order.
+    The first page gives total_pages; the remaining pages are fetched
+    concurrently, with at most max_workers pages in flight so memory stays
+    bounded however wide the date range is.
+    """
+    first = _fetch_api_page(start_date, end_date, 1)
+    yield _page_events(first)
+
+    total_pages = int(first.get("total_pages") or 1) if isinstance(first, dict) else 1
+    if total_pages <= 1:
+        return
 
-    month = dt.strftime("%b").capitalize()
+    print(f"Fetching {total_pages - 1} more page(s) of events...")
+    remaining = iter(range(2, total_pages + 1))
 
-    formatted = dt.strftime(f"{day_fmt}{suffix} {month}, {hour_fmt}:%M %p")
-    return formatted
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        pending = deque(
+            executor.submit(metrics.in_context(_fetch_api_page), start_date, end_date, page)
+            for page in islice(remaining, max_workers)
+        )
+        while pending:
+            data = pending.popleft().result()
+            for page in islice(remaining, 1):
+                pending.append(executor.submit(metrics.in_context(_fetch_api_page), start_date, end_date, page))
+            yield _page_events(data)
 
 
-def fetch_expo_events_via_api(start_date, end_date):
+def iter_published_events(pages):
+    """
+    Filters raw API events page by page: only status == 'publish', no
+    "private" titles, venues flattened into one location string.
+    Yields Event records.
+    """
+    seen_ids = set()
+
+    for events_data in pages:
+        with metrics.span("normalize"):
+            for evt in events_data:
+                if evt.get("status") != "publish":
+                    continue
+
+                # Pages fetched concurrently may overlap if the listing shifts
+                event_id = evt.get("id")
+                if event_id is not None:
+                    if event_id in seen_ids:
+                        continue
+                    seen_ids.add(event_id)
+
+                title = evt.get("title", "").strip()
+
+                if "private" in title.lower():
+                    continue
+                url = evt.get("url", "").strip()
+
+                # Handle single or multiple venues
+                venue_field = evt.get("venue")
+                locations = []
+                if isinstance(venue_field, dict):
+                    # Single venue
+                    name = venue_field.get("venue", "").strip()
+                    addr = venue_field.get("address", "").strip()
+                    locations.append(f"{name}, {addr}".strip(", "))
+                elif isinstance(venue_field, list):
+                    # Multiple venues
+                    for v in venue_field:
+                        name = v.get("venue", "").strip()
+                        addr = v.get("address", "").strip()
+                        locations.append(f"{name}, {addr}".strip(", "))
+
+                location_str = " | ".join(locations)
+
+                # Tribe dates are site-local (Pacific) "YYYY-MM-DD HH:MM:SS"
+                yield Event(
+                    source="expo",
+                    title=title,
+                    start=datetimes.parse(evt.get("start_date", "")),
+                    end=datetimes.parse(evt.get("end_date", "")),
+                    venue=location_str,  # combined venues
+                    url=url,
+                    id=make_id("expo", event_id if event_id is not None else url),
+                    time_tbd=bool(evt.get("all_day")),
+                )
+
+
+def fetch_expo_events_via_api(start_date, end_date, max_workers=MAX_WORKERS):
     """
     Fetch events via the Tribe REST API for the given date range.
-    Uses a requests session with headers to avoid 403.
+    Uses the shared session with browser headers to avoid 403.
+    Reads every page of results (see iter_api_pages).
     Handles multiple venues per event.
     Only includes events where status == 'publish'.
     """
-    session = requests.Session()
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        ),
-        "Accept": "application/json, text/javascript, */*; q=0.01",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Referer": "https://expositionpark.ca.gov/calendar/list/page/1/",
-        "Connection": "keep-alive",
-    }
-
-    params = {
-        "start_date": start_date,
-        "end_date": end_date,
-        "status": "publish",
-        "per_page": 100
-    }
-
     try:
-        response = session.get(API_BASE, headers=headers, params=params, timeout=20)
-        response.raise_for_status()
+        events = list(iter_published_events(iter_api_pages(start_date, end_date, max_workers)))
     except requests.exceptions.RequestException as e:
         return [], f"Error fetching API events: {e}"
 
-    data = response.json()
-    events_data = data.get("events") or data
-
-    events = []
-
-    for evt in events_data:
-        if evt.get("status") != "publish":
-            continue
-
-        title = evt.get("title", "").strip()
-
-        if "private" in title.lower():
-            continue
-        url = evt.get("url", "").strip()
-
-        # Handle single or multiple venues
-        venue_field = evt.get("venue")
-        locations = []
-        if isinstance(venue_field, dict):
-            # Single venue
-            name = venue_field.get("venue", "").strip()
-            addr = venue_field.get("address", "").strip()
-            locations.append(f"{name}, {addr}".strip(", "))
-        elif isinstance(venue_field, list):
-            # Multiple venues
-            for v in venue_field:
-                name = v.get("venue", "").strip()
-                addr = v.get("address", "").strip()
-                locations.append(f"{name}, {addr}".strip(", "))
-
-        location_str = " | ".join(locations)
-
-        start_dt = format_datetime_nicely(evt.get("start_date", ""))
-        end_dt = format_datetime_nicely(evt.get("end_date", ""))
-
-        events.append({
-            "Name": title,
-            "URL": url,
-            "Venue": location_str,  # combined venues
-            "Location": location_str,
-            "Start_Date": start_dt,
-            "End_Date": end_dt
-        })
-
     if not events:
         return [], "No events found for that date range."
 
@@ -136,52 +171,33 @@ def fetch_expo_events_via_api(start_date, end_date):
 
 # --- 3. FORMAT EVENTS AS HTML ---
 
+EVENT_TABLE = rendering.TableTemplate([
+    rendering.Column("Event", "title", kind="bold"),
+    rendering.Column("Start Date", lambda event: format_datetime_nicely(event.start, event.time_tbd)),
+    rendering.Column("End Date", lambda event: format_datetime_nicely(event.end, event.time_tbd)),
+    rendering.Column("Location", "venue"),
+    rendering.Column("Link", "url", kind="link"),
+], cellpadding=8, table_style="width:100%; border-collapse:collapse; font-family:Arial;", align_left=False)
+
+
 def format_api_events_as_html(event_list):
-    pacific = pytz.timezone("US/Pacific")
-    generated_at = datetime.now(pacific).strftime("%a %b %d · %I:%M %p %Z")
+    generated_at = datetimes.now().strftime("%a %b %d · %I:%M %p %Z")
     event_count = len(event_list) if event_list else 0
 
     if not event_list:
         return "<h1>Exposition Park Event Report</h1><p>No events found.</p>"
 
-    html = "<html><body>"
-    html += f"<p><b>Generated:</b> {generated_at}<br>"
-    html += f"<b>Total events:</b> {event_count}</p><hr>"
-
-    html += """
-    <table border="1" cellpadding="8"
-           style="width:100%; border-collapse:collapse; font-family:Arial;">
-        <thead>
-            <tr style="background:#f2f2f2;">
-                <th>Event</th>
-                <th>Start Date</th>
-                <th>End Date</th>
-                <th>Location</th>
-                <th>Link</th>
-            </tr>
-        </thead><tbody>
-    """
-
-    for event in event_list:
-        html += f"""
-        <tr>
-            <td><b>{event['Name']}</b></td>
-            <td>{event['Start_Date']}</td>
-            <td>{event['End_Date']}</td>
-            <td>{event['Location']}</td>
-            <td><a href="{event['URL']}">View</a></td>
-        </tr>
-        """
-
-    html += "</tbody></table></body></html>"
-    return html
+    report = rendering.Report()
+    report.meta([("Generated", generated_at), ("Total events", event_count)], rule=True)
+    report.table(EVENT_TABLE, event_list)
+    return report.html()
 
 # --- 4. BREVO EMAIL SENDER ---
 
 def send_email_with_brevo(html_content, subject):
     if not BREVO_API_KEY:
         print("BREVO_API_KEY not set. Email not sent.")
-        return
+        return False
 
     configuration = sib_api_v3_sdk.Configuration()
     configuration.api_key['api-key'] = BREVO_API_KEY
@@ -193,7 +209,7 @@ def send_email_with_brevo(html_content, subject):
     send_email = sib_api_v3_sdk.SendSmtpEmail(
         headers={
             "X-Report-Venue": "Exposition Park",
-            "X-Report-Date": datetime.now().strftime("%Y-%m-%d"),
+            "X-Report-Date": datetimes.now().strftime("%Y-%m-%d"),
             "X-Report-Run-ID": str(uuid.uuid4())
         },
         to=[{"email": RECEIVER_EMAIL, "name": RECEIVER_NAME}],
@@ -205,14 +221,16 @@ def send_email_with_brevo(html_content, subject):
     try:
         api_instance.send_transac_email(send_email)
         print("Email sent successfully.")
+        return True
     except ApiException as e:
         print(f"Email failed: {e}")
+        return False
 
 # --- 5. RUN SCRIPT ---
 
-if __name__ == "__main__":
-    pacific = pytz.timezone("US/Pacific")
-    now = datetime.now(pacific)
+def current_month_range():
+    """Returns (start_date, end_date, month_year) for the current Pacific month."""
+    now = datetimes.now()
 
     # First day of current month
     start_date_dt = now.replace(day=1)
@@ -226,17 +244,36 @@ if __name__ == "__main__":
     end_date = end_date_dt.strftime("%Y-%m-%d")
 
     # Human-readable month/year for subject line
-    month_year = now.strftime("%B %Y")
+    month_year = datetimes.month_label(now)
+
+    return start_date, end_date, month_year
+
+
+def scrape():
+    """Fetches this month's Exposition Park events. Returns (events, error)."""
+    start_date, end_date, _ = current_month_range()
 
     print(f"Fetching events from {start_date} to {end_date}")
 
-    events, error = fetch_expo_events_via_api(start_date, end_date)
+    return fetch_expo_events_via_api(start_date, end_date)
+
 
+def compose(events, error):
+    """The monthly Exposition Park report as (subject, html), or None on error."""
     if error:
         print(error)
-    else:
-        html_report = format_api_events_as_html(events)
-        send_email_with_brevo(
-            html_report,
-            f"Exposition Park {month_year} Events"
-        )
+        return None
+    _, _, month_year = current_month_range()
+    return f"Exposition Park {month_year} Events", format_api_events_as_html(events)
+
+
+def report(events, error):
+    """Formats and sends the monthly Exposition Park report."""
+    email = compose(events, error)
+    if email:
+        subject, html_report = email
+        send_email_with_brevo(html_report, subject)
+
+
+if __name__ == "__main__":
+    profiling.main()
@@ -0,0 +1,24 @@
+import os
+import threading
+
+# --- Atomic file writes ---
+#
+# Caches, indexes, snapshots and exported metrics are rewritten in place while
+# other runs (or node-exporter) may be reading them. Each write goes to a
+# temporary file next to the target and is moved over it with os.replace, so
+# a reader sees either the old file or the new one, never a partial write.
+
+
+def atomic_write(path, data):
+    """Replaces path with data (str, written as UTF-8, or bytes), creating its directory."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if isinstance(data, bytes):
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+    else:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+    os.replace(tmp_path, path)
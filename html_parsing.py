@@ -0,0 +1,50 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+# --- Partial-document parsing for detail pages ---
+#
+# Detail pages are large but we only read a few small subtrees. A SoupStrainer
+# makes BeautifulSoup build only the matching subtrees, which is much cheaper
+# in time and memory than building the whole tree. Callers fall back to a
+# full parse when the strained document misses their selectors.
+
+# lxml is optional: it is faster than html.parser and works with SoupStrainer.
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+
+def class_strainer(*class_names):
+    """
+    SoupStrainer keeping only tags that carry one of class_names.
+    While parsing, bs4 passes the raw class attribute ("header big"), so the
+    match is done per whitespace-separated class.
+    """
+    wanted = set(class_names)
+
+    def has_wanted_class(value):
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return not wanted.isdisjoint(classes)
+
+    return SoupStrainer(class_=has_wanted_class)
+
+
+def parse_partial(content, strainer, parser=None):
+    """Parses only the parts of content matched by strainer."""
+    return BeautifulSoup(content, parser or PARSER, parse_only=strainer)
+
+
+def parse_head_title(content, parser=None):
+    """Returns the <title> tag, parsing only the document head."""
+    marker = b"</head>" if isinstance(content, bytes) else "</head>"
+    end = content.find(marker)
+    head = content[:end] if end != -1 else content
+    return parse_partial(head, SoupStrainer("title"), parser).find("title")
+
+
+def parse_full(content, parser="html.parser"):
+    """The full-document parse used as a fallback."""
+    return BeautifulSoup(content, parser)
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import time
+
+import capture
+import files
+import http_client
+
+# --- On-disk HTTP response cache ---
+#
+# One JSON file per URL holding the response validators (ETag / Last-Modified)
+# and the response body. Later requests send If-None-Match / If-Modified-Since;
+# a 304 answer is served straight from the stored entry.
+
+CACHE_DIR = os.environ.get("SCRAPER_CACHE_DIR", ".cache")
+
+
+def _entry_path(url, cache_dir):
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "http", f"{digest}.json")
+
+
+def load_entry(url, cache_dir=CACHE_DIR):
+    """Returns the cached entry for url, or None if missing or unreadable."""
+    try:
+        with open(_entry_path(url, cache_dir), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if entry.get("url") == url else None
+
+
+def save_entry(entry, cache_dir=CACHE_DIR):
+    """Atomically writes a cache entry to disk."""
+    files.atomic_write(_entry_path(entry["url"], cache_dir), json.dumps(entry))
+
+
+def _conditional_get(url, as_json, session=None, cache_dir=CACHE_DIR, **kwargs):
+    """
+    Performs a conditional GET for url.
+    Returns (body, not_modified) where body is the parsed JSON payload when
+    as_json is set and the response text otherwise.
+    Raises requests.exceptions.RequestException / ValueError like a plain GET.
+    Requests go through the shared pooled session unless one is given.
+    """
+    kind = "json" if as_json else "text"
+    # Captures need every body, and replays have no validators to match
+    revalidate = capture.active() is None
+    entry = load_entry(url, cache_dir) if revalidate else None
+    if entry and entry.get("kind") != kind:
+        entry = None
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = (session or http_client.get_session()).get(url, headers=headers, **kwargs)
+
+    if response.status_code == 304 and entry:
+        entry["checked_at"] = time.time()
+        save_entry(entry, cache_dir)
+        return entry["body"], True
+
+    response.raise_for_status()
+    body = response.json() if as_json else response.text
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if revalidate and (etag or last_modified):
+        now = time.time()
+        save_entry({
+            "url": url,
+            "kind": kind,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": now,
+            "checked_at": now,
+            "body": body,
+        }, cache_dir)
+
+    return body, False
+
+
+def get_json(url, session=None, cache_dir=CACHE_DIR, **kwargs):
+    """Conditional GET returning (parsed JSON payload, not_modified)."""
+    return _conditional_get(url, True, session=session, cache_dir=cache_dir, **kwargs)
+
+
+def get_text(url, session=None, cache_dir=CACHE_DIR, **kwargs):
+    """Conditional GET returning (response text, not_modified)."""
+    return _conditional_get(url, False, session=session, cache_dir=cache_dir, **kwargs)
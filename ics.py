@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+import datetimes
+
+# --- Streaming RFC 5545 (iCalendar) reader ---
+#
+# Consumes an iterable of lines (see iter_lines for a streamed response body),
+# unfolds continuation lines and yields one VEvent per VEVENT block, so
+# calendars of any size are read without holding the whole file in memory.
+
+UTC = datetimes.UTC
+
+
+@dataclass(frozen=True)
+class VEvent:
+    uid: str
+    summary: str
+    location: str
+    start: datetime   # a date for all-day (VALUE=DATE) events
+    end: datetime
+    description: str = ""
+
+    @property
+    def all_day(self):
+        return not isinstance(self.start, datetime)
+
+
+def iter_lines(chunks):
+    """
+    Splits a stream of byte chunks (e.g. response.iter_content()) into lines
+    on LF, dropping the CR of CRLF. Unlike requests' iter_lines, a chunk
+    boundary between CR and LF never produces an extra empty line.
+    """
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if pending:
+        yield pending.rstrip(b"\r")
+
+
+def unfold(lines):
+    """
+    Joins folded lines: a line starting with a space or tab continues the
+    previous one (RFC 5545 section 3.1). Accepts str or bytes lines; bytes are
+    joined before decoding since a fold may split a multi-byte character.
+    Empty lines carry no content and are skipped, so they never cut a fold.
+    """
+    current = None
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.rstrip(b"\r\n")
+            continuation = line[:1] in (b" ", b"\t")
+        else:
+            line = line.rstrip("\r\n")
+            continuation = line[:1] in (" ", "\t")
+        if not line:
+            continue
+        if continuation:
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield _decode(current)
+        current = line
+    if current:
+        yield _decode(current)
+
+
+def _decode(line):
+    return line.decode("utf-8", errors="replace") if isinstance(line, bytes) else line
+
+
+def unescape_text(value):
+    """Decodes TEXT escapes: \\n, \\, \\; and \\\\."""
+    if "\\" not in value:
+        return value
+    out = []
+    chars = iter(value)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            out.append("\n" if escaped in ("n", "N") else escaped)
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+def split_property(line):
+    """Splits 'NAME;PARAM=X:value' into (NAME, {PARAM: X}, value)."""
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    parsed = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parsed[key.upper()] = param_value.strip('"')
+    return name.upper(), parsed, value
+
+
+def parse_datetime(value, params):
+    """
+    Parses a DATE-TIME value into a timezone-aware datetime. A DATE value is
+    a calendar day with no time or zone, and is returned as a date.
+    """
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d").date()
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
+    naive = datetime.strptime(value, "%Y%m%dT%H%M%S")
+    return naive.replace(tzinfo=datetimes.zone(params.get("TZID")))
+
+
+def iter_vevents(lines):
+    """Yields a VEvent for every VEVENT in the line stream."""
+    current = None
+    nested = 0
+    for line in unfold(lines):
+        if line == "BEGIN:VEVENT":
+            current = {}
+            nested = 0
+            continue
+        if current is None:
+            continue
+
+        # Skip sub-components such as VALARM inside the event
+        if line.startswith("BEGIN:"):
+            nested += 1
+            continue
+        if nested:
+            if line.startswith("END:"):
+                nested -= 1
+            continue
+
+        if line == "END:VEVENT":
+            if current.get("start"):
+                yield VEvent(
+                    uid=current.get("uid", ""),
+                    summary=current.get("summary", ""),
+                    location=current.get("location", ""),
+                    start=current["start"],
+                    end=current.get("end"),
+                    description=current.get("description", ""),
+                )
+            current = None
+            continue
+
+        name, params, value = split_property(line)
+        if name in ("SUMMARY", "LOCATION", "DESCRIPTION", "UID"):
+            current[name.lower()] = unescape_text(value)
+        elif name in ("DTSTART", "DTEND"):
+            try:
+                current["start" if name == "DTSTART" else "end"] = parse_datetime(value, params)
+            except ValueError:
+                pass
@@ -0,0 +1,141 @@
+import re
+
+# --- Single-pass JavaScript literal reader ---
+#
+# Finds `<name> = <literal>` in a page and parses the literal (objects, arrays,
+# strings, numbers, true/false/null) straight into Python objects. Handles the
+# JS forms JSON rejects: unquoted keys, single-quoted strings, trailing commas
+# and comments. One compiled token regex is matched at successive offsets
+# into the page and parsing stops as soon as the literal closes, so the page
+# is never copied or rewritten.
+
+# One token per match: leading whitespace/comments are skipped in the same call
+_TOKEN = re.compile(r"""
+    (?:\s+|//[^\n]*|/\*.*?\*/)*
+    (?:
+        (?P<punct>[{}\[\]:,])
+      | "(?P<dq>(?:[^"\\]|\\.)*)"
+      | '(?P<sq>(?:[^'\\]|\\.)*)'
+      | `(?P<bq>(?:[^`\\]|\\.)*)`
+      | (?P<num>-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<ident>[A-Za-z_$][\w$]*)
+    )""", re.VERBOSE | re.DOTALL)
+_SKIP = re.compile(r"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.DOTALL)
+_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", re.DOTALL)
+_SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0", "\n": ""}
+_KEYWORDS = {"true": True, "false": False, "null": None, "undefined": None}
+_STRING_KINDS = ("dq", "sq", "bq")
+
+
+class JSLiteralError(ValueError):
+    pass
+
+
+def _unescape(match):
+    escape = match.group(1)
+    if escape[0] in "ux":
+        return chr(int(escape[1:], 16))
+    return _SIMPLE_ESCAPES.get(escape, escape)
+
+
+class _Reader:
+    def __init__(self, text, pos):
+        self.text = text
+        self.pos = pos
+
+    def error(self, message):
+        return JSLiteralError(f"{message} at offset {self.pos}")
+
+    def token(self):
+        """Consumes the next token. Returns (kind, text)."""
+        match = _TOKEN.match(self.text, self.pos)
+        if not match:
+            raise self.error("unexpected input" if self.pos < len(self.text) else "unexpected end of input")
+        self.pos = match.end()
+        kind = match.lastgroup
+        return kind, match.group(kind)
+
+    def value(self, kind, token):
+        if kind == "punct":
+            if token == "{":
+                return self.object()
+            if token == "[":
+                return self.array()
+            raise self.error(f"unexpected {token!r}")
+        if kind in _STRING_KINDS:
+            return _ESCAPE.sub(_unescape, token) if "\\" in token else token
+        if kind == "num":
+            return float(token) if "." in token or "e" in token or "E" in token else int(token)
+        if token in _KEYWORDS:
+            return _KEYWORDS[token]
+        raise self.error(f"unexpected identifier {token!r}")
+
+    def array(self):
+        items = []
+        while True:
+            kind, token = self.token()
+            if token == "]" and kind == "punct":
+                return items
+            items.append(self.value(kind, token))
+            kind, token = self.token()
+            if kind != "punct" or token not in ",]":
+                raise self.error("expected ',' or ']'")
+            if token == "]":
+                return items
+
+    def object(self):
+        result = {}
+        while True:
+            kind, key = self.token()
+            if kind == "punct":
+                if key == "}":
+                    return result
+                raise self.error("invalid object key")
+            if kind in _STRING_KINDS and "\\" in key:
+                key = _ESCAPE.sub(_unescape, key)
+            if self.token() != ("punct", ":"):
+                raise self.error("expected ':'")
+            result[key] = self.value(*self.token())
+            kind, token = self.token()
+            if kind != "punct" or token not in ",}":
+                raise self.error("expected ',' or '}'")
+            if token == "}":
+                return result
+
+
+def parse_literal(text, pos=0):
+    """Parses the JS literal starting at pos. Returns (value, end offset)."""
+    reader = _Reader(text, pos)
+    value = reader.value(*reader.token())
+    return value, reader.pos
+
+
+def find_assignment(text, name):
+    """Returns the offset of the literal assigned to name, or -1."""
+    start = 0
+    while True:
+        index = text.find(name, start)
+        if index == -1:
+            return -1
+        start = index + len(name)
+        # Must be a whole identifier followed by "=" (not "==")
+        if index and (text[index - 1].isalnum() or text[index - 1] in "_$"):
+            continue
+        if start < len(text) and (text[start].isalnum() or text[start] in "_$"):
+            continue
+        pos = _SKIP.match(text, start).end()
+        if text.startswith("=", pos) and not text.startswith("==", pos):
+            return _SKIP.match(text, pos + 1).end()
+
+
+def extract_assignment(text, name):
+    """
+    Parses the literal assigned to name (e.g. `const gamesData = [...]`).
+    Raises KeyError if there is no such assignment and JSLiteralError if the
+    literal is malformed.
+    """
+    pos = find_assignment(text, name)
+    if pos == -1:
+        raise KeyError(name)
+    value, _ = parse_literal(text, pos)
+    return value
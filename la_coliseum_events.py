@@ -3,6 +3,18 @@ from bs4 import BeautifulSoup
 import os 
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
+from concurrent.futures import ThreadPoolExecutor
+
+import capture
+import datetimes
+import html_parsing
+import http_cache
+import http_client
+import metrics
+import profiling
+import rendering
+from events import Event, make_id
+from record_index import RecordIndex
 
 # --- 1. USER CONFIGURATION for Brevo Email ---
 
@@ -18,149 +30,232 @@ RECEIVER_NAME = "Pablo Sahagun"
 
 # The main URL to scrape
 MAIN_URL = "https://www.lacoliseum.com/events/"
+VENUE = "Los Angeles Memorial Coliseum"
+
+# Detail pages are fetched concurrently. MAX_WORKERS bounds the thread pool and
+# PER_HOST_LIMIT caps how many requests are in flight against any single host.
+MAX_WORKERS = 8
+PER_HOST_LIMIT = 4
+REQUEST_TIMEOUT = 15
+
+SIDEBAR_STRAINER = html_parsing.class_strainer("sidebar-event-detail")
+
+# Incremental crawl: extracted records are reused for INDEX_TTL_SECONDS
+INDEX_PATH = os.path.join(http_cache.CACHE_DIR, "coliseum_index.json")
+INDEX_TTL_SECONDS = 3 * 24 * 3600
 
 # --- 2. CORE SCRAPING LOGIC (Modified) ---
 
-def extract_coliseum_events(main_url):
+def parse_event_page(content, name_fallback):
+    """
+    Extracts (name, full date, start time) from an event page.
+    Only the <head> title and the sidebar detail blocks are parsed; if either
+    is missing, the page is parsed in full.
+    """
+    title_tag = html_parsing.parse_head_title(content)
+    detail_items = html_parsing.parse_partial(content, SIDEBAR_STRAINER).select('.sidebar-event-detail')
+
+    if not title_tag or not detail_items:
+        event_soup = html_parsing.parse_full(content)
+        title_tag = event_soup.select_one('title')
+        detail_items = event_soup.select('.sidebar-event-detail')
+
+    # --- START: EXTRACTION LOGIC REFINED BASED ON SIDEBAR HTML ---
+    name = name_fallback
+    date_full = "N/A"
+    start_time = "N/A"
+
+    # 1. Extract Event Name: Use the HTML <title> for reliability
+    if title_tag:
+         name = title_tag.text.split(' - ')[0].strip()
+
+    # 2. Extract Date and Time from the reliable sidebar elements
+    for item in detail_items:
+        key_tag = item.select_one('.sidebar-event-key')
+        value_tag = item.select_one('.sidebar-event-value')
+
+        if key_tag and value_tag:
+            key = key_tag.text.strip().lower()
+            value = value_tag.text.strip()
+
+            if "date" in key:
+                date_full = value
+            elif "start time" in key:
+                start_time = value
+
+    # --- END: EXTRACTION LOGIC REFINED BASED ON SIDEBAR HTML ---
+
+    return name, date_full, start_time
+
+
+def fetch_event_details(event_url, name_fallback, limiter=None):
+    """
+    Fetches a single event page and extracts Name, Full Date and Start Time.
+    Returns the event record, or None if the page could not be fetched.
+    """
+    try:
+        if limiter:
+            with limiter(event_url):
+                event_response = http_client.get(event_url, timeout=REQUEST_TIMEOUT)
+        else:
+            event_response = http_client.get(event_url, timeout=REQUEST_TIMEOUT)
+        event_response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"   Error fetching event page {event_url}: {e}")
+        return None
+
+    name, date_full, start_time = metrics.timed("parse", parse_event_page, event_response.content, name_fallback)
+
+    return {
+        "Name": name,
+        "Full Date": date_full,
+        "Start Time": start_time,
+        "URL": event_url
+    }
+
+
+def load_index():
+    """The persistent URL -> event record index used for incremental crawls."""
+    return RecordIndex(INDEX_PATH, INDEX_TTL_SECONDS)
+
+
+def extract_coliseum_events(main_url, max_workers=MAX_WORKERS, per_host_limit=PER_HOST_LIMIT, index=None):
     """
     Fetches the LA Coliseum events page, extracts individual event links,
     and then fetches and extracts Name, Full Date, and Start Time for each event.
+
+    Detail pages are fetched on a pool of max_workers threads with at most
+    per_host_limit concurrent requests per host; max_workers=1 crawls serially.
+    Records are returned in listing order.
+
+    With an index (see load_index), detail pages are only fetched for URLs
+    that are new or whose record is older than the index TTL; URLs that left
+    the listing are evicted.
     """
     print(f"--- Fetching main event archive from: {main_url} ---")
 
     try:
-        main_response = requests.get(main_url)
+        main_response = http_client.get(main_url, timeout=REQUEST_TIMEOUT)
         main_response.raise_for_status()
     except requests.exceptions.RequestException as e:
         print(f"Error fetching the main page: {e}")
         return None, f"Error fetching main page: {e}"
 
-    main_soup = BeautifulSoup(main_response.content, 'html.parser')
-    event_details = []
-    
-    event_boxes = main_soup.select('#archives .event-box')
+    with metrics.span("parse"):
+        main_soup = BeautifulSoup(main_response.content, 'html.parser')
+        event_boxes = main_soup.select('#archives .event-box')
 
     if not event_boxes:
         error_msg = "Could not find any event boxes. Check selector."
         print(error_msg)
+        metrics.incr("parse_errors")
         return [], error_msg
 
-    print(f"Found {len(event_boxes)} event links. Fetching details for each...")
-    print("-" * 50)
-    
-    # Process each event link
+    # Collect (url, fallback name) pairs in listing order
+    event_links = []
     for box in event_boxes:
         link_tag = box.select_one('.text a.title')
-        
+
         if link_tag:
             relative_url = link_tag.get('href')
             name_fallback = link_tag.text.strip()
             event_url = relative_url if relative_url.startswith('http') else main_url.rstrip('/') + relative_url
+            event_links.append((event_url, name_fallback))
+
+    # Reuse fresh records from the index and only fetch new or expired pages
+    if index is not None:
+        evicted = index.retain(url for url, _ in event_links)
+        cached = {url: index.get_fresh(url) for url, _ in event_links}
+        to_fetch = [link for link in event_links if cached[link[0]] is None]
+        print(f"Found {len(event_boxes)} event links. "
+              f"{len(event_links) - len(to_fetch)} cached, {len(to_fetch)} to fetch, {evicted} evicted.")
+    else:
+        cached = {}
+        to_fetch = event_links
+        print(f"Found {len(event_boxes)} event links. Fetching details for each...")
+    print("-" * 50)
 
-            print(f"-> Processing event at: {event_url}")
-            
-            try:
-                event_response = requests.get(event_url)
-                event_response.raise_for_status()
-            except requests.exceptions.RequestException as e:
-                print(f"   Error fetching event page {event_url}: {e}")
-                continue
+    limiter = http_client.host_limiter(per_host_limit)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        fetched = dict(zip(
+            (url for url, _ in to_fetch),
+            executor.map(metrics.in_context(lambda link: fetch_event_details(link[0], link[1], limiter)), to_fetch)
+        ))
+
+    if index is not None:
+        for url, event in fetched.items():
+            if event is not None:
+                index.put(url, event)
+            elif index.get(url) is not None:
+                # Keep serving the expired record if the refresh failed
+                fetched[url] = index.get(url)
+        index.save()
+        metrics.count("index_hits", index.hits)
 
-            event_soup = BeautifulSoup(event_response.content, 'html.parser')
-            
-            # --- START: EXTRACTION LOGIC REFINED BASED ON SIDEBAR HTML ---
-            name = name_fallback 
-            date_full = "N/A"
-            start_time = "N/A"
-
-            # 1. Extract Event Name: Use the HTML <title> for reliability
-            title_tag = event_soup.select_one('title')
-            if title_tag:
-                 name = title_tag.text.split(' - ')[0].strip()
-            
-            # 2. Extract Date and Time from the reliable sidebar elements
-            detail_items = event_soup.select('.sidebar-event-detail')
-            
-            for item in detail_items:
-                key_tag = item.select_one('.sidebar-event-key')
-                value_tag = item.select_one('.sidebar-event-value')
-                
-                if key_tag and value_tag:
-                    key = key_tag.text.strip().lower()
-                    value = value_tag.text.strip()
-
-                    if "date" in key:
-                        date_full = value
-                    elif "start time" in key:
-                        start_time = value
-            
-            # --- END: EXTRACTION LOGIC REFINED BASED ON SIDEBAR HTML ---
-
-            event_details.append({
-                "Name": name,
-                "Full Date": date_full,
-                "Start Time": start_time,
-                "URL": event_url
-            })
-            
-            print(f"   Name: {name}")
-            print(f"   Date: {date_full}")
-            print(f"   Time: {start_time}")
-            print("-" * 50)
+    event_details = []
+    with metrics.span("normalize"):
+        for url, _ in event_links:
+            event = cached.get(url) or fetched.get(url)
+            if event is None:
+                continue
 
+            # The index keeps the scraped text; the Event gets the parsed start
+            start, end = datetimes.combine(event['Full Date'], event['Start Time'])
+            event_details.append(Event(
+                source="coliseum",
+                title=event['Name'],
+                start=start,
+                end=end,
+                venue=VENUE,
+                url=event['URL'],
+                id=make_id("coliseum", event['URL']),
+                time_tbd=datetimes.parse_clock(event['Start Time']) is None,
+                date_text=event['Full Date'],
+                time_text=event['Start Time'],
+            ))
+
+            print(f"-> {event['Name']} | {event['Full Date']} | {event['Start Time']} | {event['URL']}")
 
     return event_details, None
 
 # --- 3. FORMATTING AND EMAIL LOGIC (New) ---
-from datetime import datetime
-import pytz
 import uuid
 
+def _time_style(event):
+    # Highlight 'TBD' or missing data in orange
+    if event.time_tbd or event.start is None:
+        return rendering.STYLE_WARN
+    return ""
+
+
+EVENT_TABLE = rendering.TableTemplate([
+    rendering.Column("Event Name", "title", kind="bold"),
+    rendering.Column("Full Date", lambda event: event.date_label("%A, %B %d, %Y", missing="N/A"), width="20%"),
+    rendering.Column("Start Time", lambda event: event.time_label(), style=_time_style, width="15%"),
+    rendering.Column("Event Link", "url", kind="link", link_text="View Event Page"),
+])
+
+
 def format_events_as_html(event_list):
     """Takes the list of scraped events and formats them into a clean HTML table with entropy metadata."""
 
     # --- ENTROPY BLOCK ---
-    pacific = pytz.timezone("US/Pacific")
-    generated_at = datetime.now(pacific).strftime("%a %b %d · %I:%M %p %Z")
+    generated_at = datetimes.now().strftime("%a %b %d · %I:%M %p %Z")
     event_count = len(event_list) if event_list else 0
 
     if not event_list:
         return f"<h1>Coliseum Event Report</h1><p>No upcoming events found.</p><p>Generated at: {generated_at}</p>"
 
-    html_body = "<html><body>"
-    html_body += f"<p><b>Generated at:</b> {generated_at}<br><b>Source:</b> LA Coliseum<br><b>Events detected:</b> {event_count}</p><hr>"
-    html_body += "<h1>🏟️ LA Coliseum Upcoming Events Report</h1>"
-    html_body += f"<p>Found {event_count} upcoming events</p>"
-
-    # Start the HTML table
-    html_body += """
-    <table border="1" cellpadding="10" cellspacing="0" style="width: 100%; border-collapse: collapse; font-family: Arial, sans-serif;">
-        <thead>
-            <tr style="background-color: #f2f2f2;">
-                <th style="text-align: left;">Event Name</th>
-                <th style="text-align: left; width: 20%;">Full Date</th>
-                <th style="text-align: left; width: 15%;">Start Time</th>
-                <th style="text-align: left;">Event Link</th>
-            </tr>
-        </thead>
-        <tbody>
-    """
-
-    for event in event_list:
-        # Highlight 'TBD' or missing data in orange
-        time_style = "color: #ff8c00; font-weight: bold;" if "TBD" in event['Start Time'].upper() or event['Start Time'] == "N/A" else ""
-        
-        html_body += f"""
-            <tr>
-                <td><b>{event['Name']}</b></td>
-                <td>{event['Full Date']}</td>
-                <td style="{time_style}">{event['Start Time']}</td>
-                <td><a href="{event['URL']}" target="_blank">View Event Page</a></td>
-            </tr>
-        """
-
-    html_body += "</tbody></table></body></html>"
-    return html_body
+    report = rendering.Report()
+    report.meta([
+        ("Generated at", generated_at),
+        ("Source", "LA Coliseum"),
+        ("Events detected", event_count),
+    ], rule=True)
+    report.heading("🏟️ LA Coliseum Upcoming Events Report")
+    report.paragraph(f"Found {event_count} upcoming events")
+    report.table(EVENT_TABLE, event_list)
+    return report.html()
 
 
 def send_email_with_brevo(html_content, subject):
@@ -170,7 +265,7 @@ def send_email_with_brevo(html_content, subject):
         print("---")
         print("ERROR: BREVO_API_KEY not found. Please set it as an environment variable.")
         print("---")
-        return
+        return False
 
     print(f"Connecting to Brevo and sending email to {RECEIVER_EMAIL}...")
 
@@ -199,27 +294,39 @@ def send_email_with_brevo(html_content, subject):
         print("Success! Email sent via Brevo.")
         print(f"Message ID: {api_response.message_id}")
         print("---")
+        return True
     except ApiException as e:
         print(f"ERROR: Failed to send email via Brevo: {e}")
+        return False
 
 # --- 4. RUN THE SCRIPT ---
 
-if __name__ == "__main__":
-    
-    # 1. Scrape the data
-    scraped_events, error = extract_coliseum_events(MAIN_URL)
-    
-    email_subject = "LA Coliseum Event Report"
+def scrape():
+    """Scrapes the Coliseum listing and detail pages. Returns (events, error)."""
+    return extract_coliseum_events(MAIN_URL, index=None if capture.active() else load_index())
+
+
+def compose(scraped_events, error):
+    """The Coliseum report (or error email) as (subject, html), or None."""
     if error:
         # Send an error email if scraping fails completely
         error_html = f"<h1>🚨 Scraping Error Report</h1><p>The script failed to retrieve or parse the main event page from {MAIN_URL}.</p><p>Error details: {error}</p>"
-        send_email_with_brevo(error_html, "ACTION REQUIRED: Coliseum Scraping Error")
-        
-    elif scraped_events is not None:
-        # 2. Format the successful data
-        email_body = format_events_as_html(scraped_events)
-        # 3. Send the email
+        return "ACTION REQUIRED: Coliseum Scraping Error", error_html
+
+    if scraped_events is not None:
+        return "LA Coliseum Event Report", format_events_as_html(scraped_events)
+
+    print("Fatal error occurred. Check logs for details. No email sent.")
+    return None
+
+
+def report(scraped_events, error):
+    """Sends the Coliseum report, or an error email if scraping failed."""
+    email = compose(scraped_events, error)
+    if email:
+        email_subject, email_body = email
         send_email_with_brevo(email_body, email_subject)
-        
-    else:
-        print("Fatal error occurred. Check logs for details. No email sent.")
+
+
+if __name__ == "__main__":
+    profiling.main()
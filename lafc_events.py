@@ -3,8 +3,17 @@ import os
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
 
-from datetime import datetime
-import pytz
+import config
+import datetimes
+import http_client
+import ics
+import metrics
+import profiling
+import rendering
+from events import Event, make_id
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
 import uuid
 
 BREVO_API_KEY = os.environ.get("BREVO_API_KEY")
@@ -15,186 +24,205 @@ SENDER_NAME = "LAFC Game Bot"
 RECEIVER_EMAIL = "psahagun@usc.edu"
 RECEIVER_NAME = "Pablo Sahagun"
 
-ICS_URL = "https://raw.githubusercontent.com/jbaranski/majorleaguesoccer-ical/refs/heads/main/calendars/losangelesfc.ics"
+CALENDAR_BASE = "https://raw.githubusercontent.com/jbaranski/majorleaguesoccer-ical/refs/heads/main/calendars/"
+ICS_URL = CALENDAR_BASE + "losangelesfc.ics"
+SCHEDULE_URL = "https://www.lafc.com/schedule"
 
+# All-feed venue sweep: team calendars are read and all matches at BMO
+# Stadium / the Coliseum are reported, not just LAFC's (e.g. visiting clubs'
+# friendlies and cup games). Enable with LAFC_ALL_FEEDS=1 to read every club
+# calendar in the repository (listed through CALENDAR_INDEX_URL), or pick
+# feeds with LAFC_FEEDS: a comma-separated list of .ics names in
+# CALENDAR_BASE ("lagalaxy") or full calendar URLs.
+FEEDS = [feed.strip() for feed in os.environ.get("LAFC_FEEDS", "").split(",") if feed.strip()]
+ALL_FEEDS = bool(FEEDS) or config.flag("LAFC_ALL_FEEDS")
+CALENDAR_INDEX_URL = "https://api.github.com/repos/jbaranski/majorleaguesoccer-ical/contents/calendars"
+MAX_FEED_WORKERS = 8
+CHUNK_SIZE = 8192   # bytes read per step while streaming a calendar
 
-def extract_lafc_games(url):
+PACIFIC = datetimes.PACIFIC
 
-    print(f"Fetching LAFC schedule...")
 
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        return None, str(e)
+def clean_location(raw_location):
+    """Normalizes the LOCATION value to our venue names."""
+    # Remove anything after "/"
+    clean_location = raw_location.split("/")[0].strip()
+    if "BMO Stadium" in clean_location:
+        clean_location = "BMO Stadium"
 
-    lines = response.text.splitlines()
+    elif "Coliseum" in clean_location:
+        clean_location = "Los Angeles Memorial Coliseum"
 
-    games = []
-    current = {}
+    return clean_location
 
-    for line in lines:
 
-        if line.startswith("BEGIN:VEVENT"):
-            current = {}
+def iter_venue_events(lines):
+    """Yields (event, location) for every calendar event at BMO Stadium or the Coliseum."""
+    for event in ics.iter_vevents(lines):
 
-        elif line.startswith("SUMMARY:"):
-            current["Name"] = line.replace("SUMMARY:", "")
+        location = clean_location(event.location)
 
-        elif line.startswith("DTSTART"):
-            current["RawDate"] = line.split(":")[1]
+        if "BMO Stadium" in location or "Coliseum" in location:
+            yield event, location
 
-        elif line.startswith("LOCATION:"):
 
-            raw_location = line.replace("LOCATION:", "")
+def _local(value):
+    """A VEvent start / end in Pacific time; an all-day date is local midnight."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.astimezone(PACIFIC)
+    return datetime.combine(value, time(), PACIFIC)
 
-            # Remove anything after "/"
-            clean_location = raw_location.split("/")[0].strip()
-            if "BMO Stadium" in clean_location:
-                clean_location = "BMO Stadium"
 
-            elif "Coliseum" in clean_location:
-                clean_location = "Los Angeles Memorial Coliseum"
+def game_record(event, location):
+    """Builds the Event for a calendar VEVENT at one of our venues."""
+    return Event(
+        source="lafc",
+        title=event.summary or "N/A",
+        start=_local(event.start),
+        end=_local(event.end),
+        venue=location,
+        url=SCHEDULE_URL,
+        id=make_id("lafc", event.uid or f"{event.start.isoformat()}|{location}"),
+        time_tbd=event.all_day,
+    )
 
-            current["Location"] = clean_location
 
-        elif line.startswith("END:VEVENT"):
+def fetch_venue_events(url):
+    """Streams one calendar feed and returns its (event, location) pairs at our venues."""
+    # The calendar is streamed and parsed line by line
+    response = http_client.get(url, timeout=15, stream=True)
+    response.raise_for_status()
+    # Includes reading the body, which arrives as the lines are parsed
+    with response, metrics.span("parse"):
+        return list(iter_venue_events(ics.iter_lines(response.iter_content(CHUNK_SIZE))))
 
-            location = current.get("Location", "")
 
-            if "BMO Stadium" in location or "Coliseum" in location:
+def extract_lafc_games(url):
 
-                utc = pytz.utc
-                pacific = pytz.timezone("US/Pacific")
+    print(f"Fetching LAFC schedule...")
 
-                raw = current.get("RawDate")
+    try:
+        venue_events = fetch_venue_events(url)
+        with metrics.span("normalize"):
+            games = [game_record(event, location) for event, location in venue_events]
+    except requests.exceptions.RequestException as e:
+        return None, str(e)
 
-                dt = datetime.strptime(raw, "%Y%m%dT%H%M%SZ")
-                dt = utc.localize(dt)
-                dt = dt.astimezone(pacific)
+    print(f"Found {len(games)} LAFC games.")
 
-                formatted_date = dt.strftime("%b %d, %Y")
-                formatted_time = dt.strftime("%I:%M %p PT")
+    return games, None
 
-                games.append({
-                    "Name": current.get("Name", "N/A"),
-                    "Date": formatted_date,
-                    "Time": formatted_time,
-                    "Location": location,
-                    "URL": "https://www.lafc.com/schedule"
-                })
 
-    print(f"Found {len(games)} LAFC games.")
+def feed_url(feed):
+    """A calendar URL from a LAFC_FEEDS entry: a URL, or a calendar name in CALENDAR_BASE."""
+    if "://" in feed:
+        return feed
+    return f"{CALENDAR_BASE}{feed.removesuffix('.ics')}.ics"
 
-    return games, None
 
+def list_calendar_urls():
+    """Every .ics calendar in the feed repository. Raises RequestException or ValueError."""
+    response = http_client.get(CALENDAR_INDEX_URL, timeout=15)
+    response.raise_for_status()
+    listing = response.json()
+    if not isinstance(listing, list):
+        raise ValueError("unexpected calendar listing")
+    return [feed_url(item["name"]) for item in listing if str(item.get("name", "")).endswith(".ics")]
 
-def format_events_as_html(event_list):
 
-    pacific = pytz.timezone("US/Pacific")
-    generated_at = datetime.now(pacific).strftime("%a %b %d · %I:%M %p %Z")
+def sweep_feed_urls(feeds=FEEDS):
+    """The calendars to sweep: the given feeds, or every club calendar in the repository."""
+    if feeds:
+        return [feed_url(feed) for feed in feeds]
+    try:
+        urls = list_calendar_urls()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Could not list the club calendars ({e}), sweeping the LAFC calendar only.")
+        return [ICS_URL]
+    return urls or [ICS_URL]
 
-    html = "<html><body>"
 
-    html += f"<p><b>Generated:</b> {generated_at}<br>"
-    html += f"<b>Total games:</b> {len(event_list)}</p><hr>"
+def extract_venue_matches(feed_urls, max_workers=MAX_FEED_WORKERS):
+    """
+    Fetches several team calendars concurrently and returns every match at
+    BMO Stadium or the Coliseum, sorted by kickoff.
+    A match listed in more than one feed is kept once (same UID, or same
+    kickoff at the same venue). Feeds that fail are skipped; an error is only
+    returned when every feed failed.
+    """
+    print(f"Fetching {len(feed_urls)} MLS calendars...")
+
+    def fetch(url):
+        try:
+            return fetch_venue_events(url)
+        except requests.exceptions.RequestException as e:
+            print(f"   Failed to fetch {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(feed_urls) or 1))) as executor:
+        feeds = list(executor.map(metrics.in_context(fetch), feed_urls))
+
+    if feed_urls and all(feed is None for feed in feeds):
+        return None, "Failed to fetch every calendar feed."
+
+    matches = []
+    seen_uids = set()
+    seen_slots = set()
+    for feed in feeds:
+        for event, location in feed or []:
+            slot = (event.start, location)
+            if (event.uid and event.uid in seen_uids) or slot in seen_slots:
+                continue
+            if event.uid:
+                seen_uids.add(event.uid)
+            seen_slots.add(slot)
+            matches.append((event, location))
+
+    with metrics.span("normalize"):
+        games = sorted((game_record(event, location) for event, location in matches), key=lambda game: game.start)
+
+    print(f"Found {len(games)} matches at BMO Stadium / the Coliseum.")
 
-    html += "<h1>⚽ LAFC Games</h1>"
+    return games, None
 
-    # --- GROUP EVENTS BY MONTH ---
-    grouped = {}
 
-    for event in event_list:
+GAME_TABLE = rendering.TableTemplate([
+    rendering.Column("Match", "title", kind="bold"),
+    rendering.Column("Date", lambda game: game.date_label("%b %d, %Y")),
+    rendering.Column("Time", lambda game: game.time_label("%I:%M %p PT")),
+    rendering.Column("Location", "venue"),
+    rendering.Column("Schedule", "url", kind="link", link_text="View Schedule"),
+], table_style="width:100%; border-collapse:collapse; font-family:Arial; margin-bottom:25px;", align_left=False)
 
-        dt = datetime.strptime(event["Date"], "%b %d, %Y")
-        month_key = dt.strftime("%B %Y")
 
-        if month_key not in grouped:
-            grouped[month_key] = []
+def format_events_as_html(event_list):
 
-        grouped[month_key].append(event)
+    generated_at = datetimes.now().strftime("%a %b %d · %I:%M %p %Z")
 
-    # --- BUILD HTML ---
-    for month in grouped:
+    report = rendering.Report()
+    report.meta([("Generated", generated_at), ("Total games", len(event_list))], rule=True)
+    report.heading("⚽ LAFC Games")
 
-        html += f"<h2>{month}</h2>"
-
-        html += """
-        <table border="1" cellpadding="10" cellspacing="0"
-        style="width:100%; border-collapse:collapse; font-family:Arial; margin-bottom:25px;">
-        <thead>
-        <tr style="background-color:#f2f2f2;">
-        <th>Match</th>
-        <th>Date</th>
-        <th>Time</th>
-        <th>Location</th>
-        <th>Schedule</th>
-        </tr>
-        </thead>
-        <tbody>
-        """
-
-        for event in grouped[month]:
-
-            html += f"""
-            <tr>
-            <td><b>{event['Name']}</b></td>
-            <td>{event['Date']}</td>
-            <td>{event['Time']}</td>
-            <td>{event['Location']}</td>
-            <td><a href="{event['URL']}">View Schedule</a></td>
-            </tr>
-            """
-
-        html += "</tbody></table>"
-
-    html += "</body></html>"
-
-    return html
-
-    pacific = pytz.timezone("US/Pacific")
-    generated_at = datetime.now(pacific).strftime("%a %b %d · %I:%M %p %Z")
-
-    html = "<html><body>"
-
-    html += f"<p><b>Generated:</b> {generated_at}<br>"
-    html += f"<b>Total games:</b> {len(event_list)}</p><hr>"
-
-    html += "<h1>LAFC Games</h1>"
-
-    html += """
-    <table border="1" cellpadding="10" cellspacing="0"
-    style="width:100%; border-collapse:collapse; font-family:Arial;">
-    <thead>
-    <tr style="background-color:#f2f2f2;">
-    <th>Match</th>
-    <th>Date</th>
-    <th>Time</th>
-    <th>Location</th>
-    <th>Schedule</th>
-    </tr>
-    </thead>
-    <tbody>
-    """
+    # --- GROUP EVENTS BY MONTH ---
+    grouped = {}
 
     for event in event_list:
+        grouped.setdefault(datetimes.month_label(event.start), []).append(event)
 
-        html += f"""
-        <tr>
-        <td><b>{event['Name']}</b></td>
-        <td>{event['Date']}</td>
-        <td>{event['Time']}</td>
-        <td>{event['Location']}</td>
-        <td><a href="{event['URL']}">View Schedule</a></td>
-        </tr>
-        """
-
-    html += "</tbody></table></body></html>"
+    # --- BUILD HTML ---
+    for month in grouped:
+        report.heading(month, level=2)
+        report.table(GAME_TABLE, grouped[month])
 
-    return html
+    return report.html()
 
 
 def send_email_with_brevo(html_content, subject):
+    if not BREVO_API_KEY:
+        print("BREVO_API_KEY not set. Email not sent.")
+        return False
 
     run_id = str(uuid.uuid4())
 
@@ -217,18 +245,34 @@ def send_email_with_brevo(html_content, subject):
     try:
         api_instance.send_transac_email(send_smtp_email)
         print("Email sent successfully")
-
+        return True
     except ApiException as e:
         print("Email failed:", e)
+        return False
 
 
-if __name__ == "__main__":
+def scrape():
+    """Fetches the LAFC calendar (or, in sweep mode, every swept calendar). Returns (events, error)."""
+    if ALL_FEEDS:
+        return extract_venue_matches(sweep_feed_urls())
+    return extract_lafc_games(ICS_URL)
 
-    events, error = extract_lafc_games(ICS_URL)
 
+def compose(events, error):
+    """The LAFC report as (subject, html), or None on error."""
     if error:
         print(error)
-    else:
-        html = format_events_as_html(events)
-        # print(html)
-        send_email_with_brevo(html, "LAFC Games")
+        return None
+    return "LAFC Games", format_events_as_html(events)
+
+
+def report(events, error):
+    """Formats and sends the LAFC report."""
+    email = compose(events, error)
+    if email:
+        subject, html = email
+        send_email_with_brevo(html, subject)
+
+
+if __name__ == "__main__":
+    profiling.main()
@@ -0,0 +1,52 @@
+import os
+import uuid
+from functools import lru_cache
+
+import sib_api_v3_sdk
+from sib_api_v3_sdk.rest import ApiException
+
+# --- Shared Brevo sender ---
+#
+# Used for emails that do not belong to a single source module (e.g. change
+# reports and digests from the orchestrator). Same account and recipient as
+# the source scripts. The API client is built once per process and reused.
+
+BREVO_API_KEY = os.environ.get("BREVO_API_KEY")
+
+SENDER_EMAIL = "info@abhinavvadhera.me"
+SENDER_NAME = "Event Bot"
+
+RECEIVER_EMAIL = "psahagun@usc.edu"
+RECEIVER_NAME = "Pablo Sahagun"
+
+
+@lru_cache(maxsize=None)
+def _api(api_key):
+    configuration = sib_api_v3_sdk.Configuration()
+    configuration.api_key['api-key'] = api_key
+    return sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+
+
+def send_email_with_brevo(html_content, subject, sender_name=SENDER_NAME):
+    """Sends one HTML email. Returns True on success."""
+    if not BREVO_API_KEY:
+        print("ERROR: BREVO_API_KEY not found, email not sent.")
+        return False
+
+    api_instance = _api(BREVO_API_KEY)
+
+    send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+        to=[{"email": RECEIVER_EMAIL, "name": RECEIVER_NAME}],
+        sender={"email": SENDER_EMAIL, "name": sender_name},
+        subject=subject,
+        html_content=html_content,
+        headers={"X-Run-ID": str(uuid.uuid4())}
+    )
+
+    try:
+        api_instance.send_transac_email(send_smtp_email)
+        print("Email sent successfully")
+        return True
+    except ApiException as e:
+        print("Email failed:", e)
+        return False
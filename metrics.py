@@ -0,0 +1,174 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import profiling
+
+# --- Run metrics ---
+#
+# A process-wide collector of where a run's time goes, written as one JSON
+# file per orchestrator run:
+#   spans     total seconds and count per (source, phase); phases are fetch,
+#             parse, normalize, render and send, plus the orchestrator's
+#             coarser import / scrape / compare / store / report, which
+#             contain them
+#   requests  one record per HTTP response: URL, status, latency and bytes
+#             (recorded by a response hook on the shared session)
+#   counts    per-source numbers such as events extracted
+# The current source travels in a context variable. Sources that fan work
+# out to their own thread pools wrap the task with in_context() so that
+# requests made on those threads are still attributed to them. With
+# profiling on, the scrape / render / send spans are also profiled (see
+# profiling.py).
+
+METRICS_DIR = os.environ.get(
+    "SCRAPER_METRICS_DIR", os.path.join(os.environ.get("SCRAPER_CACHE_DIR", ".cache"), "metrics")
+)
+
+_source = contextvars.ContextVar("metrics_source", default=None)
+
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.spans = {}      # (source, phase) -> [seconds, count]
+        self.requests = []
+        self.counts = {}     # (source, name) -> value
+
+    def add_span(self, source, phase, seconds):
+        with self.lock:
+            span = self.spans.setdefault((source, phase), [0.0, 0])
+            span[0] += seconds
+            span[1] += 1
+
+    def add_request(self, record):
+        with self.lock:
+            self.requests.append(record)
+
+    def set_count(self, source, name, value):
+        with self.lock:
+            self.counts[(source, name)] = value
+
+    def add_count(self, source, name, amount=1):
+        with self.lock:
+            self.counts[(source, name)] = self.counts.get((source, name), 0) + amount
+
+    def for_source(self, source):
+        """{"phases": {phase: seconds}, "counts": {...}, "requests": [...]} for one source."""
+        with self.lock:
+            return {
+                "phases": {phase: seconds for (name, phase), (seconds, _) in self.spans.items() if name == source},
+                "counts": {key: value for (name, key), value in self.counts.items() if name == source},
+                "requests": [record for record in self.requests if record["source"] == source],
+            }
+
+    def to_dict(self):
+        with self.lock:
+            sources = {}
+            for (source, phase), (seconds, count) in self.spans.items():
+                entry = sources.setdefault(source or "-", {"phases": {}, "counts": {}})
+                entry["phases"][phase] = {"seconds": round(seconds, 6), "count": count}
+            for (source, name), value in self.counts.items():
+                sources.setdefault(source or "-", {"phases": {}, "counts": {}})["counts"][name] = value
+            for record in self.requests:
+                entry = sources.setdefault(record["source"] or "-", {"phases": {}, "counts": {}})
+                counts = entry["counts"]
+                counts["requests"] = counts.get("requests", 0) + 1
+                counts["bytes"] = counts.get("bytes", 0) + (record["bytes"] or 0)
+            return {
+                "started_at": self.started_at,
+                "finished_at": time.time(),
+                "sources": sources,
+                "requests": list(self.requests),
+            }
+
+    def write(self, path=None):
+        """Writes the metrics as JSON (to METRICS_DIR/<start time>.json by default). Returns the path."""
+        if path is None:
+            stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(self.started_at))
+            path = os.path.join(METRICS_DIR, f"{stamp}.json")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        return path
+
+
+_current = RunMetrics()
+
+
+def current():
+    return _current
+
+
+def reset():
+    """Starts a new collector (e.g. for the next run in the same process)."""
+    global _current
+    _current = RunMetrics()
+    return _current
+
+
+@contextmanager
+def source(name):
+    """Attributes everything recorded inside the block to source name."""
+    token = _source.set(name)
+    try:
+        yield
+    finally:
+        _source.reset(token)
+
+
+@contextmanager
+def span(phase):
+    start = time.perf_counter()
+    try:
+        with profiling.phase(_source.get(), phase):
+            yield
+    finally:
+        _current.add_span(_source.get(), phase, time.perf_counter() - start)
+
+
+def timed(phase, func, *args, **kwargs):
+    """Calls func inside a span of phase."""
+    with span(phase):
+        return func(*args, **kwargs)
+
+
+def count(name, value):
+    _current.set_count(_source.get(), name, value)
+
+
+def incr(name, amount=1):
+    _current.add_count(_source.get(), name, amount)
+
+
+def in_context(func):
+    """Wraps func to run in (a copy of) the caller's context, e.g. on pool threads."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(profiling.in_thread, func, *args, **kwargs)
+
+
+def record_response(response, *args, **kwargs):
+    """requests response hook: one record per response, and its latency as a fetch span."""
+    if kwargs.get("stream"):
+        # The body has not been read yet; fall back to the declared length
+        length = response.headers.get("Content-Length")
+        size = int(length) if length and length.isdigit() else None
+    else:
+        size = len(response.content)
+    seconds = response.elapsed.total_seconds()
+    source_name = _source.get()
+    _current.add_request({
+        "source": source_name,
+        "url": response.url,
+        "status": response.status_code,
+        "seconds": round(seconds, 6),
+        "bytes": size,
+    })
+    _current.add_span(source_name, "fetch", seconds)
+    return response
@@ -0,0 +1,159 @@
+import math
+import os
+import time
+
+import files
+import metrics
+
+# --- Prometheus textfile export ---
+#
+# After each run, one scraper_<source>.prom file per source is written in the
+# text exposition format, for node-exporter's textfile collector
+# (--collector.textfile.directory=<TEXTFILE_DIR>). One file per source means
+# the daily, weekly and monthly groups never overwrite each other's series.
+#
+#   scraper_up                              1 if the last run scraped cleanly
+#   scraper_last_run_timestamp_seconds      when the last run started
+#   scraper_last_success_timestamp_seconds  the last clean scrape, from the
+#                                           event store, so it survives failures
+#   scraper_events                          events extracted by the last run
+#   scraper_parse_errors                    pages or items the parser rejected
+#   scraper_cache_hit_ratio                 (304s + detail index hits) over
+#                                           (responses + detail index hits)
+#   scraper_http_responses{code}            responses by status code
+#   scraper_phase_seconds{phase}            time per phase (fetch, parse, ...)
+#   scraper_fetch_duration_seconds          histogram of request latencies
+#
+# Everything describes the source's last run (freshness alerts compare
+# scraper_last_success_timestamp_seconds with time()). Files are written to a
+# temporary name and renamed, so the collector never reads a partial file.
+
+TEXTFILE_DIR = os.environ.get(
+    "SCRAPER_TEXTFILE_DIR", os.path.join(os.environ.get("SCRAPER_CACHE_DIR", ".cache"), "textfile")
+)
+
+# Upper bounds (seconds) of the fetch duration histogram buckets
+BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+FAMILIES = {
+    "scraper_up": ("gauge", "Whether the source's last run scraped without errors."),
+    "scraper_last_run_timestamp_seconds": ("gauge", "Start of the source's last run."),
+    "scraper_last_success_timestamp_seconds": ("gauge", "Time of the source's last successful scrape."),
+    "scraper_events": ("gauge", "Events extracted by the last run."),
+    "scraper_parse_errors": ("gauge", "Pages or items the parser rejected in the last run."),
+    "scraper_cache_hit_ratio": ("gauge", "Share of pages served by conditional GETs or the detail index."),
+    "scraper_http_responses": ("gauge", "HTTP responses in the last run, by status code."),
+    "scraper_phase_seconds": ("gauge", "Seconds spent per phase in the last run."),
+    "scraper_fetch_duration_seconds": ("histogram", "HTTP request latency in the last run."),
+}
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _sample(name, labels, value):
+    label_text = ",".join(f'{key}="{escape(val)}"' for key, val in labels.items())
+    return f"{name}{{{label_text}}} {_number(value)}"
+
+
+def cache_hit_ratio(requests, index_hits=0):
+    """(304 responses + index hits) / (responses + index hits), or None with nothing to count."""
+    total = len(requests) + index_hits
+    if not total:
+        return None
+    return (sum(1 for record in requests if record["status"] == 304) + index_hits) / total
+
+
+def format_source(name, up, started_at, last_success=None, snapshot=None):
+    """
+    The exposition text for one source. snapshot is metrics.RunMetrics.for_source();
+    last_success is a Unix timestamp (left out when the source never succeeded).
+    """
+    snapshot = snapshot or {"phases": {}, "counts": {}, "requests": []}
+    counts = snapshot["counts"]
+    requests = snapshot["requests"]
+    source = {"source": name}
+    samples = {family: [] for family in FAMILIES}
+
+    samples["scraper_up"].append(_sample("scraper_up", source, 1 if up else 0))
+    samples["scraper_last_run_timestamp_seconds"].append(
+        _sample("scraper_last_run_timestamp_seconds", source, float(started_at))
+    )
+    if last_success is not None:
+        samples["scraper_last_success_timestamp_seconds"].append(
+            _sample("scraper_last_success_timestamp_seconds", source, float(last_success))
+        )
+    if "events" in counts:
+        samples["scraper_events"].append(_sample("scraper_events", source, counts["events"]))
+    samples["scraper_parse_errors"].append(_sample("scraper_parse_errors", source, counts.get("parse_errors", 0)))
+
+    ratio = cache_hit_ratio(requests, counts.get("index_hits", 0))
+    if ratio is not None:
+        samples["scraper_cache_hit_ratio"].append(_sample("scraper_cache_hit_ratio", source, float(ratio)))
+
+    statuses = {}
+    for record in requests:
+        statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+    for code, count in sorted(statuses.items()):
+        samples["scraper_http_responses"].append(_sample("scraper_http_responses", {**source, "code": code}, count))
+
+    for phase, seconds in sorted(snapshot["phases"].items()):
+        samples["scraper_phase_seconds"].append(
+            _sample("scraper_phase_seconds", {**source, "phase": phase}, float(seconds))
+        )
+
+    durations = [record["seconds"] for record in requests]
+    for bound in BUCKETS + (math.inf,):
+        samples["scraper_fetch_duration_seconds"].append(_sample(
+            "scraper_fetch_duration_seconds_bucket", {**source, "le": _number(float(bound))},
+            sum(1 for seconds in durations if seconds <= bound),
+        ))
+    samples["scraper_fetch_duration_seconds"].append(
+        _sample("scraper_fetch_duration_seconds_sum", source, float(sum(durations)))
+    )
+    samples["scraper_fetch_duration_seconds"].append(
+        _sample("scraper_fetch_duration_seconds_count", source, len(durations))
+    )
+
+    lines = []
+    for family, (kind, help_text) in FAMILIES.items():
+        if samples[family]:
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            lines.extend(samples[family])
+    return "\n".join(lines) + "\n"
+
+
+def write(name, text, directory=TEXTFILE_DIR):
+    """Atomically replaces <directory>/scraper_<name>.prom. Returns the path."""
+    path = os.path.join(directory, f"scraper_{name}.prom")
+    files.atomic_write(path, text)
+    return path
+
+
+def export(statuses, last_success=None, directory=TEXTFILE_DIR, run_metrics=None):
+    """
+    Writes one file per source. statuses maps source names to whether they
+    succeeded in this run; last_success maps them to their last successful
+    scrape time. Returns the paths written.
+    """
+    run_metrics = run_metrics or metrics.current()
+    last_success = last_success or {}
+    paths = []
+    for name, up in statuses.items():
+        text = format_source(
+            name, up, run_metrics.started_at,
+            last_success=last_success.get(name, time.time() if up else None),
+            snapshot=run_metrics.for_source(name),
+        )
+        paths.append(write(name, text, directory))
+    return paths
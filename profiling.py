@@ -0,0 +1,229 @@
+import argparse
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import capture
+import config
+import metrics
+
+# --- Profiling mode ---
+#
+# With --profile (or SCRAPER_PROFILE=1), each source's scrape, render and
+# send phases (extract, format, send) run under cProfile and tracemalloc,
+# and every phase leaves two files in a per-run directory:
+#   <PROFILE_DIR>/<run>/<source>.<phase>.pstats     python -m pstats / snakeviz
+#   <PROFILE_DIR>/<run>/<source>.<phase>.alloc.txt  peak traced memory, the top
+#                                                   allocation sites still live
+#                                                   when the phase ended, and
+#                                                   the top functions
+# Phases are entered through metrics.span(), so no scraper needs to know about
+# profiling. cProfile only sees the thread that enabled it, so pool tasks
+# wrapped with metrics.in_context() get a profiler of their own, merged into
+# the phase's stats (on Python 3.12+, where a single profiler already covers
+# every thread, they simply run under it). tracemalloc is process-wide, so
+# profiled runs scrape one source at a time.
+
+PROFILE = config.flag("SCRAPER_PROFILE")
+PROFILE_DIR = os.environ.get(
+    "SCRAPER_PROFILE_DIR", os.path.join(os.environ.get("SCRAPER_CACHE_DIR", ".cache"), "profiles")
+)
+TOP_N = int(os.environ.get("SCRAPER_PROFILE_TOP", "25"))
+
+# The metrics phases that are profiled
+PHASES = ("scrape", "render", "send")
+
+# Allocation sites that are profiling overhead rather than scraper work
+IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+_active = contextvars.ContextVar("profiling_phase", default=None)
+
+
+class _Phase:
+    """The profilers of one (source, phase): the phase's own and its pool threads'."""
+
+    def __init__(self, source, phase):
+        self.source = source
+        self.phase = phase
+        self.lock = threading.Lock()
+        self.profiles = []
+
+    def add(self, profile):
+        with self.lock:
+            self.profiles.append(profile)
+
+
+class Profiler:
+    def __init__(self, directory=PROFILE_DIR, top=TOP_N):
+        run_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        base, n = run_id, 1
+        while os.path.exists(os.path.join(directory, run_id)):
+            n += 1
+            run_id = f"{base}-{n}"
+        self.run_dir = os.path.join(directory, run_id)
+        self.top = top
+        self.lock = threading.Lock()
+        os.makedirs(self.run_dir)
+
+    @contextmanager
+    def phase(self, source, phase):
+        """Profiles the block as source's phase. Nested phases stay part of the outer one."""
+        if _active.get() is not None:
+            yield
+            return
+        state = _Phase(source or "-", phase)
+        token = _active.set(state)
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            _active.reset(token)
+            state.add(profile)
+            self._write(state, seconds, snapshot, peak)
+
+    def _write(self, state, seconds, snapshot, peak):
+        name = f"{state.source}.{state.phase}"
+        stats = pstats.Stats(*state.profiles)
+        stats.dump_stats(os.path.join(self.run_dir, f"{name}.pstats"))
+
+        allocations = snapshot.filter_traces(IGNORED_ALLOCATIONS).statistics("lineno")
+        lines = [
+            f"{name}: {seconds:.3f}s, peak traced memory {peak / 1024 / 1024:.1f} MiB, "
+            f"{len(state.profiles)} profiled thread(s)",
+            "",
+            f"Top {self.top} allocation sites live at the end of the phase:",
+        ]
+        lines.extend(f"  {stat}" for stat in allocations[:self.top])
+
+        functions = io.StringIO()
+        pstats.Stats(*state.profiles, stream=functions).sort_stats("cumulative").print_stats(self.top)
+        lines += ["", f"Top {self.top} functions by cumulative time:", functions.getvalue()]
+        with open(os.path.join(self.run_dir, f"{name}.alloc.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        print(f"[{state.source}] profiled {state.phase}: {seconds:.2f}s, peak {peak / 1024 / 1024:.1f} MiB")
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return self.run_dir
+
+
+_profiler = None
+
+
+def start(directory=PROFILE_DIR, top=TOP_N):
+    """Turns profiling on for the rest of the process. Returns the Profiler."""
+    global _profiler
+    _profiler = Profiler(directory, top)
+    print(f"Profiling to {_profiler.run_dir}")
+    return _profiler
+
+
+def stop():
+    """Turns profiling off. Returns the run directory, or None if it was not on."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    return profiler.stop() if profiler else None
+
+
+def active():
+    return _profiler
+
+
+def phase(source, name):
+    """A context manager profiling source's phase name, if profiling is on and name is in PHASES."""
+    profiler = _profiler
+    if profiler is None or name not in PHASES:
+        return _nothing()
+    return profiler.phase(source, name)
+
+
+@contextmanager
+def _nothing():
+    yield
+
+
+def in_thread(func, *args, **kwargs):
+    """Calls func, profiled into the caller's phase when one is active (for pool threads)."""
+    state = _active.get()
+    if state is None:
+        return func(*args, **kwargs)
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiler is already active (Python 3.12+) and covers this thread
+        return func(*args, **kwargs)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.disable()
+        state.add(profile)
+
+
+def main(module=None, argv=None, name=None):
+    """
+    Entry point for running a source module (by default the __main__ one)
+    as a script: scrape, compose and send its report, with --profile
+    profiling each phase. With SCRAPER_REPLAY set, the report is written to
+    the replay directory instead of being emailed.
+    """
+    module = module or sys.modules["__main__"]
+    name = name or os.path.splitext(os.path.basename(module.__file__))[0]
+    parser = argparse.ArgumentParser(prog=name, description=(module.__doc__ or "").strip() or None)
+    parser.add_argument("--profile", action="store_true", default=PROFILE,
+                        help="profile the scrape / render / send phases (or SCRAPER_PROFILE=1)")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR,
+                        help="where the profile run directory goes (default %(default)s, or SCRAPER_PROFILE_DIR)")
+    args = parser.parse_args(argv)
+
+    send = _replay_sender(name) if capture.REPLAY else module.send_email_with_brevo
+    if not args.profile:
+        if capture.REPLAY:
+            email = module.compose(*module.scrape())
+            if email:
+                send(email[1], email[0])
+        else:
+            module.report(*module.scrape())
+        return
+
+    start(args.profile_dir)
+    try:
+        with metrics.source(name):
+            events, error = metrics.timed("scrape", module.scrape)
+            email = metrics.timed("render", module.compose, events, error)
+            if email:
+                subject, html = email
+                metrics.timed("send", send, html, subject)
+    finally:
+        print(f"Profiles written to {stop()}")
+
+
+def _replay_sender(name):
+    """Stands in for a module's sender during a replay, so archived runs never send email."""
+    def save(html, subject):
+        print(f"Replay: '{subject}' written to {capture.save_report(name, html)}, not emailed.")
+        return True
+    return save
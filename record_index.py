@@ -0,0 +1,98 @@
+import json
+import time
+
+import files
+
+# --- Persistent URL -> extracted record index ---
+#
+# Lets detail-page crawls skip pages they have already extracted. Each entry
+# remembers when it was fetched; entries older than the TTL are re-fetched and
+# entries whose URL left the listing are evicted. Entries can also carry the
+# page's ETag / Last-Modified so expired ones are revalidated with a
+# conditional GET, and an optional max_entries cap evicts the least recently
+# used entries on save.
+
+
+class RecordIndex:
+    def __init__(self, path, ttl_seconds, max_entries=None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        """Atomically writes the index to disk, applying the LRU size cap."""
+        self._evict_lru()
+        files.atomic_write(self.path, json.dumps(self.entries))
+
+    def get(self, url):
+        """Returns the stored record for url regardless of age, or None."""
+        entry = self.entries.get(url)
+        return entry["record"] if entry else None
+
+    def get_fresh(self, url, now=None):
+        """Returns the stored record if it is younger than the TTL, else None."""
+        entry = self.entries.get(url)
+        now = time.time() if now is None else now
+        if not entry or now - entry["fetched_at"] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["used_at"] = now
+        return entry["record"]
+
+    def put(self, url, record, etag=None, last_modified=None, now=None):
+        now = time.time() if now is None else now
+        self.entries[url] = {
+            "record": record,
+            "fetched_at": now,
+            "used_at": now,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def validators(self, url):
+        """Conditional request headers for url's stored entry."""
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def touch(self, url, now=None):
+        """Marks url's entry fresh again after a 304 and returns its record."""
+        entry = self.entries[url]
+        entry["fetched_at"] = entry["used_at"] = time.time() if now is None else now
+        self.revalidated += 1
+        return entry["record"]
+
+    def stats(self):
+        return f"{self.hits} hits, {self.misses} misses, {self.revalidated} revalidated"
+
+    def _evict_lru(self):
+        if not self.max_entries or len(self.entries) <= self.max_entries:
+            return
+        by_use = sorted(self.entries, key=lambda url: self.entries[url].get("used_at", 0))
+        for url in by_use[:len(self.entries) - self.max_entries]:
+            del self.entries[url]
+
+    def retain(self, urls):
+        """Evicts every entry whose URL is not in urls. Returns the number evicted."""
+        keep = set(urls)
+        removed = [url for url in self.entries if url not in keep]
+        for url in removed:
+            del self.entries[url]
+        return len(removed)
@@ -0,0 +1,151 @@
+import html
+from dataclasses import dataclass
+from operator import attrgetter
+
+# --- Shared HTML email rendering ---
+#
+# Report tables are described once as a TableTemplate. The header markup and
+# a row format string are built when the template is defined; rendering a
+# table pulls each column's values out of the rows, escapes a whole column
+# in one html.escape() call and formats every row with map(), so the only
+# per-row Python work is the column getters. Parts go into a list that is
+# joined once at the end instead of growing one string with `html +=`.
+
+TABLE_STYLE = "width:100%; border-collapse:collapse; font-family:Arial,sans-serif;"
+HEADER_ROW_STYLE = "background-color:#f2f2f2;"
+
+# Cell styles shared by several reports
+STYLE_GOOD = "font-weight:bold; color:#1a7f37;"
+STYLE_BAD = "font-weight:bold; color:#b42318;"
+STYLE_MUTED = "color:#666;"
+STYLE_WARN = "color:#ff8c00; font-weight:bold;"
+
+# Joins a column's values for escaping; html.escape leaves it untouched
+_CELL_SEP = "\0"
+
+
+def escape(value):
+    """HTML-escapes a scraped value (None renders as an empty cell)."""
+    return "" if value is None else html.escape(str(value), quote=True)
+
+
+def escape_all(values):
+    """Escapes a list of values with one html.escape() over the joined column."""
+    cells = ["" if value is None else str(value) for value in values]
+    escaped = html.escape(_CELL_SEP.join(cells), quote=True).split(_CELL_SEP)
+    if len(escaped) != len(cells):
+        # A value contained the separator itself
+        return [html.escape(cell, quote=True) for cell in cells]
+    return escaped
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    One table column.
+    value is an attribute name (rows are usually events.Event records) or a
+    value(row) callable giving the cell text;
+    style(row) optionally gives an inline style.
+    kind is "text", "bold" or "link" (value is the URL, link_text the label).
+    """
+    header: str
+    value: object
+    kind: str = "text"
+    style: object = None
+    width: str = None
+    link_text: str = "View"
+
+
+class TableTemplate:
+    def __init__(self, columns, cellpadding=10, table_style=TABLE_STYLE, align_left=True, colgroup=False):
+        self.columns = tuple(columns)
+
+        th_attrs = ' align="left"' if align_left else ""
+        head = [
+            f'<table border="1" cellpadding="{cellpadding}" cellspacing="0" style="{table_style}">'
+        ]
+        if colgroup:
+            head.append("<colgroup>")
+            head.extend(f'<col style="width:{column.width};">' for column in self.columns)
+            head.append("</colgroup>")
+        head.append(f'<thead><tr style="{HEADER_ROW_STYLE}">')
+        for column in self.columns:
+            width = f' style="width:{column.width};"' if column.width and not colgroup else ""
+            head.append(f"<th{th_attrs}{width}>{escape(column.header)}</th>")
+        head.append("</tr></thead><tbody>")
+        self.head = "".join(head)
+
+        # Row format string: one positional slot per cell value / style, and
+        # the matching (getter, escape?) pairs that fill the slots in order
+        cells = []
+        getters = []
+        slot = 0
+        for column in self.columns:
+            style = ""
+            if column.style:
+                style = f' style="{{{slot}}}"'
+                getters.append((column.style, False))
+                slot += 1
+            value = column.value
+            getters.append((attrgetter(value) if isinstance(value, str) else value, True))
+            if column.kind == "bold":
+                cells.append(f"<td{style}><b>{{{slot}}}</b></td>")
+            elif column.kind == "link":
+                cells.append(f'<td{style}><a href="{{{slot}}}" target="_blank">{escape(column.link_text)}</a></td>')
+            else:
+                cells.append(f"<td{style}>{{{slot}}}</td>")
+            slot += 1
+        self.row_format = "<tr>" + "".join(cells) + "</tr>"
+        self.getters = tuple(getters)
+
+    def render_into(self, out, rows):
+        """Appends the table for rows to the list out."""
+        rows = list(rows)
+        columns = []
+        for get, escaped in self.getters:
+            values = list(map(get, rows))
+            columns.append(escape_all(values) if escaped else [value or "" for value in values])
+        out.append(self.head)
+        out.extend(map(self.row_format.format, *columns))
+        out.append("</tbody></table>")
+
+    def render(self, rows):
+        out = []
+        self.render_into(out, rows)
+        return "".join(out)
+
+
+def body(markup):
+    """The markup inside a Report.html() document; fragments are returned as is."""
+    return markup.removeprefix("<html><body>").removesuffix("</body></html>")
+
+
+class Report:
+    """Collects the parts of an HTML email and joins them once."""
+
+    def __init__(self):
+        self.parts = ["<html><body>"]
+
+    def raw(self, markup):
+        self.parts.append(markup)
+        return self
+
+    def heading(self, text, level=1):
+        return self.raw(f"<h{level}>{escape(text)}</h{level}>")
+
+    def paragraph(self, text):
+        return self.raw(f"<p>{escape(text)}</p>")
+
+    def meta(self, items, rule=False):
+        """A <p> of bold label / value lines, e.g. generated-at and counts."""
+        lines = "<br>".join(f"<b>{escape(label)}:</b> {escape(value)}" for label, value in items)
+        self.raw(f"<p>{lines}</p>")
+        return self.raw("<hr>") if rule else self
+
+    def table(self, template, rows):
+        template.render_into(self.parts, rows)
+        return self
+
+    def html(self):
+        return "".join(self.parts) + "</body></html>"
+
@@ -0,0 +1,99 @@
+import contextlib
+import importlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import capture
+import datetimes
+import event_store
+import http_client
+
+# --- Parallel reprocessing of captured runs ---
+#
+# Rebuilds event history after a parser fix: every (captured run, source)
+# pair is replayed through the source's own scrape() in a pool of worker
+# processes, since BeautifulSoup parsing is CPU-bound and a thread pool would
+# serialize on the GIL. Results come back in capture order and are written to
+# the event store a chunk of scrapes per transaction, stamped with the
+# capture's time, so reprocessing old runs never overwrites newer data.
+
+WORKERS = os.cpu_count() or 1
+CHUNK_SIZE = 20   # scrapes per store transaction
+
+
+def tasks(archive, sources, first=None, last=None):
+    """
+    (run id, source name, captured_at) for every captured run in [first,
+    last] and each of the given sources that the run captured (runs that
+    did not record their sources are tried with all of them).
+    """
+    for run_id in archive.runs():
+        if (first and run_id < first) or (last and run_id > last):
+            continue
+        info = archive.run_info(run_id)
+        captured = info.get("sources") or list(sources)
+        captured_at = info.get("started_at") or os.path.getmtime(archive.run_dir(run_id))
+        for name in sources:
+            if name in captured:
+                yield run_id, name, captured_at
+
+
+def _reparse(task):
+    """Worker: replays one source of one run. Returns (task, events, error, pages)."""
+    run_id, (name, module_name), captured_at, root = task
+    with contextlib.redirect_stdout(io.StringIO()):
+        capture.start_replay(http_client.get_session(), run_id, capture.Archive(root))
+        # Parse as of the capture, not today (seasons, months, year-less dates)
+        datetimes.set_clock(captured_at)
+        try:
+            module = importlib.import_module(module_name)
+            # Modules serving several sources (sidearm) hand out one per name
+            source = module.source(name) if hasattr(module, "source") else module
+            events, error = source.scrape()
+        except Exception as e:
+            events, error = None, f"{e.__class__.__name__}: {e}"
+    return (run_id, name, captured_at), events, error, capture.replayed()
+
+
+def reprocess(sources, db_path=event_store.DB_PATH, archive=None, first=None, last=None,
+              workers=WORKERS, chunk_size=CHUNK_SIZE):
+    """
+    Re-parses captured runs into the event store. sources maps source names
+    to module names. Returns (scrapes stored, failures, pages, seconds).
+    """
+    archive = archive or capture.Archive()
+    work = [
+        (run_id, (name, sources[name]), captured_at, archive.root)
+        for run_id, name, captured_at in tasks(archive, sources, first, last)
+    ]
+    print(f"Reprocessing {len(work)} scrapes from {archive.root} on {workers} processes...")
+
+    start = time.perf_counter()
+    stored = failures = pages = 0
+    chunk = []
+    with event_store.EventStore(db_path) as store, ProcessPoolExecutor(max_workers=workers) as executor:
+        for (run_id, name, captured_at), events, error, served in executor.map(_reparse, work):
+            pages += served
+            if error or events is None:
+                failures += 1
+                print(f"[{run_id} {name}] skipped: {error or 'no events'}")
+                continue
+            chunk.append((name, events, captured_at))
+            if len(chunk) >= chunk_size:
+                store.upsert_many(chunk)
+                stored += len(chunk)
+                chunk = []
+                elapsed = time.perf_counter() - start
+                print(f"  {stored + failures}/{len(work)} scrapes, {pages / elapsed:.1f} pages/s")
+        if chunk:
+            store.upsert_many(chunk)
+            stored += len(chunk)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Reprocessed {stored} scrapes ({failures} skipped), {pages} pages in {elapsed:.1f}s: "
+        f"{pages / elapsed if elapsed else 0:.1f} pages/s"
+    )
+    return stored, failures, pages, elapsed
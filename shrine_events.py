@@ -2,12 +2,17 @@ import requests
 import json
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
-from dateutil import parser
 import os
-from datetime import datetime
-import pytz
 import uuid  # For unique run ID
 
+import config
+import datetimes
+import http_cache
+import metrics
+import profiling
+import rendering
+from events import Event, make_id
+
 # --- 1. USER CONFIGURATION ---
 
 BREVO_API_KEY = os.environ.get("BREVO_API_KEY")
@@ -18,100 +23,109 @@ SENDER_NAME = "Shrine Event Bot"
 RECEIVER_EMAIL = "psahagun@usc.edu"
 RECEIVER_NAME = "Pablo Sahagun"
 
+SUBJECT = "🎭 Shrine Auditorium Event Report"
+
 API_URL = "https://aegwebprod.blob.core.windows.net/json/events/45/events.json"
+VENUE = "Shrine Auditorium"
+
+# Skip the email entirely when the feed answered 304 Not Modified.
+SKIP_EMAIL_IF_UNCHANGED = config.flag("SKIP_EMAIL_IF_UNCHANGED")
+
+# Whether the last scrape() found the feed not modified (read by compose)
+_feed_unchanged = False
 
 # --- 2. SCRIPT LOGIC (Fetching and Parsing) ---
 
-def fetch_events():
-    """Fetches the raw event list from the API."""
+def fetch_events_revalidated():
+    """
+    Fetches the raw event list, revalidating the on-disk copy with a conditional GET.
+    Returns (events, unchanged); unchanged is True when the API answered 304 and
+    the cached payload was reused.
+    """
     print(f"Fetching event data from {API_URL}...")
     try:
-        response = requests.get(API_URL)
-        response.raise_for_status()
-        data = response.json()
-        return data['events']
+        data, unchanged = http_cache.get_json(API_URL)
+        if unchanged:
+            print("Event feed not modified since last run, using cached payload.")
+        return data['events'], unchanged
     except requests.exceptions.RequestException as e:
         print(f"ERROR: Failed to fetch data from the URL. {e}")
     except json.JSONDecodeError:
         print("ERROR: Failed to parse the response as JSON.")
+        metrics.incr("parse_errors")
     except KeyError:
         print("ERROR: The key 'events' was not found in the JSON.")
-    return None
-
-
-def format_events_as_html(event_list):
-    """Formats events into HTML table (aligned with USC volleyball email style)."""
-
-    if not event_list:
-        return "<h1>🎭 Shrine Auditorium Events</h1><p>No events found.</p>"
-
-    now_utc = datetime.now(pytz.utc)
-    now_pt = now_utc.astimezone(pytz.timezone("America/Los_Angeles"))
-    formatted_now = now_pt.strftime("%a %b %d · %I:%M %p PT")
+        metrics.incr("parse_errors")
+    return None, False
 
-    html = "<html><body>"
-    html += "<h1>🎭 Shrine Auditorium Event Report</h1>"
 
-    html += f"""
-    <p>
-        <b>Generated at:</b> {formatted_now}<br>
-        <b>Source:</b> Shrine Auditorium<br>
-        <b>Events found:</b> {len(event_list)}
-    </p>
-    """
-
-    html += """
-    <table border="1" cellpadding="10" cellspacing="0"
-           style="width:100%; border-collapse:collapse; font-family:Arial,sans-serif;">
-        <thead>
-            <tr style="background-color:#f2f2f2;">
-                <th align="left">Event</th>
-                <th align="left">Date</th>
-                <th align="left">Time</th>
-                <th align="left">Status</th>
-            </tr>
-        </thead>
-        <tbody>
-    """
-
-    for event in event_list:
+def parse_events(raw_events):
+    """Turns raw AEG event dicts into Event records, skipping malformed ones."""
+    events = []
+    for event in raw_events:
         try:
             event_name = event['title']['headlinersText']
             date_str = event['eventDateTime']
             is_active = event['ticketing']['statusId'] != 0
 
-            dt = parser.parse(date_str)
-            formatted_date = dt.strftime("%A, %B %d, %Y")
-            formatted_time = dt.strftime("%I:%M %p")
-
-            if is_active:
-                status_text = "Active"
-                status_style = "font-weight:bold; color:#1a7f37;"
-            else:
-                status_text = "Cancelled/Inactive"
-                status_style = "font-weight:bold; color:#b42318;"
-
-            html += f"""
-            <tr>
-                <td><b>{event_name}</b></td>
-                <td>{formatted_date}</td>
-                <td>{formatted_time}</td>
-                <td style="{status_style}">{status_text}</td>
-            </tr>
-            """
+            # AEG sends ISO 8601 venue-local times
+            dt = datetimes.parse(date_str)
+            if dt is None:
+                print(f"Warning: Skipping event with unreadable date: {date_str}")
+                metrics.incr("parse_errors")
+                continue
+
+            events.append(Event(
+                source="shrine",
+                title=event_name,
+                start=dt.astimezone(datetimes.PACIFIC),
+                venue=VENUE,
+                status="Active" if is_active else "Cancelled/Inactive",
+                url=event['ticketing'].get('url') or "",
+                id=make_id("shrine", event.get('eventId') or f"{event_name}|{date_str}"),
+            ))
 
         except KeyError as e:
             print(f"Warning: Skipping event due to missing key: {e}")
+            metrics.incr("parse_errors")
+    return events
+
 
-    html += "</tbody></table></body></html>"
-    return html
+EVENT_TABLE = rendering.TableTemplate([
+    rendering.Column("Event", "title", kind="bold"),
+    rendering.Column("Date", lambda event: event.date_label("%A, %B %d, %Y")),
+    rendering.Column("Time", lambda event: event.time_label("%I:%M %p")),
+    rendering.Column(
+        "Status", "status",
+        style=lambda event: rendering.STYLE_GOOD if event.status == "Active" else rendering.STYLE_BAD,
+    ),
+])
+
+
+def format_events_as_html(event_list):
+    """Formats events into HTML table (aligned with USC volleyball email style)."""
+
+    if not event_list:
+        return "<h1>🎭 Shrine Auditorium Events</h1><p>No events found.</p>"
+
+    formatted_now = datetimes.now().strftime("%a %b %d · %I:%M %p PT")
+
+    report = rendering.Report()
+    report.heading("🎭 Shrine Auditorium Event Report")
+    report.meta([
+        ("Generated at", formatted_now),
+        ("Source", VENUE),
+        ("Events found", len(event_list)),
+    ])
+    report.table(EVENT_TABLE, event_list)
+    return report.html()
     
 
-def send_email_with_brevo(html_content):
+def send_email_with_brevo(html_content, subject=SUBJECT):
     """Connects to Brevo and sends the email with custom headers containing micro-entropy."""
     if not BREVO_API_KEY:
         print("---\nERROR: BREVO_API_KEY not found.\n---")
-        return
+        return False
 
     print(f"Connecting to Brevo and sending email to {RECEIVER_EMAIL}...")
 
@@ -119,7 +133,6 @@ def send_email_with_brevo(html_content):
     configuration.api_key['api-key'] = BREVO_API_KEY
     api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
     
-    subject = "🎭 Shrine Auditorium Event Report"
     sender = {"name": SENDER_NAME, "email": SENDER_EMAIL}
     to = [{"email": RECEIVER_EMAIL, "name": RECEIVER_NAME}]
 
@@ -128,8 +141,7 @@ def send_email_with_brevo(html_content):
 
     headers = {
         "X-Report-Venue": "Shrine",
-        "X-Report-Date": (datetime.now(pytz.timezone("America/Los_Angeles"))
-                          .strftime("%Y-%m-%d")),
+        "X-Report-Date": datetimes.now().strftime("%Y-%m-%d"),
         "X-Report-Run-ID": run_id
     }
 
@@ -148,16 +160,48 @@ def send_email_with_brevo(html_content):
         print(f"Message ID: {api_response.message_id}")
         print(f"Run ID: {run_id}")
         print("---")
+        return True
     except ApiException as e:
         print(f"ERROR: Failed to send email via Brevo: {e}")
+        return False
 
 # --- 3. RUN THE SCRIPT ---
 
+def scrape():
+    """
+    Fetches the Shrine feed. Returns (events, error). A 304 is a successful
+    scrape of the cached payload; only the email is skipped for it (see
+    SKIP_EMAIL_IF_UNCHANGED).
+    """
+    global _feed_unchanged
+    raw_events, _feed_unchanged = fetch_events_revalidated()
+
+    if raw_events is None:
+        return None, "Failed to fetch Shrine events."
+    return metrics.timed("normalize", parse_events, raw_events), None
+
+
+def compose(events, error):
+    """The Shrine report as (subject, html), or None when there is nothing to send."""
+    if events is None and error is None:
+        return None
+    if _feed_unchanged and SKIP_EMAIL_IF_UNCHANGED:
+        print("Shrine events unchanged since last run, no email sent.")
+        return None
+
+    if events:
+        return SUBJECT, format_events_as_html(events)
+    print("No events found or error occurred, no email sent.")
+    return None
+
+
+def report(events, error):
+    """Formats and sends the Shrine report."""
+    email = compose(events, error)
+    if email:
+        subject, email_body = email
+        send_email_with_brevo(email_body, subject)
+
+
 if __name__ == "__main__":
-    raw_events = fetch_events()
-    
-    if raw_events:
-        email_body = format_events_as_html(raw_events)
-        send_email_with_brevo(email_body)
-    else:
-        print("No events found or error occurred, no email sent.")
+    profiling.main()
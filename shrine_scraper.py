@@ -0,0 +1,540 @@
+import argparse
+import importlib
+import os
+import sqlite3
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import capture
+import conflicts
+import datetimes
+import digest
+import event_store
+import http_client
+import mailer
+import metrics
+import openmetrics
+import profiling
+import reprocess
+import sidearm
+import snapshots
+
+# --- Single-process orchestrator ---
+#
+# Runs several sources in one interpreter: every source module exposes
+# scrape() -> (events, error), compose(events, error) -> (subject, html) and
+# report(events, error). A module serving several sources (sidearm.py, one per
+# USC sport) exposes source(name) returning such an object instead, and the
+# USC sports of a run are fetched together in one batch. Scrapes run concurrently, reports are sent one
+# source at a time, and a failure in one source never stops the others.
+# With --digest, the composed reports are sent together as one email (see
+# digest.py).
+#
+# With --send changed / diff, each source's events are compared with its
+# last snapshot (see snapshots.py): unchanged sources send nothing, and diff
+# mode sends only what was added, removed or changed.
+#
+# Every successful scrape is also upserted into the SQLite warehouse (see
+# event_store.py), all of a run's sources in one transaction. `report` re-sends reports from it without fetching,
+# `query` answers venue / date-range questions, and `conflicts` lists events
+# at different venues whose windows overlap (see conflicts.py).
+#
+# --capture records every response of the run to the capture archive, and
+# --replay <run> re-runs the parsers against a captured run without touching
+# the network; replays are read-only (nothing is emailed, stored or
+# snapshotted) and write the composed reports to .cache/replay/<run>/.
+# `reprocess` re-parses many captured runs in parallel into the event store
+# (see reprocess.py).
+#
+# Each run also writes a JSON metrics file (see metrics.py) with per-source
+# time spent in fetch / parse / normalize / render / send, every request's
+# latency and size, and event counts. Runs that fetch also write per-source
+# health and freshness gauges for node-exporter's textfile collector (see
+# openmetrics.py). With --profile, every source's scrape / render / send
+# phases run under cProfile and tracemalloc, one source at a time, and leave
+# .pstats files and allocation reports in a run directory (see profiling.py).
+#
+# Usage: python -m shrine_scraper run --group daily [--send changed] [--digest]
+#        python -m shrine_scraper run --group all --replay latest
+#        python -m shrine_scraper run --source bmo --profile
+#        python -m shrine_scraper reprocess --source bmo --from 20260101 --workers 8
+#        python -m shrine_scraper report --source expo
+#        python -m shrine_scraper query --from 2026-10-01 --to 2026-11-01 --source expo
+#        python -m shrine_scraper conflicts --from 2026-10-01 --to 2027-10-01 --buffer 120
+
+SOURCES = {
+    "shrine": "shrine_events",
+    "coliseum": "la_coliseum_events",
+    "bmo": "bmo_events",
+    # Every sidearm.SPORTS entry: mbb, wbb, mvb, wvb, baseball, football, wsoc
+    **{sport: "sidearm" for sport in sidearm.SPORTS},
+    "expo": "expo_events",
+    "lafc": "lafc_events",
+    "angelcity": "angelcity_events",
+}
+
+GROUPS = {
+    "daily": ["shrine", "coliseum", "bmo"],
+    "weekly": ["mbb", "wbb", "mvb"],
+    "monthly": ["expo", "lafc", "angelcity"],
+    "usc": list(sidearm.SPORTS),
+    "all": list(SOURCES),
+}
+
+MAX_WORKERS = 10
+
+REPLAY_OUTPUT_DIR = capture.REPLAY_OUTPUT_DIR
+
+
+@dataclass
+class SourceRun:
+    """Outcome and wall-clock timings of one source within a run."""
+    name: str
+    module: object = None
+    events: list = None
+    error: str = None
+    failure: str = None
+    check: object = None      # snapshots.Check once compared
+    email: str = "-"          # what was sent: report, diff, digest, none, failed
+    timings: dict = field(default_factory=dict)
+
+    @property
+    def status(self):
+        if self.failure:
+            return "FAILED"
+        if self.error:
+            return "error"
+        if self.events is None:
+            return "skipped"
+        return "ok"
+
+
+def _timed(run, phase, func, *args):
+    """Calls func, recording its duration under phase and isolating exceptions."""
+    start = time.perf_counter()
+    try:
+        with metrics.source(run.name), metrics.span(phase):
+            return func(*args)
+    except Exception:
+        run.failure = f"{phase} failed:\n{traceback.format_exc()}"
+        print(f"[{run.name}] {run.failure}")
+        return None
+    finally:
+        run.timings[phase] = time.perf_counter() - start
+
+
+def load_source(name):
+    """The source module for name (or, for modules serving several sources, its source(name))."""
+    module = importlib.import_module(SOURCES[name])
+    return module.source(name) if hasattr(module, "source") else module
+
+
+def _load(runs):
+    """Imports every run's source. Returns the runs that loaded; their USC sports share one fetch batch."""
+    for run in runs:
+        run.module = _timed(run, "import", load_source, run.name)
+    ready = [run for run in runs if not run.failure]
+    sidearm.batch([run.module for run in ready if isinstance(run.module, sidearm.SportSource)])
+    return ready
+
+
+def _scrape(run):
+    result = _timed(run, "scrape", run.module.scrape)
+    if result is not None:
+        run.events, run.error = result
+    if run.events is not None:
+        metrics.current().set_count(run.name, "events", len(run.events))
+    if run.events is not None and not run.error and not run.failure:
+        run.check = _timed(run, "compare", snapshots.check, run.name, run.events)
+    return run
+
+
+def _send_report(name, module, events, error, email_digest):
+    """
+    Sends the source's own report, or adds it to the digest. Returns what
+    was done ("failed" when the email did not go out).
+    """
+    email = metrics.timed("render", module.compose, events, error)
+    if email is None:
+        return "-"
+    if email_digest is not None:
+        email_digest.add(name, *email)
+        return "digest"
+    # What module.report() does, with the two halves timed separately
+    subject, html = email
+    sent = metrics.timed("send", module.send_email_with_brevo, html, subject)
+    return "report" if sent else "failed"
+
+
+def _report(run, send_mode, email_digest=None):
+    """
+    Sends (or queues into email_digest) the run's report as send_mode
+    dictates. Returns True when the snapshot should be recorded, which is
+    only once its email (if any) actually went out.
+    """
+    check = run.check
+    if check is None:
+        # Errors and skipped sources are always passed through to report()
+        sent = _send_report(run.name, run.module, run.events, run.error, email_digest)
+        run.email = sent if run.error or sent == "digest" else "-"
+        return False
+
+    if send_mode != "always" and check.unchanged:
+        print(f"[{run.name}] unchanged since last run, no email sent.")
+        run.email = "none"
+        return True
+
+    if send_mode == "diff" and check.diff is not None:
+        if check.diff.empty:
+            print(f"[{run.name}] no reportable changes, no email sent.")
+            run.email = "none"
+        else:
+            print(f"[{run.name}] {check.diff.summary()}")
+            sender = getattr(run.module, "SENDER_NAME", mailer.SENDER_NAME)
+            html = metrics.timed("render", snapshots.format_diff_as_html, sender, check.diff)
+            subject = f"{sender}: {check.diff.summary()}"
+            if email_digest is None:
+                sent = metrics.timed("send", mailer.send_email_with_brevo, html, subject, sender)
+                run.email = "diff" if sent else "failed"
+            else:
+                email_digest.add(run.name, subject, html)
+                run.email = "digest"
+    else:
+        run.email = _send_report(run.name, run.module, run.events, run.error, email_digest)
+
+    return run.email != "failed"
+
+
+def _store(runs, db_path):
+    """
+    Upserts every successful scrape in one transaction. A warehouse failure
+    never blocks the reports.
+    """
+    scraped_at = time.time()
+    scrapes = [(run.name, run.events, scraped_at) for run in runs if run.check is not None]
+    if not scrapes:
+        return
+    try:
+        start = time.perf_counter()
+        with event_store.EventStore(db_path) as store:
+            rows = store.upsert_many(scrapes)
+        print(f"Stored {rows} events from {len(scrapes)} sources in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except sqlite3.Error as e:
+        print(f"WARNING: could not write the event store {db_path}: {e}")
+
+
+def _export(runs, db_path, directory):
+    """Writes the textfile gauges. Like the store, an export failure never fails the run."""
+    try:
+        with event_store.EventStore(db_path) as store:
+            last_success = {name: scraped_at for name, (scraped_at, _) in store.sources().items()}
+    except sqlite3.Error as e:
+        print(f"WARNING: could not read the event store {db_path}: {e}")
+        last_success = {}
+    # A source is up when its scrape succeeded (or it had nothing new to
+    # scrape), even if its report later failed
+    statuses = {run.name: run.check is not None or run.status == "skipped" for run in runs}
+    try:
+        paths = openmetrics.export(statuses, last_success, directory)
+    except OSError as e:
+        print(f"WARNING: could not write the textfile metrics to {directory}: {e}")
+        return
+    print(f"Textfile metrics written for {len(paths)} sources to {directory}")
+
+
+def run_sources(names, max_workers=MAX_WORKERS, send_mode=snapshots.SEND_MODE, db_path=event_store.DB_PATH,
+                use_digest=digest.DIGEST):
+    """
+    Scrapes the named sources concurrently, stores the events, then reports
+    each one (or all of them in one digest email).
+    """
+    runs = [SourceRun(name) for name in names]
+    ready = _load(runs)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ready) or 1))) as executor:
+        list(executor.map(_scrape, ready))
+
+    _store(ready, db_path)
+
+    email_digest = digest.Digest() if use_digest else None
+    reported = [
+        run for run in ready
+        if not run.failure and _timed(run, "report", _report, run, send_mode, email_digest)
+    ]
+
+    # With a digest, snapshots are only recorded once it is actually sent,
+    # so a failed send is retried as a change on the next run
+    with metrics.source("digest"):
+        sent = email_digest is None or email_digest.send()
+    if sent:
+        for run in reported:
+            snapshots.save(run.name, run.events, events_digest=run.check.digest)
+
+    return runs
+
+
+def replay_sources(names, captured_run, max_workers=MAX_WORKERS, output_dir=REPLAY_OUTPUT_DIR):
+    """Scrapes the named sources from a captured run and writes their reports as HTML files."""
+    run_id = capture.start_replay(http_client.get_session(), captured_run)
+    runs = [SourceRun(name) for name in names]
+    ready = _load(runs)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ready) or 1))) as executor:
+        list(executor.map(_scrape, ready))
+
+    for run in ready:
+        email = None if run.failure else _timed(run, "render", run.module.compose, run.events, run.error)
+        if email:
+            capture.save_report(run.name, email[1], output_dir)
+            run.email = "file"
+    print(f"Replayed reports written to {os.path.join(output_dir, run_id)}")
+    return runs
+
+
+def print_captures(archive):
+    for run_id in archive.runs():
+        records = archive.manifest(run_id)
+        sources = ", ".join(archive.run_info(run_id).get("sources") or []) or "-"
+        size = sum(record.get("size", 0) for record in records)
+        print(f"{run_id:<22}{len(records):>6} responses{size / 1024:>10.0f} KiB  {sources}")
+
+
+def report_from_store(names, db_path=event_store.DB_PATH, use_digest=digest.DIGEST):
+    """Re-sends each source's report from its latest stored scrape; nothing is fetched."""
+    email_digest = digest.Digest() if use_digest else None
+    with event_store.EventStore(db_path) as store:
+        stored = store.sources()
+        for name in names:
+            if name not in stored:
+                print(f"[{name}] nothing stored yet, skipped.")
+                continue
+            module = load_source(name)
+            with metrics.source(name):
+                _send_report(name, module, store.current(name), None, email_digest)
+    if email_digest is not None:
+        with metrics.source("digest"):
+            email_digest.send()
+
+
+def print_query(events, elapsed):
+    for event in events:
+        print(f"{event.date_label('%Y-%m-%d')} {event.time_label():>8}  {event.source:<10} {event.title}  @ {event.venue}")
+    print(f"{len(events)} events in {elapsed * 1000:.1f} ms")
+
+
+def find_conflicts(start, end, buffer_minutes=conflicts.BUFFER_MINUTES, sources=None, email=False,
+                   db_path=event_store.DB_PATH):
+    """Checks the stored events starting in [start, end) for cross-venue overlaps."""
+    with event_store.EventStore(db_path) as store:
+        load_start = time.perf_counter()
+        events = store.between(start, end, sources=sources, listed_only=True)
+    sweep_start = time.perf_counter()
+    found = conflicts.find_conflicts(events, buffer_minutes)
+    done = time.perf_counter()
+
+    conflicts.print_conflicts(found)
+    print(f"{len(events)} events loaded in {(sweep_start - load_start) * 1000:.1f} ms, "
+          f"checked in {(done - sweep_start) * 1000:.1f} ms")
+    if email and found:
+        mailer.send_email_with_brevo(
+            conflicts.format_conflicts_as_html(found, buffer_minutes),
+            f"Event conflicts: {len(found)} overlapping pairs",
+        )
+    return found
+
+
+def _seconds(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def print_summary(runs, total_seconds):
+    """Prints a per-source wall-clock table."""
+    print("\n" + "=" * 68)
+    print(f"{'Source':<12}{'Status':<10}{'Events':>8}{'Email':>8}{'Scrape s':>11}{'Report s':>11}")
+    print("-" * 68)
+    for run in runs:
+        count = len(run.events) if run.events is not None else "-"
+        print(
+            f"{run.name:<12}{run.status:<10}{count:>8}{run.email:>8}"
+            f"{_seconds(run.timings.get('scrape')):>11}"
+            f"{_seconds(run.timings.get('report')):>11}"
+        )
+    print("-" * 68)
+    print(f"Total wall-clock: {total_seconds:.2f}s")
+    print("=" * 68)
+
+
+def _resolve_sources(args):
+    names = list(args.source or [])
+    for group in args.group or []:
+        names.extend(GROUPS[group])
+    if not names:
+        raise SystemExit("Nothing to run: pass --group and/or --source.")
+    # De-duplicate while keeping order
+    return list(dict.fromkeys(names))
+
+
+def _date(value):
+    """argparse type: YYYY-MM-DD (or any ISO date-time) as a Pacific datetime."""
+    try:
+        return datetimes.parse_iso(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO date: {value!r}")
+
+
+def _add_source_arguments(parser):
+    parser.add_argument("--group", action="append", choices=sorted(GROUPS), help="source group (repeatable)")
+    parser.add_argument("--source", action="append", choices=sorted(SOURCES), help="single source (repeatable)")
+
+
+DIGEST_HELP = "send all reports as one email with a table of contents (or DIGEST=1)"
+
+
+def _add_profile_arguments(parser):
+    parser.add_argument(
+        "--profile", action="store_true", default=profiling.PROFILE,
+        help="profile each source's scrape / render / send phases (or SCRAPER_PROFILE=1)",
+    )
+    parser.add_argument(
+        "--profile-dir", default=profiling.PROFILE_DIR,
+        help="where the profile run directory goes (default %(default)s, or SCRAPER_PROFILE_DIR)",
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="shrine_scraper", description="Run scraper sources in one process.")
+    parser.add_argument("--db", default=event_store.DB_PATH, help="event store path (default %(default)s, or SCRAPER_DB)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="scrape and report one or more sources")
+    _add_source_arguments(run_parser)
+    run_parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="concurrent scrapes (default %(default)s)")
+    run_parser.add_argument(
+        "--send", choices=snapshots.SEND_MODES, default=snapshots.SEND_MODE,
+        help="always, only when changed, or only the changes (default %(default)s, or SEND_MODE)",
+    )
+    run_parser.add_argument("--digest", action="store_true", default=digest.DIGEST, help=DIGEST_HELP)
+    run_parser.add_argument(
+        "--capture", action="store_true", default=capture.CAPTURE,
+        help="record every response to the capture archive (or SCRAPER_CAPTURE=1)",
+    )
+    run_parser.add_argument(
+        "--replay", metavar="RUN", default=capture.REPLAY,
+        help='parse a captured run (id or "latest") instead of fetching; read-only (or SCRAPER_REPLAY)',
+    )
+    run_parser.add_argument(
+        "--metrics", metavar="PATH", help="metrics JSON file (default SCRAPER_METRICS_DIR/<start time>.json)",
+    )
+    run_parser.add_argument(
+        "--textfile-dir", default=openmetrics.TEXTFILE_DIR,
+        help="directory for the Prometheus .prom files (default %(default)s, or SCRAPER_TEXTFILE_DIR)",
+    )
+    _add_profile_arguments(run_parser)
+
+    report_parser = subparsers.add_parser("report", help="re-send reports from the event store without fetching")
+    _add_source_arguments(report_parser)
+    report_parser.add_argument("--digest", action="store_true", default=digest.DIGEST, help=DIGEST_HELP)
+    _add_profile_arguments(report_parser)
+
+    query_parser = subparsers.add_parser("query", help="list stored events in a date range")
+    query_parser.add_argument("--from", dest="start", type=_date, required=True, help="first day, YYYY-MM-DD")
+    query_parser.add_argument("--to", dest="end", type=_date, required=True, help="end day (exclusive), YYYY-MM-DD")
+    query_parser.add_argument("--venue", action="append", help="exact venue (repeatable)")
+    query_parser.add_argument("--venue-prefix", help='venues starting with this, e.g. "Exposition Park"')
+    query_parser.add_argument("--source", action="append", choices=sorted(SOURCES), help="source (repeatable)")
+
+    conflicts_parser = subparsers.add_parser("conflicts", help="find stored events at different venues that overlap")
+    conflicts_parser.add_argument("--from", dest="start", type=_date, help="first day, YYYY-MM-DD (default today)")
+    conflicts_parser.add_argument("--to", dest="end", type=_date, help="end day (exclusive), YYYY-MM-DD (default +90 days)")
+    conflicts_parser.add_argument(
+        "--buffer", type=int, default=conflicts.BUFFER_MINUTES,
+        help="ingress/egress minutes added before and after each event (default %(default)s, or CONFLICT_BUFFER_MINUTES)",
+    )
+    conflicts_parser.add_argument("--source", action="append", choices=sorted(SOURCES), help="source (repeatable)")
+    conflicts_parser.add_argument("--email", action="store_true", help="also email the conflicts")
+
+    subparsers.add_parser("captures", help="list the captured runs")
+
+    reprocess_parser = subparsers.add_parser("reprocess", help="re-parse captured runs into the event store")
+    _add_source_arguments(reprocess_parser)
+    reprocess_parser.add_argument("--from", dest="first", help="first run id (or prefix, e.g. 20260101)")
+    reprocess_parser.add_argument("--to", dest="last", help="last run id (or prefix)")
+    reprocess_parser.add_argument(
+        "--workers", type=int, default=reprocess.WORKERS, help="parser processes (default %(default)s)",
+    )
+    reprocess_parser.add_argument(
+        "--chunk", type=int, default=reprocess.CHUNK_SIZE, help="scrapes per store transaction (default %(default)s)",
+    )
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if getattr(args, "profile", False):
+        profiling.start(args.profile_dir)
+        # tracemalloc is process-wide: overlapping sources would share allocations
+        args.workers = 1
+    try:
+        return _run_command(args)
+    finally:
+        run_dir = profiling.stop()
+        if run_dir:
+            print(f"Profiles written to {run_dir}")
+
+
+def _run_command(args):
+    if args.command == "run":
+        names = _resolve_sources(args)
+        start = time.perf_counter()
+        if args.replay:
+            try:
+                runs = replay_sources(names, args.replay, max_workers=args.workers)
+            except ValueError as e:
+                raise SystemExit(str(e))
+        else:
+            if args.capture:
+                session = http_client.get_session()
+                if capture.active() is None:
+                    capture.start_capture(session, sources=names)
+            runs = run_sources(names, max_workers=args.workers, send_mode=args.send, db_path=args.db,
+                               use_digest=args.digest)
+            _export(runs, args.db, args.textfile_dir)
+        print_summary(runs, time.perf_counter() - start)
+        print(f"Metrics written to {metrics.current().write(args.metrics)}")
+        return 1 if any(run.failure for run in runs) else 0
+
+    if args.command == "report":
+        report_from_store(_resolve_sources(args), db_path=args.db, use_digest=args.digest)
+
+    if args.command == "query":
+        with event_store.EventStore(args.db) as store:
+            start = time.perf_counter()
+            events = store.between(args.start, args.end, args.venue, args.venue_prefix, args.source)
+            print_query(events, time.perf_counter() - start)
+
+    if args.command == "captures":
+        print_captures(capture.Archive())
+
+    if args.command == "reprocess":
+        names = _resolve_sources(args)
+        # A prefix such as 20261231 has to include that whole day
+        last = args.last + "\uffff" if args.last else None
+        reprocess.reprocess(
+            {name: SOURCES[name] for name in names}, db_path=args.db, first=args.first, last=last,
+            workers=args.workers, chunk_size=args.chunk,
+        )
+
+    if args.command == "conflicts":
+        start = args.start or datetimes.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = args.end or start + timedelta(days=90)
+        find_conflicts(start, end, args.buffer, args.source, args.email, db_path=args.db)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
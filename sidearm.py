@@ -0,0 +1,286 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+
+import requests
+from bs4 import BeautifulSoup
+
+import datetimes
+import http_client
+import mailer
+import metrics
+import profiling
+import rendering
+from events import Event, make_id
+
+# -------------------------------------------------
+# Sidearm schedule engine
+# -------------------------------------------------
+#
+# usctrojans.com runs on Sidearm, which exposes every sport's schedule as a
+# plain table at /sports/<slug>/schedule/text. This module fetches those
+# pages concurrently over the shared session, parses them with one row
+# parser and renders them with one table builder. Adding a sport is a new
+# SPORTS entry: source(<key>) gives the orchestrator a source for it (and
+# `python sidearm.py <key>` runs it alone), and the orchestrator fetches all
+# the sports of a run in one fetch_schedules batch.
+
+BASE_URL = "https://usctrojans.com/sports/{slug}/schedule/text"
+
+MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class Sport:
+    slug: str
+    label: str
+    emoji: str
+    headers: str = "usc-basketball"
+    sender_name: str = ""      # the report email's sender (default "USC <label> Bot")
+
+    @property
+    def url(self):
+        return BASE_URL.format(slug=self.slug)
+
+
+SPORTS = {
+    "mbb": Sport("mens-basketball", "Men’s Basketball", "🏀", "usc-basketball", "Men's USC Basketball Bot"),
+    "wbb": Sport("womens-basketball", "Women’s Basketball", "🏀", "usc-basketball", "Women's USC Basketball Bot"),
+    "mvb": Sport("mens-volleyball", "Men’s Volleyball", "🏐", "usc-volleyball", "USC Mens Volleyball Bot"),
+    "wvb": Sport("womens-volleyball", "Women’s Volleyball", "🏐", "usc-womens-volleyball", "USC Womens Volleyball Bot"),
+    "baseball": Sport("baseball", "Baseball", "⚾"),
+    "football": Sport("football", "Football", "🏈"),
+    "wsoc": Sport("womens-soccer", "Women’s Soccer", "⚽"),
+}
+
+
+# -------------------------------------------------
+# Parsing
+# -------------------------------------------------
+
+def season_start_year(today=None):
+    """Academic seasons start in August."""
+    today = today or datetimes.now()
+    return today.year if today.month >= 8 else today.year - 1
+
+
+def parse_row(sport, cols, start_year):
+    """
+    Builds an Event from the text cells of one schedule row.
+    Expected columns: Date | Time | At | Opponent | Location | Tournament | Result
+    Returns None for rows that are not games.
+    """
+    if len(cols) < 7:
+        return None
+
+    date_raw, time, at_flag, opponent, location, _tournament, result = cols[:7]
+
+    at_vs = "at" if at_flag.lower() == "at" else "vs"
+
+    # Add academic year to date
+    start = None
+    if date_raw and date_raw != "TBD":
+        parts = date_raw.split()
+        month_num = datetimes.month_number(parts[0])
+        if month_num:
+            year = start_year if month_num >= 8 else start_year + 1
+            start = _game_start(year, month_num, parts[1:], time)
+
+    title = f"USC {at_vs} {opponent}"
+    return Event(
+        source=sport,
+        title=title,
+        start=start,
+        venue=location,
+        result=result,
+        url=SPORTS[sport].url,
+        id=make_id(sport, start.date().isoformat() if start else date_raw, title),
+        time_tbd=datetimes.parse_clock(time) is None,
+        date_text=date_raw,
+        time_text=time,
+    )
+
+
+def _game_start(year, month, rest, time):
+    """Game start from the day token after the month ("4", "4 (Tue)") and the time text."""
+    day = "".join(ch for ch in rest[0] if ch.isdigit()) if rest else ""
+    if not day:
+        return None
+    hour, minute = datetimes.parse_clock(time) or (0, 0)
+    try:
+        return datetime(year, month, int(day), hour, minute, tzinfo=datetimes.PACIFIC)
+    except ValueError:
+        return None
+
+
+def parse_schedule(sport, html, today=None):
+    """Parses a text schedule page. Returns (games, error)."""
+    with metrics.span("parse"):
+        soup = BeautifulSoup(html, "html.parser")
+        table = soup.find("table")
+        tbody = table.find("tbody") if table else None
+
+    if not table or not tbody:
+        metrics.incr("parse_errors")
+    if not table:
+        return [], "Schedule table not found. Page structure may have changed."
+    if not tbody:
+        return [], "Schedule table body not found."
+
+    start_year = season_start_year(today)
+    games = []
+    with metrics.span("normalize"):
+        for row in tbody.find_all("tr"):
+            cols = [c.get_text(strip=True) for c in row.find_all("td")]
+            game = parse_row(sport, cols, start_year)
+            if game:
+                games.append(game)
+
+    return games, None
+
+
+# -------------------------------------------------
+# Fetching
+# -------------------------------------------------
+
+def extract_games(sport, url=None):
+    """Fetches and parses one sport's schedule. Returns (games, error)."""
+    config = SPORTS[sport]
+    url = url or config.url
+
+    print(f"--- Fetching USC {config.label} Schedule from: {url} ---")
+
+    try:
+        response = http_client.get(url, headers=config.headers)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        return None, f"Error fetching schedule page: {e}"
+
+    return parse_schedule(sport, response.text)
+
+
+def _extract_as_source(sport):
+    """extract_games with its requests attributed to sport; failures become errors."""
+    with metrics.source(sport):
+        try:
+            return extract_games(sport)
+        except Exception as e:
+            return None, f"{e.__class__.__name__}: {e}"
+
+
+def fetch_schedules(sports, max_workers=MAX_WORKERS):
+    """
+    Fetches several sports concurrently over the shared session.
+    Returns {sport: (games, error)} in the order given.
+    """
+    sports = list(sports)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sports) or 1))) as executor:
+        results = list(executor.map(metrics.in_context(_extract_as_source), sports))
+    return dict(zip(sports, results))
+
+
+class Batch:
+    """Fetches a set of sports together, on the first request for any of them."""
+
+    def __init__(self, sports):
+        self.sports = list(sports)
+        self.lock = threading.Lock()
+        self.results = None
+
+    def result(self, sport):
+        with self.lock:
+            if self.results is None:
+                self.results = fetch_schedules(self.sports)
+        return self.results[sport]
+
+
+# -------------------------------------------------
+# Email body builder
+# -------------------------------------------------
+
+def _result_style(game):
+    if game.result.startswith("W"):
+        return rendering.STYLE_GOOD
+    if game.result.startswith("L"):
+        return rendering.STYLE_BAD
+    return rendering.STYLE_MUTED
+
+
+GAME_TABLE = rendering.TableTemplate([
+    rendering.Column("Game", "title", kind="bold"),
+    rendering.Column("Date", lambda game: game.date_label("%a, %b %d, %Y")),
+    rendering.Column("Time", lambda game: game.time_label(missing="TBA")),
+    rendering.Column("Location", "venue"),
+    rendering.Column("Result", "result", style=_result_style),
+])
+
+
+def format_games_as_html(sport, games):
+    config = SPORTS[sport]
+
+    if not games:
+        return f"<h1>{config.emoji} USC {config.label}</h1><p>No games found.</p>"
+
+    report = rendering.Report()
+    report.heading(f"{config.emoji} USC {config.label} Schedule & Results")
+    report.paragraph(f"Found {len(games)} games")
+    report.table(GAME_TABLE, games)
+    return report.html()
+
+
+# -------------------------------------------------
+# Sports as sources
+# -------------------------------------------------
+
+class SportSource:
+    """One sport with the source module interface: scrape, compose, send_email_with_brevo, report."""
+
+    def __init__(self, sport, batch=None):
+        self.sport = sport
+        self.config = SPORTS[sport]
+        self.batch = batch
+        self.SENDER_NAME = self.config.sender_name or f"USC {self.config.label} Bot"
+
+    def scrape(self):
+        """Fetches the schedule (from the batch, if any). Returns (games, error)."""
+        if self.batch is not None:
+            return self.batch.result(self.sport)
+        return extract_games(self.sport)
+
+    def compose(self, games, error):
+        """The report (or error email) as (subject, html)."""
+        config = self.config
+        if error:
+            error_html = f"""
+        <h1>🚨 USC {config.label} Scraper Error</h1>
+        <p>{error}</p>
+        """
+            return f"ACTION REQUIRED: USC {config.label} Scraper Error", error_html
+        return f"{config.emoji} USC {config.label} Schedule & Results", format_games_as_html(self.sport, games)
+
+    def send_email_with_brevo(self, html_content, subject):
+        return mailer.send_email_with_brevo(html_content, subject, self.SENDER_NAME)
+
+    def report(self, games, error):
+        """Sends the report, or an error email if scraping failed."""
+        subject, email_body = self.compose(games, error)
+        return self.send_email_with_brevo(email_body, subject)
+
+
+def source(sport):
+    return SportSource(sport)
+
+
+def batch(sport_sources):
+    """Makes the given SportSources fetch their schedules in one fetch_schedules batch."""
+    shared = Batch(sport_source.sport for sport_source in sport_sources)
+    for sport_source in sport_sources:
+        sport_source.batch = shared
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in SPORTS:
+        raise SystemExit(f"usage: python sidearm.py {{{','.join(SPORTS)}}} [--profile]")
+    profiling.main(source(sys.argv[1]), sys.argv[2:], name=sys.argv[1])
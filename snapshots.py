@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field, fields
+
+import files
+import http_cache
+import rendering
+from events import Event, keyed
+
+# --- Per-source snapshots and change detection ---
+#
+# After a source is reported, its events are saved keyed by Event.id next to
+# a SHA-256 digest of their canonical JSON. The next run hashes the fresh
+# events and compares digests first: an unchanged source costs one small file
+# read and no email. Only when the digests differ is the full snapshot loaded
+# and diffed into added / removed / changed events.
+
+SNAPSHOT_DIR = os.path.join(http_cache.CACHE_DIR, "snapshots")
+
+# always: send every report; changed: send the full report only when the
+# source changed; diff: send only the changes
+SEND_MODES = ("always", "changed", "diff")
+SEND_MODE = os.environ.get("SEND_MODE", "always")
+
+# Fields that make an event "changed" when they differ (id and source never do)
+COMPARED_FIELDS = tuple(f.name for f in fields(Event) if f.name not in ("id", "source"))
+
+# Fields reported as a change of the start rather than on their own
+WHEN_FIELDS = ("time_tbd", "date_text", "time_text")
+
+
+def _path(source, suffix, snapshot_dir):
+    return os.path.join(snapshot_dir, f"{source}.{suffix}")
+
+
+def digest(events):
+    """SHA-256 over the events' canonical JSON, independent of their order."""
+    records = sorted((key, event.to_dict()) for key, event in keyed(events).items())
+    payload = json.dumps(records, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_digest(source, snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(_path(source, "sha256", snapshot_dir), encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def load(source, snapshot_dir=SNAPSHOT_DIR):
+    """Returns the last saved {id: Event} for source, or None."""
+    try:
+        with open(_path(source, "json", snapshot_dir), encoding="utf-8") as f:
+            records = json.load(f)
+        return {key: Event.from_dict(record) for key, record in records.items()}
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save(source, events, snapshot_dir=SNAPSHOT_DIR, events_digest=None):
+    """Saves events as the new snapshot of source (JSON first, digest last)."""
+    records = {key: event.to_dict() for key, event in keyed(events).items()}
+    files.atomic_write(_path(source, "json", snapshot_dir), json.dumps(records))
+    files.atomic_write(_path(source, "sha256", snapshot_dir), events_digest or digest(events))
+
+
+@dataclass
+class Diff:
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    changed: list = field(default_factory=list)   # (old, new) pairs
+
+    @property
+    def empty(self):
+        return not (self.added or self.removed or self.changed)
+
+    def summary(self):
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed"
+
+
+def changed_fields(old, new):
+    return [name for name in COMPARED_FIELDS if getattr(old, name) != getattr(new, name)]
+
+
+def diff(old, new_events):
+    """Diffs a saved {id: Event} snapshot against the fresh events."""
+    new = keyed(new_events)
+    result = Diff()
+    for key, event in new.items():
+        previous = old.get(key)
+        if previous is None:
+            result.added.append(event)
+        elif changed_fields(previous, event):
+            result.changed.append((previous, event))
+    result.removed = [event for key, event in old.items() if key not in new]
+    return result
+
+
+@dataclass
+class Check:
+    """Outcome of comparing a source's fresh events with its snapshot."""
+    source: str
+    digest: str
+    unchanged: bool
+    diff: Diff = None      # None when unchanged or there was no snapshot
+    first_run: bool = False
+
+
+def check(source, events, snapshot_dir=SNAPSHOT_DIR):
+    """Hash comparison first; the full diff is only computed when digests differ."""
+    events_digest = digest(events)
+    if events_digest == load_digest(source, snapshot_dir):
+        return Check(source, events_digest, unchanged=True)
+    old = load(source, snapshot_dir)
+    if old is None:
+        return Check(source, events_digest, unchanged=False, first_run=True)
+    return Check(source, events_digest, unchanged=False, diff=diff(old, events))
+
+
+# --- Diff email ---
+
+def _describe(event):
+    return f"{event.date_label('%a, %b %d, %Y')} {event.time_label(missing='')}".rstrip()
+
+
+def _change_detail(old, new):
+    names = changed_fields(old, new)
+    if any(name in names for name in WHEN_FIELDS):
+        # Shown as part of the start time
+        names = ["start"] + [name for name in names if name not in ("start", *WHEN_FIELDS)]
+    parts = []
+    for name in names:
+        before, after = getattr(old, name), getattr(new, name)
+        if name == "start":
+            before, after = _describe(old), _describe(new)
+        parts.append(f"{name}: {before or '-'} → {after or '-'}")
+    return "; ".join(parts)
+
+
+CHANGE_STYLES = {"Added": rendering.STYLE_GOOD, "Removed": rendering.STYLE_BAD, "Changed": rendering.STYLE_WARN}
+
+CHANGE_TABLE = rendering.TableTemplate([
+    rendering.Column("Change", lambda row: row[0], style=lambda row: CHANGE_STYLES[row[0]]),
+    rendering.Column("Event", lambda row: row[1].title, kind="bold"),
+    rendering.Column("When", lambda row: _describe(row[1])),
+    rendering.Column("Venue", lambda row: row[1].venue),
+    rendering.Column("Details", lambda row: row[2]),
+])
+
+
+def change_rows(changes):
+    """(kind, event, detail) rows, in added / changed / removed order."""
+    rows = [("Added", event, event.status or event.result) for event in changes.added]
+    rows += [("Changed", new, _change_detail(old, new)) for old, new in changes.changed]
+    rows += [("Removed", event, "") for event in changes.removed]
+    return rows
+
+
+def format_diff_as_html(title, changes):
+    report = rendering.Report()
+    report.heading(f"{title}: what changed")
+    report.paragraph(changes.summary())
+    report.table(CHANGE_TABLE, change_rows(changes))
+    return report.html()
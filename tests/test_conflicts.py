@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime
+
+import conflicts
+import datetimes
+from events import Event
+
+
+def at(day, hour=19, minute=0):
+    return datetime(2026, 11, day, hour, minute, tzinfo=datetimes.PACIFIC)
+
+
+def event(title, source, venue, start, **fields):
+    return Event(source=source, title=title, start=start, venue=venue, id=title, **fields)
+
+
+def pairs(found):
+    return [(c.first.title, c.second.title) for c in found]
+
+
+class FindConflictsTest(unittest.TestCase):
+    def test_overlap_across_sites(self):
+        found = conflicts.find_conflicts([
+            event("Concert", "shrine", "Shrine Auditorium", at(21, 19)),
+            event("Match", "bmo", "BMO Stadium", at(21, 20)),
+            event("Next day", "bmo", "BMO Stadium", at(22, 20)),
+        ], buffer_minutes=0)
+        self.assertEqual(pairs(found), [("Concert", "Match")])
+        self.assertEqual(found[0].overlap_minutes, 120)
+
+    def test_same_site_is_ignored(self):
+        found = conflicts.find_conflicts([
+            event("Game", "coliseum", "Los Angeles Memorial Coliseum", at(21, 17)),
+            event("Game (Expo)", "expo", "Exposition Park - LA Memorial Coliseum", at(21, 17)),
+        ])
+        self.assertEqual(found, [])
+
+    def test_buffer(self):
+        events = [
+            event("Matinee", "shrine", "Shrine Auditorium", at(21, 13)),
+            event("Match", "lafc", "BMO Stadium", at(21, 17)),
+        ]
+        self.assertEqual(conflicts.find_conflicts(events, buffer_minutes=0), [])
+        found = conflicts.find_conflicts(events, buffer_minutes=90)
+        self.assertEqual(pairs(found), [("Matinee", "Match")])
+        self.assertEqual(found[0].overlap_minutes, 120)
+
+    def test_tbd_blocks_the_day(self):
+        found = conflicts.find_conflicts([
+            event("Fair", "expo", "Exposition Park", at(21, 0), time_tbd=True),
+            event("Late show", "shrine", "Shrine Auditorium", at(21, 22)),
+            event("Next day", "shrine", "Shrine Auditorium", at(22, 19)),
+        ], buffer_minutes=0)
+        self.assertEqual(pairs(found), [("Fair", "Late show")])
+
+    def test_range_blocks_every_day(self):
+        found = conflicts.find_conflicts([
+            event("Festival", "bmo", "BMO Stadium", at(21, 0), end=at(24, 0), time_tbd=True),
+            event("Third day", "shrine", "Shrine Auditorium", at(23, 19)),
+            event("After", "shrine", "Shrine Auditorium", at(24, 19)),
+        ], buffer_minutes=0)
+        self.assertEqual(pairs(found), [("Festival", "Third day")])
+
+    def test_away_games_and_cancellations_are_left_out(self):
+        events = [
+            event("Concert", "shrine", "Shrine Auditorium", at(21, 19)),
+            event("USC vs UCLA", "football", "Pasadena, Calif.", at(21, 19)),
+            event("USC vs Oregon", "wbb", "Los Angeles, Calif. / Galen Center", at(21, 19)),
+            event("Cancelled", "bmo", "BMO Stadium", at(21, 19), status="Cancelled/Inactive"),
+        ]
+        self.assertEqual(pairs(conflicts.find_conflicts(events)), [("Concert", "USC vs Oregon")])
+        self.assertEqual(len(conflicts.find_conflicts(events, local_only=False)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
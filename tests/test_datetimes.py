@@ -0,0 +1,126 @@
+import unittest
+from datetime import date, datetime
+
+import datetimes
+
+PACIFIC = datetimes.PACIFIC
+
+
+def midnight(year, month, day):
+    return datetime(year, month, day, tzinfo=PACIFIC)
+
+
+class ParseDateTest(unittest.TestCase):
+    TODAY = date(2026, 10, 17)
+
+    def parse(self, text):
+        return datetimes.parse_date(text, today=self.TODAY)
+
+    def test_full_date(self):
+        self.assertEqual(self.parse("Saturday, October 17, 2026"), midnight(2026, 10, 17))
+
+    def test_iso(self):
+        self.assertEqual(self.parse("2026-11-21"), midnight(2026, 11, 21))
+
+    def test_year_less_date_is_the_next_one(self):
+        self.assertEqual(self.parse("Sat, Oct 17"), midnight(2026, 10, 17))
+        self.assertEqual(self.parse("Dec 5"), midnight(2026, 12, 5))
+        # Already past this year, so next year's
+        self.assertEqual(self.parse("Sat, Jan 9"), midnight(2027, 1, 9))
+        self.assertEqual(self.parse("October 16"), midnight(2027, 10, 16))
+
+    def test_unparseable(self):
+        for text in ("", None, "TBD", "Coming soon"):
+            with self.subTest(text=text):
+                self.assertIsNone(self.parse(text))
+
+
+class ParseDateRangeTest(unittest.TestCase):
+    TODAY = date(2026, 10, 17)
+
+    def parse(self, text):
+        return datetimes.parse_date_range(text, today=self.TODAY)
+
+    def test_single_date_is_one_day(self):
+        self.assertEqual(self.parse("November 21, 2026"), (midnight(2026, 11, 21), midnight(2026, 11, 21)))
+
+    def test_ranges(self):
+        cases = {
+            "November 21 - 22, 2026": ((2026, 11, 21), (2026, 11, 22)),
+            "Oct 31 – Nov 2, 2026": ((2026, 10, 31), (2026, 11, 2)),
+            "Jan 9 & 10, 2027": ((2027, 1, 9), (2027, 1, 10)),
+            "Sat, Nov 21 to Sun, Nov 22, 2026": ((2026, 11, 21), (2026, 11, 22)),
+            "December 30, 2026 - January 2, 2027": ((2026, 12, 30), (2027, 1, 2)),
+        }
+        for text, (first, last) in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(self.parse(text), (midnight(*first), midnight(*last)))
+
+    def test_year_less_ranges(self):
+        cases = {
+            # Under way today, so this year's
+            "Oct 16-18": ((2026, 10, 16), (2026, 10, 18)),
+            "Nov 21-22": ((2026, 11, 21), (2026, 11, 22)),
+            # Over, so next year's
+            "Oct 1-3": ((2027, 10, 1), (2027, 10, 3)),
+            # Crosses the new year
+            "Dec 30 - Jan 2": ((2026, 12, 30), (2027, 1, 2)),
+        }
+        for text, (first, last) in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(self.parse(text), (midnight(*first), midnight(*last)))
+
+    def test_first_day_of_range(self):
+        self.assertEqual(datetimes.parse_date("November 21 - 22, 2026", today=self.TODAY), midnight(2026, 11, 21))
+
+    def test_backwards_range(self):
+        self.assertEqual(self.parse("November 22 - 21, 2026"), (None, None))
+
+
+class ParseClockTest(unittest.TestCase):
+    def test_clocks(self):
+        cases = {
+            "7:30 PM": (19, 30),
+            "7 pm": (19, 0),
+            "10:00 a.m.": (10, 0),
+            "12:00 AM": (0, 0),
+            "Noon": (12, 0),
+            "12 Noon": (12, 0),
+            "Midnight": (0, 0),
+        }
+        for text, clock in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(datetimes.parse_clock(text), clock)
+
+    def test_start_is_not_the_gate_time(self):
+        self.assertEqual(datetimes.parse_clock("Gates 5:00 PM / Kickoff 7:30 PM"), (19, 30))
+        self.assertEqual(datetimes.parse_clock("Kickoff 7:30 PM (gates open 5:00 PM)"), (19, 30))
+        self.assertEqual(datetimes.parse_clock("Doors 6 PM, Show 8 PM"), (20, 0))
+
+    def test_no_clock(self):
+        for text in ("", None, "TBD", "TBA", "All Day", "Canceled"):
+            with self.subTest(text=text):
+                self.assertIsNone(datetimes.parse_clock(text))
+
+
+class CombineTest(unittest.TestCase):
+    def test_date_and_time(self):
+        start, end = datetimes.combine("Saturday, November 21, 2026", "7:30 PM")
+        self.assertEqual(start, datetime(2026, 11, 21, 19, 30, tzinfo=PACIFIC))
+        self.assertIsNone(end)
+
+    def test_range_ends_with_its_last_day(self):
+        start, end = datetimes.combine("November 21 - 22, 2026", "7:30 PM")
+        self.assertEqual(start, datetime(2026, 11, 21, 19, 30, tzinfo=PACIFIC))
+        self.assertEqual(end, midnight(2026, 11, 23))
+
+    def test_kickoff_time(self):
+        start, _ = datetimes.combine("Saturday, November 21, 2026", "Gates 5:00 PM / Kickoff 7:30 PM")
+        self.assertEqual(start, datetime(2026, 11, 21, 19, 30, tzinfo=PACIFIC))
+
+    def test_unparseable_date(self):
+        self.assertEqual(datetimes.combine("TBD", "7:30 PM"), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
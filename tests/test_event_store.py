@@ -0,0 +1,85 @@
+import unittest
+from datetime import datetime, timedelta
+
+import datetimes
+from event_store import EventStore
+from events import Event
+
+DAY = datetime(2026, 11, 21, 19, 30, tzinfo=datetimes.PACIFIC)
+
+
+def event(event_id, title="Show", days=0, source="bmo", venue="BMO Stadium", **fields):
+    return Event(source=source, title=title, start=DAY + timedelta(days=days), venue=venue, id=event_id, **fields)
+
+
+class UpsertTest(unittest.TestCase):
+    def setUp(self):
+        self.store = EventStore(":memory:")
+        self.addCleanup(self.store.close)
+
+    def row(self, event_id):
+        return self.store.conn.execute(
+            "SELECT title, first_seen, last_seen FROM events WHERE event_id = ?", (event_id,)
+        ).fetchone()
+
+    def test_roundtrip(self):
+        stored = event("a", end=DAY + timedelta(days=2), time_text="Noon", date_text="Nov 21 - 22", season="2026")
+        self.assertEqual(self.store.upsert("bmo", [stored], now=100), 1)
+        self.assertEqual(self.store.current("bmo"), [stored])
+        self.assertEqual(self.store.sources(), {"bmo": (100, 1)})
+
+    def test_newer_scrape_wins(self):
+        self.store.upsert("bmo", [event("a", title="Old")], now=100)
+        self.store.upsert("bmo", [event("a", title="New")], now=200)
+        self.assertEqual(self.row("a"), ("New", 100, 200))
+
+    def test_older_scrape_only_widens_first_seen(self):
+        self.store.upsert("bmo", [event("a", title="New")], now=200)
+        self.store.upsert("bmo", [event("a", title="Old")], now=100)
+        self.assertEqual(self.row("a"), ("New", 100, 200))
+        self.assertEqual(self.store.sources(), {"bmo": (200, 1)})
+        self.assertEqual([e.title for e in self.store.current("bmo")], ["New"])
+
+    def test_current_is_the_latest_scrape_in_order(self):
+        self.store.upsert("bmo", [event("a"), event("b")], now=100)
+        self.store.upsert("bmo", [event("c"), event("b")], now=200)
+        self.assertEqual([e.id for e in self.store.current("bmo")], ["c", "b"])
+
+    def test_upsert_many_is_one_write(self):
+        total = self.store.upsert_many([
+            ("bmo", [event("a"), event("b")], 100),
+            ("shrine", [event("c", source="shrine", venue="Shrine Auditorium")], 100),
+        ])
+        self.assertEqual(total, 3)
+        self.assertEqual(self.store.sources(), {"bmo": (100, 2), "shrine": (100, 1)})
+
+
+class BetweenTest(unittest.TestCase):
+    def setUp(self):
+        self.store = EventStore(":memory:")
+        self.addCleanup(self.store.close)
+        self.store.upsert("bmo", [event("a"), event("b", days=1)], now=DAY.timestamp() - 86400)
+        self.store.upsert("shrine", [event("c", source="shrine", venue="Shrine Auditorium")], now=DAY.timestamp())
+
+    def ids(self, **kwargs):
+        return [e.id for e in self.store.between(DAY, DAY + timedelta(days=7), **kwargs)]
+
+    def test_filters(self):
+        self.assertEqual(sorted(self.ids()), ["a", "b", "c"])
+        self.assertEqual(self.ids(venues=["Shrine Auditorium"]), ["c"])
+        self.assertEqual(self.ids(venue_prefix="BMO"), ["a", "b"])
+        self.assertEqual(sorted(self.ids(sources=["shrine"])), ["c"])
+        self.assertEqual(self.store.between(DAY + timedelta(days=1), DAY + timedelta(days=2)), [event("b", days=1)])
+
+    def test_listed_only_drops_events_taken_off_the_schedule(self):
+        self.store.upsert("bmo", [event("a")], now=DAY.timestamp() - 3600)
+        self.assertEqual(sorted(self.ids()), ["a", "b", "c"])
+        self.assertEqual(sorted(self.ids(listed_only=True)), ["a", "c"])
+
+    def test_listed_only_keeps_past_events(self):
+        self.store.upsert("bmo", [], now=DAY.timestamp() + 3 * 86400)
+        self.assertEqual(sorted(self.ids(listed_only=True)), ["a", "b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import tempfile
+import unittest
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import http_cache
+
+URL = "https://example.com/events.json"
+
+
+def response(status, body=b"", headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r.headers = CaseInsensitiveDict(headers or {})
+    r.encoding = "utf-8"
+    r._content = body
+    r.url = URL
+    return r
+
+
+class FakeSession:
+    """Answers each get() with the next queued response and records the headers sent."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent.append(headers)
+        return self.responses.pop(0)
+
+
+class ConditionalGetTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def get_json(self, session):
+        return http_cache.get_json(URL, session=session, cache_dir=self.dir.name)
+
+    def test_not_modified_serves_the_stored_body(self):
+        payload = {"events": [{"eventId": 1}]}
+        session = FakeSession(
+            response(200, json.dumps(payload).encode(), {"ETag": '"v1"', "Last-Modified": "Sat, 21 Nov 2026 00:00:00 GMT"}),
+            response(304),
+        )
+        self.assertEqual(self.get_json(session), (payload, False))
+        self.assertEqual(self.get_json(session), (payload, True))
+        self.assertEqual(session.sent, [
+            {},
+            {"If-None-Match": '"v1"', "If-Modified-Since": "Sat, 21 Nov 2026 00:00:00 GMT"},
+        ])
+
+    def test_changed_response_replaces_the_entry(self):
+        session = FakeSession(
+            response(200, b'{"v": 1}', {"ETag": '"v1"'}),
+            response(200, b'{"v": 2}', {"ETag": '"v2"'}),
+            response(304),
+        )
+        self.get_json(session)
+        self.assertEqual(self.get_json(session), ({"v": 2}, False))
+        self.assertEqual(self.get_json(session), ({"v": 2}, True))
+        self.assertEqual(session.sent[2], {"If-None-Match": '"v2"'})
+
+    def test_nothing_stored_without_validators(self):
+        session = FakeSession(response(200, b'{"v": 1}'), response(200, b'{"v": 1}'))
+        self.get_json(session)
+        self.get_json(session)
+        self.assertEqual(session.sent, [{}, {}])
+        self.assertIsNone(http_cache.load_entry(URL, self.dir.name))
+
+    def test_entries_are_kept_per_kind(self):
+        session = FakeSession(response(200, b'{"v": 1}', {"ETag": '"v1"'}), response(200, b"text"))
+        self.get_json(session)
+        body = http_cache.get_text(URL, session=session, cache_dir=self.dir.name)
+        self.assertEqual(body, ("text", False))
+        self.assertEqual(session.sent[1], {})
+
+    def test_errors_raise(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.get_json(FakeSession(response(500)))
+
+
+if __name__ == "__main__":
+    unittest.main()
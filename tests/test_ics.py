@@ -0,0 +1,119 @@
+import unittest
+from datetime import date, datetime
+
+import datetimes
+import ics
+import lafc_events
+
+CALENDAR = (
+    b"BEGIN:VCALENDAR\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"UID:match-1\r\n"
+    b"SUMMARY:LAFC vs LA Galaxy\r\n"
+    b"  continued\r\n"
+    b"LOCATION:BMO Stadium / Los Angeles\r\n"
+    b"DTSTART:20261018T023000Z\r\n"
+    b"END:VEVENT\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"UID:match-2\r\n"
+    b"SUMMARY:LAFC vs Seattle\r\n"
+    b"LOCATION:BMO Stadium\r\n"
+    b"DTSTART;VALUE=DATE:20261024\r\n"
+    b"END:VEVENT\r\n"
+    b"END:VCALENDAR\r\n"
+)
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class IterLinesTest(unittest.TestCase):
+    def test_crlf_split_across_chunks(self):
+        # Every chunk size puts a chunk boundary between some CR and its LF
+        expected = CALENDAR.decode().split("\r\n")[:-1]
+        for size in range(1, 40):
+            lines = [line.decode() for line in ics.iter_lines(chunked(CALENDAR, size))]
+            self.assertEqual(lines, expected, f"chunk size {size}")
+
+    def test_last_line_without_newline(self):
+        self.assertEqual(list(ics.iter_lines([b"A\r\nB"])), [b"A", b"B"])
+
+
+class UnfoldTest(unittest.TestCase):
+    def test_folded_summary_across_chunk_boundaries(self):
+        for size in range(1, 40):
+            events = list(ics.iter_vevents(ics.iter_lines(chunked(CALENDAR, size))))
+            self.assertEqual(events[0].summary, "LAFC vs LA Galaxy continued", f"chunk size {size}")
+
+    def test_empty_line_does_not_cut_a_fold(self):
+        lines = [b"SUMMARY:LAFC vs", b"", b"  Galaxy"]
+        self.assertEqual(list(ics.unfold(lines)), ["SUMMARY:LAFC vs Galaxy"])
+
+    def test_fold_inside_multibyte_character(self):
+        encoded = "SUMMARY:Café".encode()
+        lines = [encoded[:-1], b" " + encoded[-1:]]
+        self.assertEqual(list(ics.unfold(lines)), ["SUMMARY:Café"])
+
+    def test_str_lines(self):
+        self.assertEqual(list(ics.unfold(["DESCRIPTION:a", "\tb", "UID:1"])), ["DESCRIPTION:ab", "UID:1"])
+
+
+class ParseDatetimeTest(unittest.TestCase):
+    def test_utc(self):
+        self.assertEqual(ics.parse_datetime("20261018T023000Z", {}), datetime(2026, 10, 18, 2, 30, tzinfo=ics.UTC))
+
+    def test_tzid(self):
+        value = ics.parse_datetime("20261017T193000", {"TZID": "America/Los_Angeles"})
+        self.assertEqual(value, datetime(2026, 10, 17, 19, 30, tzinfo=datetimes.PACIFIC))
+
+    def test_date_is_a_calendar_day(self):
+        self.assertEqual(ics.parse_datetime("20261024", {"VALUE": "DATE"}), date(2026, 10, 24))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ics.parse_datetime("2026-10-24", {"VALUE": "DATE"})
+
+
+class TextTest(unittest.TestCase):
+    def test_unescape(self):
+        self.assertEqual(ics.unescape_text(r"a\, b\; c\nd\\e"), "a, b; c\nd\\e")
+
+    def test_split_property(self):
+        self.assertEqual(
+            ics.split_property('DTSTART;TZID="America/Los_Angeles";value=x:20261017T193000'),
+            ("DTSTART", {"TZID": "America/Los_Angeles", "VALUE": "x"}, "20261017T193000"),
+        )
+
+
+class VEventTest(unittest.TestCase):
+    def test_skips_nested_components(self):
+        lines = [
+            "BEGIN:VEVENT", "SUMMARY:Match", "DTSTART:20261018T023000Z",
+            "BEGIN:VALARM", "SUMMARY:Reminder", "END:VALARM", "END:VEVENT",
+        ]
+        (event,) = ics.iter_vevents(lines)
+        self.assertEqual(event.summary, "Match")
+        self.assertFalse(event.all_day)
+
+    def test_event_without_start_is_dropped(self):
+        self.assertEqual(list(ics.iter_vevents(["BEGIN:VEVENT", "SUMMARY:x", "END:VEVENT"])), [])
+
+
+class GameRecordTest(unittest.TestCase):
+    def test_timed_match_in_pacific(self):
+        event = next(ics.iter_vevents(ics.iter_lines([CALENDAR])))
+        game = lafc_events.game_record(event, "BMO Stadium")
+        self.assertEqual(game.start, datetime(2026, 10, 17, 19, 30, tzinfo=datetimes.PACIFIC))
+        self.assertFalse(game.time_tbd)
+
+    def test_all_day_match_keeps_its_date(self):
+        event = list(ics.iter_vevents(ics.iter_lines([CALENDAR])))[1]
+        game = lafc_events.game_record(event, "BMO Stadium")
+        self.assertEqual(game.start.date(), date(2026, 10, 24))
+        self.assertTrue(game.time_tbd)
+        self.assertEqual(game.time_label("%I:%M %p PT"), "TBD")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import js_literal
+
+
+class ParseLiteralTest(unittest.TestCase):
+    def parse(self, text):
+        return js_literal.parse_literal(text)[0]
+
+    def test_json(self):
+        self.assertEqual(self.parse('{"a": [1, 2.5, -3e2, true, false, null]}'), {"a": [1, 2.5, -300.0, True, False, None]})
+
+    def test_js_forms(self):
+        text = """{
+            // comment
+            home: 'Angel City', /* block */ away: `Portland`,
+            "n": undefined,
+            list: [1, 2,],
+        }"""
+        self.assertEqual(self.parse(text), {"home": "Angel City", "away": "Portland", "n": None, "list": [1, 2]})
+
+    def test_numeric_key(self):
+        self.assertEqual(self.parse("{1: 2}"), {"1": 2})
+
+    def test_escapes(self):
+        self.assertEqual(self.parse(r"'it\'s é\x41\n'"), "it's éA\n")
+        self.assertEqual(self.parse(r'{"a\"b": 1}'), {'a"b': 1})
+
+    def test_end_offset(self):
+        value, end = js_literal.parse_literal("x = [1, 2]; rest", 4)
+        self.assertEqual((value, end), ([1, 2], 10))
+
+    def test_errors(self):
+        for text in ("[1 2]", "{a 1}", "{a: 1", "[", "{[]: 2}", "foo", "]"):
+            with self.subTest(text=text), self.assertRaises(js_literal.JSLiteralError):
+                self.parse(text)
+
+
+class AssignmentTest(unittest.TestCase):
+    def test_extract(self):
+        page = "<script>var other = 1; const gamesData = [{id: 1}];</script>"
+        self.assertEqual(js_literal.extract_assignment(page, "gamesData"), [{"id": 1}])
+
+    def test_whole_identifier_and_not_comparison(self):
+        page = "if (gamesData == null) {} var myGamesData = [0]; gamesDataX = [1]; gamesData = [2];"
+        self.assertEqual(js_literal.extract_assignment(page, "gamesData"), [2])
+
+    def test_missing(self):
+        with self.assertRaises(KeyError):
+            js_literal.extract_assignment("var x = 1;", "gamesData")
+
+
+if __name__ == "__main__":
+    unittest.main()
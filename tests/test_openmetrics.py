@@ -0,0 +1,70 @@
+import functools
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import openmetrics
+import shrine_events
+import shrine_scraper
+import snapshots
+
+FEED = {"events": [{
+    "eventId": 1,
+    "title": {"headlinersText": "Concert"},
+    "eventDateTime": "2026-11-21T19:30:00-08:00",
+    "ticketing": {"statusId": 1, "url": "https://example.com/concert"},
+}]}
+
+
+class FormatSourceTest(unittest.TestCase):
+    def test_samples(self):
+        snapshot = {
+            "phases": {"fetch": 0.5},
+            "counts": {"events": 3, "index_hits": 1},
+            "requests": [{"status": 200, "seconds": 0.2}, {"status": 304, "seconds": 3.0}],
+        }
+        text = openmetrics.format_source("bmo", True, 1000, last_success=900, snapshot=snapshot)
+        for line in [
+            'scraper_up{source="bmo"} 1',
+            'scraper_last_success_timestamp_seconds{source="bmo"} 900.0',
+            'scraper_events{source="bmo"} 3',
+            'scraper_cache_hit_ratio{source="bmo"} 0.666667',
+            'scraper_http_responses{source="bmo",code="304"} 1',
+            'scraper_fetch_duration_seconds_bucket{source="bmo",le="0.25"} 1',
+            'scraper_fetch_duration_seconds_bucket{source="bmo",le="+Inf"} 2',
+            "# TYPE scraper_fetch_duration_seconds histogram",
+        ]:
+            self.assertIn(line, text.splitlines())
+
+    def test_never_succeeded(self):
+        text = openmetrics.format_source("bmo", False, 1000)
+        self.assertIn('scraper_up{source="bmo"} 0', text)
+        self.assertNotIn("scraper_last_success_timestamp_seconds{", text)
+
+
+class NotModifiedTest(unittest.TestCase):
+    """A feed that answered 304 is a successful scrape, even though no email is sent."""
+
+    def test_not_modified_is_up(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(shrine_events.http_cache, "get_json", return_value=(FEED, True)), \
+                mock.patch.object(shrine_events, "SKIP_EMAIL_IF_UNCHANGED", True), \
+                mock.patch.object(shrine_events, "_feed_unchanged", False), \
+                mock.patch.object(snapshots, "check", functools.partial(snapshots.check, snapshot_dir=directory)):
+            run = shrine_scraper._scrape(shrine_scraper.SourceRun("shrine", module=shrine_events))
+            self.assertEqual(run.status, "ok")
+            self.assertIsNotNone(run.check)
+            self.assertIsNone(shrine_events.compose(run.events, run.error))
+
+            db_path = os.path.join(directory, "events.sqlite3")
+            shrine_scraper._store([run], db_path)
+            shrine_scraper._export([run], db_path, directory)
+            with open(os.path.join(directory, "scraper_shrine.prom"), encoding="utf-8") as f:
+                text = f.read()
+        self.assertIn('scraper_up{source="shrine"} 1', text)
+        self.assertIn('scraper_last_success_timestamp_seconds{source="shrine"}', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
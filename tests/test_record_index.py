@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from record_index import RecordIndex
+
+
+class RecordIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.path = os.path.join(self.dir.name, "index.json")
+
+    def index(self, max_entries=None):
+        return RecordIndex(self.path, ttl_seconds=100, max_entries=max_entries)
+
+    def test_ttl(self):
+        index = self.index()
+        index.put("a", {"title": "A"}, now=1000)
+        self.assertEqual(index.get_fresh("a", now=1100), {"title": "A"})
+        self.assertIsNone(index.get_fresh("a", now=1101))
+        self.assertIsNone(index.get_fresh("b", now=1000))
+        self.assertEqual(index.get("a"), {"title": "A"})
+        self.assertEqual(index.stats(), "1 hits, 2 misses, 0 revalidated")
+
+    def test_touch_after_not_modified(self):
+        index = self.index()
+        index.put("a", {"title": "A"}, etag='"v1"', last_modified="Sat, 21 Nov 2026 00:00:00 GMT", now=1000)
+        self.assertEqual(index.validators("a"), {
+            "If-None-Match": '"v1"', "If-Modified-Since": "Sat, 21 Nov 2026 00:00:00 GMT",
+        })
+        self.assertEqual(index.validators("b"), {})
+        self.assertEqual(index.touch("a", now=2000), {"title": "A"})
+        self.assertEqual(index.get_fresh("a", now=2050), {"title": "A"})
+        self.assertEqual(index.revalidated, 1)
+
+    def test_save_and_load(self):
+        index = self.index()
+        index.put("a", {"title": "A"}, etag='"v1"', now=1000)
+        index.save()
+        loaded = self.index()
+        self.assertEqual(loaded.get_fresh("a", now=1050), {"title": "A"})
+        self.assertEqual(loaded.validators("a"), {"If-None-Match": '"v1"'})
+
+    def test_unreadable_file_starts_empty(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertEqual(self.index().entries, {})
+
+    def test_lru_eviction_on_save(self):
+        index = self.index(max_entries=2)
+        index.put("a", 1, now=1000)
+        index.put("b", 2, now=1001)
+        index.put("c", 3, now=1002)
+        index.get_fresh("a", now=1003)
+        index.save()
+        self.assertEqual(sorted(self.index().entries), ["a", "c"])
+
+    def test_retain(self):
+        index = self.index()
+        for url in "abc":
+            index.put(url, url, now=1000)
+        self.assertEqual(index.retain(["a", "c", "d"]), 1)
+        self.assertEqual(sorted(index.entries), ["a", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import functools
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import datetimes
+import shrine_scraper
+import snapshots
+from events import Event
+
+
+def event(event_id, title="Show", day=21, **fields):
+    return Event(
+        source="bmo", title=title, start=datetime(2026, 11, day, 19, 30, tzinfo=datetimes.PACIFIC),
+        venue="BMO Stadium", id=event_id, **fields
+    )
+
+
+class CheckTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def check(self, events):
+        return snapshots.check("bmo", events, self.dir.name)
+
+    def test_first_run(self):
+        result = self.check([event("a")])
+        self.assertFalse(result.unchanged)
+        self.assertTrue(result.first_run)
+        self.assertIsNone(result.diff)
+
+    def test_unchanged_in_any_order(self):
+        snapshots.save("bmo", [event("a"), event("b")], self.dir.name)
+        result = self.check([event("b"), event("a")])
+        self.assertTrue(result.unchanged)
+        self.assertIsNone(result.diff)
+
+    def test_diff(self):
+        snapshots.save("bmo", [event("a"), event("b"), event("c")], self.dir.name)
+        result = self.check([event("a"), event("b", day=22), event("d")])
+        self.assertFalse(result.unchanged)
+        self.assertEqual([e.id for e in result.diff.added], ["d"])
+        self.assertEqual([e.id for e in result.diff.removed], ["c"])
+        self.assertEqual([(old.id, new.id) for old, new in result.diff.changed], [("b", "b")])
+        self.assertEqual(result.diff.summary(), "1 added, 1 removed, 1 changed")
+
+    def test_saved_digest_matches(self):
+        events = [event("a")]
+        result = self.check(events)
+        snapshots.save("bmo", events, self.dir.name, events_digest=result.digest)
+        self.assertEqual(snapshots.load_digest("bmo", self.dir.name), snapshots.digest(events))
+        self.assertEqual(snapshots.load("bmo", self.dir.name), {"a": events[0]})
+
+
+class DiffTest(unittest.TestCase):
+    def test_repeated_ids_are_kept_apart(self):
+        old = {"a": event("a"), "a#2": event("a", title="Late show")}
+        changes = snapshots.diff(old, [event("a")])
+        self.assertEqual([e.title for e in changes.removed], ["Late show"])
+        self.assertTrue(not changes.added and not changes.changed)
+
+    def test_time_text_is_shown_as_a_start_change(self):
+        old = event("a", time_text="7:30 PM")
+        new = Event(source="bmo", title="Show", start=old.start.replace(hour=0, minute=0), venue="BMO Stadium",
+                    id="a", time_tbd=True, time_text="All Day")
+        self.assertEqual(snapshots._change_detail(old, new), "start: Sat, Nov 21, 2026 7:30 PM → Sat, Nov 21, 2026 All Day")
+
+
+class FakeSource:
+    """A source module whose send succeeds or fails."""
+
+    def __init__(self, sent):
+        self.sent = sent
+        self.sends = 0
+
+    def scrape(self):
+        return [event("a")], None
+
+    def compose(self, events, error):
+        return "Subject", "<p>report</p>"
+
+    def send_email_with_brevo(self, html, subject):
+        self.sends += 1
+        return self.sent
+
+
+class ReportTest(unittest.TestCase):
+    """Snapshots are only recorded once the source's email actually went out."""
+
+    def run_report(self, sent, send_mode="always", check=None):
+        run = shrine_scraper.SourceRun("bmo", module=FakeSource(sent), events=[event("a")])
+        run.check = check or snapshots.Check("bmo", "digest", unchanged=False, first_run=True)
+        return shrine_scraper._report(run, send_mode), run
+
+    def test_sent(self):
+        record, run = self.run_report(sent=True)
+        self.assertTrue(record)
+        self.assertEqual(run.email, "report")
+
+    def test_failed_send_is_not_recorded(self):
+        record, run = self.run_report(sent=False)
+        self.assertFalse(record)
+        self.assertEqual(run.email, "failed")
+
+    def test_failed_diff_is_not_recorded(self):
+        changes = snapshots.Diff(added=[event("b")])
+        check = snapshots.Check("bmo", "digest", unchanged=False, diff=changes)
+        with mock.patch.object(shrine_scraper.mailer, "send_email_with_brevo", return_value=False):
+            record, run = self.run_report(sent=True, send_mode="diff", check=check)
+        self.assertFalse(record)
+        self.assertEqual(run.email, "failed")
+
+    def test_unchanged_sends_nothing(self):
+        check = snapshots.Check("bmo", "digest", unchanged=True)
+        record, run = self.run_report(sent=False, send_mode="changed", check=check)
+        self.assertTrue(record)
+        self.assertEqual((run.email, run.module.sends), ("none", 0))
+
+    def test_run_saves_only_sent_snapshots(self):
+        sources = {"good": FakeSource(True), "bad": FakeSource(False)}
+
+        def load(runs):
+            for run in runs:
+                run.module = sources[run.name]
+            return runs
+
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.object(shrine_scraper, "_load", load), \
+                    mock.patch.object(shrine_scraper, "_store"), \
+                    mock.patch.object(snapshots, "check", functools.partial(snapshots.check, snapshot_dir=directory)), \
+                    mock.patch.object(snapshots, "save", functools.partial(snapshots.save, snapshot_dir=directory)):
+                shrine_scraper.run_sources(["good", "bad"], use_digest=False)
+            self.assertEqual(sorted(os.listdir(directory)), ["good.json", "good.sha256"])
+
+
+if __name__ == "__main__":
+    unittest.main()